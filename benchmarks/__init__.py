@@ -0,0 +1,5 @@
+"""
+Benchmarks on synthetic PascalVOC corpus, run from repository root:
+
+    python -m benchmarks.suite --out results.json
+"""
@@ -0,0 +1,73 @@
+"""
+annotation_from_xml on object-dense files (crowd scenes)
+Compares current implementation with previous one, which deep-copied objects
+and checked bndboxes in a separate pass
+
+    python -m benchmarks.bench_dense_objects --n-files 200 --n-objects 500
+"""
+
+import argparse
+import tempfile
+from copy import deepcopy
+from pathlib import Path
+
+from xmlobj import get_xml_obj
+
+from benchmarks.suite import bench
+from benchmarks.synthetic import make_corpus
+from pascal import annotation_from_xml
+from pascal.draw_objects import DrawObjectsMixin
+from pascal.format_convertor import FormatConvertorMixin
+
+
+def _set_attr(box, obj_type, clip_zero: bool = True):
+    for attr_name, attr_val in box.__dict__.items():
+        attr_val = obj_type(attr_val)
+        if clip_zero:
+            attr_val = obj_type(max(0, attr_val))
+        setattr(box, attr_name, attr_val)
+    return box
+
+
+def _check_bnd_box(box, clip_zero: bool = True):
+    attr_types = [type(attr) for attr in box.__dict__.values()]
+    if all(attr is int or attr is float for attr in attr_types):
+        return box
+    if any(attr is float for attr in attr_types):
+        val_type = float
+    else:
+        val_type = int
+    return _set_attr(box, val_type, clip_zero)
+
+
+def legacy_annotation_from_xml(file_path, attr_type_spec=None, clip_zero=True):
+    obj = get_xml_obj(
+        file_path,
+        mixin_clsasses=[DrawObjectsMixin, FormatConvertorMixin],
+        attr_type_spec=attr_type_spec,
+    )
+    obj_ = getattr(obj, "object")
+    setattr(obj, "objects", [deepcopy(o) for o in obj_])
+    delattr(obj, "object")
+    for object in obj:
+        object.bndbox = _check_bnd_box(object.bndbox, clip_zero)
+    return obj
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n-files", type=int, default=200)
+    parser.add_argument("--n-objects", type=int, default=500)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        files = make_corpus(
+            tmp, args.n_files, args.n_objects, min_objects=args.n_objects
+        )
+        n_objects = args.n_files * args.n_objects
+        t_legacy = bench(legacy_annotation_from_xml, files)
+        t_current = bench(annotation_from_xml, files)
+    print(f"files: {len(files)}, objects per file: {args.n_objects}")
+    for name, t in [("deepcopy", t_legacy), ("current", t_current)]:
+        print(f"{name}: {t:.2f}s, {1e6 * t / n_objects:.1f} us/object")
+    print(f"speedup: {t_legacy / t_current:.2f}x")
@@ -0,0 +1,109 @@
+"""
+Memory of one million bounding boxes
+
+    python -m benchmarks.bench_memory --n-boxes 1000000
+"""
+
+import argparse
+import gc
+import random
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+from benchmarks.synthetic import make_corpus
+from pascal import annotation_from_xml
+from pascal.dataset import AnnotationDataset
+from pascal.protocol_implementations import (
+    BndBox,
+    CompactBndBox,
+    CompactObject,
+    Object,
+)
+
+
+def measure(make, n_boxes: int) -> float:
+    gc.collect()
+    tracemalloc.start()
+    items = make(n_boxes)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del items
+    return current / n_boxes
+
+
+def _coords(n_boxes: int):
+    rnd = random.Random(0)
+    for _ in range(n_boxes):
+        xmin, ymin = rnd.randint(0, 1000), rnd.randint(0, 1000)
+        yield xmin, ymin, xmin + rnd.randint(1, 500), ymin + rnd.randint(1, 500)
+
+
+def xmlobj_objects(n_boxes: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        (file,) = make_corpus(Path(tmp), 1, n_boxes, min_objects=n_boxes)
+        gc.collect()
+        tracemalloc.start()
+        ann = annotation_from_xml(file)
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    del ann
+    return current / n_boxes
+
+
+def dataclass_objects(n_boxes: int):
+    objects = []
+    for c in _coords(n_boxes):
+        # same attributes as annotation_from_voc objects
+        obj = Object("person", BndBox(*c))
+        obj.pose = "Unspecified"
+        obj.truncated = 0
+        obj.difficult = 0
+        objects.append(obj)
+    return objects
+
+
+def compact_objects(n_boxes: int):
+    return [
+        CompactObject("person", CompactBndBox(*c), "Unspecified", 0, 0)
+        for c in _coords(n_boxes)
+    ]
+
+
+def dataset(n_boxes: int):
+    boxes = np.array(list(_coords(n_boxes)), dtype=np.float32)
+    return AnnotationDataset(
+        boxes=boxes,
+        label_ids=np.zeros(n_boxes, dtype=np.int32),
+        offsets=np.array([0, n_boxes]),
+        sizes=np.array([[1500, 1500]]),
+        names=["person"],
+        filenames=["0.jpg"],
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n-boxes", type=int, default=1000000)
+    parser.add_argument(
+        "--n-xmlobj-boxes",
+        type=int,
+        default=20000,
+        help="annotation_from_xml objects are measured on smaller file",
+    )
+    args = parser.parse_args()
+    per_box = xmlobj_objects(args.n_xmlobj_boxes)
+    print(f"annotation_from_xml objects: {per_box:.1f} bytes/box")
+    base = None
+    for name, make in [
+        ("Object + BndBox dataclasses", dataclass_objects),
+        ("CompactObject + CompactBndBox", compact_objects),
+        ("AnnotationDataset", dataset),
+    ]:
+        per_box = measure(make, args.n_boxes)
+        base = base or per_box
+        print(
+            f"{name}: {per_box:.1f} bytes/box, {base / per_box:.1f}x less than dataclasses"
+        )
@@ -0,0 +1,29 @@
+"""
+Compare annotation_from_xml and annotation_from_voc on synthetic corpus
+
+    python -m benchmarks.bench_voc_parser --n-files 50000
+"""
+
+import argparse
+import tempfile
+from pathlib import Path
+
+from benchmarks.suite import bench
+from benchmarks.synthetic import make_corpus
+from pascal import annotation_from_xml
+from pascal.voc_parser import annotation_from_voc
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n-files", type=int, default=50000)
+    parser.add_argument("--max-objects", type=int, default=8)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        files = make_corpus(tmp, args.n_files, args.max_objects)
+        t_xmlobj = bench(annotation_from_xml, files)
+        t_voc = bench(annotation_from_voc, files)
+    print(f"files: {len(files)}")
+    print(f"annotation_from_xml: {t_xmlobj:.2f}s, {len(files) / t_xmlobj:.0f} files/s")
+    print(f"annotation_from_voc: {t_voc:.2f}s, {len(files) / t_voc:.0f} files/s")
+    print(f"speedup: {t_xmlobj / t_voc:.1f}x")
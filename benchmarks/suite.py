@@ -0,0 +1,277 @@
+"""
+Benchmark suite on synthetic corpus
+Throughput, latency percentiles and peak memory of every case are written
+to json file, run is compared with baseline json of other version
+
+    python -m benchmarks.suite --n-files 2000 --out results.json
+    python -m benchmarks.suite --n-files 2000 --out new.json --baseline results.json
+"""
+
+import argparse
+import json
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+from PIL import Image
+
+from benchmarks.synthetic import NAMES, make_corpus, make_yolo_corpus
+from pascal import annotation_from_xml, annotation_from_yolo
+from pascal.utils import save_xml
+from pascal.voc_parser import annotation_from_voc
+
+_VERSION = 1
+
+
+@dataclass
+class Case:
+    """
+    Benchmark case: func is timed on every item,
+    setup prepares func argument from item and is not timed
+    """
+
+    name: str
+    func: Callable[[Any], Any]
+    items: Sequence[Any]
+    setup: Optional[Callable[[Any], Any]] = None
+
+
+def bench(func: Callable[[Any], Any], items: Sequence[Any]) -> float:
+    """
+    Total time of func calls on items
+    """
+    start = time.perf_counter()
+    for item in items:
+        func(item)
+    return time.perf_counter() - start
+
+
+def run_case(case: Case, memory: bool = True) -> Dict[str, float]:
+    """
+    Time every call, peak memory is measured in separate pass,
+    so tracing does not affect timings
+    """
+    latencies = []
+    for item in case.items:
+        arg = item if case.setup is None else case.setup(item)
+        start = time.perf_counter()
+        case.func(arg)
+        latencies.append(time.perf_counter() - start)
+    latencies = np.array(latencies, dtype=np.float64)
+    total = float(latencies.sum())
+    res = dict(
+        n=len(latencies),
+        total_s=total,
+        per_second=len(latencies) / total if total > 0 else 0.0,
+    )
+    if len(latencies) > 0:
+        p50, p90, p99 = np.percentile(latencies, (50, 90, 99)) * 1e3
+        res.update(p50_ms=p50, p90_ms=p90, p99_ms=p99, max_ms=latencies.max() * 1e3)
+    if memory:
+        peak = 0
+        for item in case.items:
+            arg = item if case.setup is None else case.setup(item)
+            tracemalloc.start()
+            case.func(arg)
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+        res["peak_memory_kb"] = peak / 1024
+    return res
+
+
+def make_cases(xml_files: List[Path], tmp_dir: Path, n_draw: int = 50) -> List[Case]:
+    labels_map = {name: i for i, name in enumerate(NAMES)}
+    yolo_dir = tmp_dir / "yolo"
+    xml_dir = tmp_dir / "xml"
+    yolo_dir.mkdir()
+    xml_dir.mkdir()
+    yolo_files = make_yolo_corpus(xml_files, yolo_dir, labels_map)
+    ids_map = {i: name for name, i in labels_map.items()}
+    annotations = [annotation_from_xml(file) for file in xml_files]
+    filter_names = NAMES[: len(NAMES) // 2]
+
+    def draw_setup(ann):
+        return ann, Image.new("RGB", (ann.size.width, ann.size.height))
+
+    return [
+        Case("annotation_from_xml", annotation_from_xml, xml_files),
+        Case("annotation_from_voc", annotation_from_voc, xml_files),
+        Case(
+            "annotation_from_yolo",
+            lambda item: annotation_from_yolo(item[0], item[1], item[2], ids_map),
+            yolo_files,
+        ),
+        Case("to_yolo", lambda ann: ann.to_yolo(labels_map), annotations),
+        Case("to_labelme", lambda ann: ann.to_labelme(), annotations),
+        Case(
+            "to_xml+save_xml",
+            lambda ann: save_xml(xml_dir / f"{ann.filename}.xml", ann.to_xml()),
+            annotations,
+        ),
+        Case(
+            "filter_objects",
+            lambda ann: ann.filter_objects(filter_names),
+            xml_files,
+            setup=annotation_from_xml,
+        ),
+        Case(
+            "draw_boxes",
+            lambda item: item[0].draw_boxes(item[1]),
+            annotations[:n_draw],
+            setup=draw_setup,
+        ),
+    ]
+
+
+def run_suite(
+    n_files: int = 1000,
+    max_objects: int = 8,
+    min_objects: int = 1,
+    n_parts: int = 0,
+    n_attributes: int = 0,
+    seed: int = 0,
+    n_draw: int = 50,
+    cases: Optional[Sequence[str]] = None,
+    memory: bool = True,
+) -> dict:
+    """
+    Make synthetic corpus and run benchmark cases
+
+    Parameters
+    ----------
+    n_files, max_objects, min_objects, n_parts, n_attributes, seed:
+        corpus options, see make_corpus
+    n_draw: number of images drawn by draw_boxes case
+    cases: names of cases to run, all cases if None
+    memory: measure peak memory
+
+    Returns
+    -------
+    json serializable dict with environment, config and results of every case
+    """
+    config = dict(
+        n_files=n_files,
+        max_objects=max_objects,
+        min_objects=min_objects,
+        n_parts=n_parts,
+        n_attributes=n_attributes,
+        seed=seed,
+        n_draw=n_draw,
+    )
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        corpus = tmp / "corpus"
+        corpus.mkdir()
+        files = make_corpus(
+            corpus, n_files, max_objects, seed, min_objects, n_parts, n_attributes
+        )
+        for case in make_cases(files, tmp, n_draw):
+            if cases is not None and case.name not in cases:
+                continue
+            results[case.name] = run_case(case, memory)
+    return dict(
+        version=_VERSION,
+        environment=_environment(),
+        config=config,
+        results=results,
+    )
+
+
+def _environment() -> dict:
+    try:
+        from importlib.metadata import version
+
+        package_version = version("pascal_voc")
+    except Exception:
+        package_version = None
+    return dict(
+        pascal_voc=package_version,
+        python=sys.version.split()[0],
+        platform=platform.platform(),
+        numpy=np.__version__,
+        pillow=Image.__version__,
+        timestamp=datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    )
+
+
+def compare(baseline: dict, current: dict, threshold: float = 0.25) -> Dict[str, float]:
+    """
+    Relative change of median latency of cases present in both runs
+
+    Returns
+    -------
+    dict of case name and change, e.g. 0.25 is 25% slower,
+    cases slower than threshold are regressions
+    """
+    if baseline.get("config") != current.get("config"):
+        print("Warning: runs have different config", file=sys.stderr)
+    changes = {}
+    for name, res in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None or not base.get("p50_ms") or "p50_ms" not in res:
+            continue
+        changes[name] = res["p50_ms"] / base["p50_ms"] - 1
+    for name, change in changes.items():
+        mark = "REGRESSION" if change > threshold else ""
+        print(f"{name:24} {change:+8.1%} {mark}")
+    return changes
+
+
+def _print_results(results: Dict[str, dict]):
+    for name, res in results.items():
+        line = f"{name:24} {res['per_second']:10.0f}/s"
+        if "p50_ms" in res:
+            line += f"  p50 {res['p50_ms']:8.3f}ms  p99 {res['p99_ms']:8.3f}ms"
+        if "peak_memory_kb" in res:
+            line += f"  peak {res['peak_memory_kb']:10.1f}KB"
+        print(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n-files", type=int, default=1000)
+    parser.add_argument("--max-objects", type=int, default=8)
+    parser.add_argument("--min-objects", type=int, default=1)
+    parser.add_argument("--n-parts", type=int, default=0)
+    parser.add_argument("--n-attributes", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--n-draw", type=int, default=50)
+    parser.add_argument("--cases", nargs="*", help="case names, all cases if empty")
+    parser.add_argument("--no-memory", action="store_true")
+    parser.add_argument("--out", type=Path, help="output json file")
+    parser.add_argument("--baseline", type=Path, help="json file of previous run")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="median latency increase reported as regression",
+    )
+    args = parser.parse_args()
+    run = run_suite(
+        n_files=args.n_files,
+        max_objects=args.max_objects,
+        min_objects=args.min_objects,
+        n_parts=args.n_parts,
+        n_attributes=args.n_attributes,
+        seed=args.seed,
+        n_draw=args.n_draw,
+        cases=args.cases or None,
+        memory=not args.no_memory,
+    )
+    _print_results(run["results"])
+    if args.out is not None:
+        with open(args.out, "w") as f:
+            json.dump(run, f, indent=2)
+    if args.baseline is not None:
+        with open(args.baseline, "r") as f:
+            changes = compare(json.load(f), run, args.threshold)
+        if any(change > args.threshold for change in changes.values()):
+            sys.exit(1)
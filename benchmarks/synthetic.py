@@ -0,0 +1,169 @@
+"""
+Deterministic synthetic PascalVOC corpus
+The same arguments always give the same files, so results of different
+versions are measured on the same data
+"""
+
+import random
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+from pascal.voc_parser import annotation_from_voc
+
+NAMES = ["person", "car", "dog", "cat", "bicycle", "chair", "bottle", "train"]
+PART_NAMES = ["head", "hand", "foot"]
+
+_BNDBOX = """<bndbox>
+{indent}    <xmin>{xmin}</xmin>
+{indent}    <ymin>{ymin}</ymin>
+{indent}    <xmax>{xmax}</xmax>
+{indent}    <ymax>{ymax}</ymax>
+{indent}</bndbox>"""
+
+_PART = """        <part>
+            <name>{name}</name>
+            {bndbox}
+        </part>
+"""
+
+_OBJECT = """    <object>
+        <name>{name}</name>
+        <pose>Unspecified</pose>
+        <truncated>{truncated}</truncated>
+        <difficult>{difficult}</difficult>
+{attributes}        {bndbox}
+{parts}    </object>
+"""
+
+_ANNOTATION = """<annotation>
+    <folder>VOC2007</folder>
+    <filename>{filename}</filename>
+    <source>
+        <database>Synthetic</database>
+    </source>
+    <size>
+        <width>{width}</width>
+        <height>{height}</height>
+        <depth>3</depth>
+    </size>
+    <segmented>0</segmented>
+{objects}</annotation>
+"""
+
+
+def _random_box(
+    rnd: random.Random, x0: int, y0: int, x1: int, y1: int
+) -> Tuple[int, int, int, int]:
+    xmin, ymin = rnd.randint(x0, x1 - 2), rnd.randint(y0, y1 - 2)
+    return xmin, ymin, rnd.randint(xmin + 1, x1), rnd.randint(ymin + 1, y1)
+
+
+def _bndbox(box: Tuple[int, int, int, int], indent: str) -> str:
+    xmin, ymin, xmax, ymax = box
+    return _BNDBOX.format(indent=indent, xmin=xmin, ymin=ymin, xmax=xmax, ymax=ymax)
+
+
+def make_annotation(
+    rnd: random.Random,
+    index: int,
+    max_objects: int,
+    min_objects: int = 1,
+    n_parts: int = 0,
+    n_attributes: int = 0,
+) -> str:
+    """
+    Text of one annotation file
+
+    Parameters
+    ----------
+    rnd: random generator
+    index: file index, image file name is {index:06d}.jpg
+    max_objects, min_objects: number of objects limits
+    n_parts: number of nested parts of every object
+    n_attributes: number of extra numeric attributes attr_0, attr_1... of every object
+    """
+    width, height = rnd.randint(200, 1000), rnd.randint(200, 1000)
+    objects = []
+    for _ in range(rnd.randint(min_objects, max_objects)):
+        # order of random calls gives the same files as earlier versions
+        xmin, ymin = rnd.randint(0, width - 2), rnd.randint(0, height - 2)
+        name = rnd.choice(NAMES)
+        truncated, difficult = rnd.randint(0, 1), rnd.randint(0, 1)
+        box = xmin, ymin, rnd.randint(xmin + 1, width), rnd.randint(ymin + 1, height)
+        parts = []
+        for _ in range(n_parts):
+            # part is inside object box, degenerate box gets object box
+            xmin, ymin, xmax, ymax = box
+            part = box
+            if xmax - xmin > 2 and ymax - ymin > 2:
+                part = _random_box(rnd, xmin, ymin, xmax, ymax)
+            parts.append(
+                _PART.format(
+                    name=rnd.choice(PART_NAMES), bndbox=_bndbox(part, " " * 12)
+                )
+            )
+        attributes = "".join(
+            f"        <attr_{k}>{rnd.randint(0, 9)}</attr_{k}>\n"
+            for k in range(n_attributes)
+        )
+        objects.append(
+            _OBJECT.format(
+                name=name,
+                truncated=truncated,
+                difficult=difficult,
+                attributes=attributes,
+                bndbox=_bndbox(box, " " * 8),
+                parts="".join(parts),
+            )
+        )
+    return _ANNOTATION.format(
+        filename=f"{index:06d}.jpg",
+        width=width,
+        height=height,
+        objects="".join(objects),
+    )
+
+
+def make_corpus(
+    out_dir: Path,
+    n_files: int,
+    max_objects: int,
+    seed: int = 0,
+    min_objects: int = 1,
+    n_parts: int = 0,
+    n_attributes: int = 0,
+) -> List[Path]:
+    """
+    Write n_files annotation files {index:06d}.xml to out_dir
+
+    Returns
+    -------
+    sorted list of written files
+    """
+    rnd = random.Random(seed)
+    files = []
+    for i in range(n_files):
+        text = make_annotation(rnd, i, max_objects, min_objects, n_parts, n_attributes)
+        file = Path(out_dir) / f"{i:06d}.xml"
+        file.write_text(text)
+        files.append(file)
+    return files
+
+
+def make_yolo_corpus(
+    xml_files: Sequence[Path], out_dir: Path, labels_map: Dict[str, int]
+) -> List[Tuple[Path, int, int]]:
+    """
+    Convert annotation files to yolo files
+
+    Returns
+    -------
+    list of yolo file, image width and height
+    """
+    res = []
+    for file in xml_files:
+        ann = annotation_from_voc(file)
+        yolo_file = Path(out_dir) / file.with_suffix(".txt").name
+        yolo_file.write_text(ann.to_yolo(labels_map))
+        res.append((yolo_file, ann.size.width, ann.size.height))
+    return res
@@ -1,2 +1,7 @@
 from pascal.annotation_fabric import annotation_from_xml
+from pascal.coco import annotations_from_coco, dataset_from_coco, export_coco
+from pascal.dataset import AnnotationDataset, dataset_from_yolo, export_yolo
+from pascal.loader import load_dataset
 from pascal.pascal_annotation import Annotation, annotation_from_yolo
+from pascal.stats import DatasetStats, dataset_stats
+from pascal.voc_parser import annotation_from_voc
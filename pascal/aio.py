@@ -0,0 +1,248 @@
+import asyncio
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Callable, Iterable, Optional, Sequence, Union
+
+from pascal.annotation_fabric import _from_state
+from pascal.convert import (
+    OUTPUT_SUFFIX,
+    ConvertStats,
+    _changed_files,
+    _convert_file,
+    _manifest_options,
+    _record_result,
+)
+from pascal.instrumentation import _bind_active
+from pascal.loader import _load_one
+from pascal.manifest import MANIFEST_NAME, Manifest
+from pascal.protocols import PascalAnnotation
+from pascal.utils import _file_digest
+
+
+async def aload_annotation(
+    file_path: Union[str, Path],
+    attr_type_spec: Optional[dict] = None,
+    clip_zero: bool = True,
+    executor: Optional[Executor] = None,
+    semaphore: Optional[asyncio.Semaphore] = None,
+) -> PascalAnnotation:
+    """
+    Make annotation object from PascalVOC annotation file without blocking event loop
+    File is read and parsed by annotation_from_xml in executor
+
+    Parameters
+    ----------
+    file_path: path to xml file
+    attr_type_spec: dict, optional
+        specify attribute types to explicitly cast attribute values
+    clip_zero: clip negative bbox values to 0
+    executor: thread or process pool, default executor of event loop if None
+    semaphore: optional semaphore shared by calls to limit number of files in progress
+
+    Returns
+    -------
+    Annotation object, ParseException or InconsistentAnnotation is raised
+    if file cannot be parsed
+    """
+    # xmlobj classes cannot be pickled, process worker returns annotation state
+    as_state = isinstance(executor, ProcessPoolExecutor)
+    load = partial(
+        _load_one,
+        Path(file_path),
+        attr_type_spec=attr_type_spec,
+        clip_zero=clip_zero,
+        as_state=as_state,
+    )
+    if not as_state:
+        # executor threads do not get context of the task
+        load = _bind_active(load)
+    loop = asyncio.get_running_loop()
+    if semaphore is None:
+        ann, error = await loop.run_in_executor(executor, load)
+    else:
+        async with semaphore:
+            ann, error = await loop.run_in_executor(executor, load)
+    if error is not None:
+        raise error
+    return _from_state(ann) if as_state else ann
+
+
+def _write_text(out_file: Path, text: str):
+    with open(out_file, "w") as f:
+        f.write(text)
+
+
+def _convert_with_key(convert, file_path: Path):
+    """
+    Conversion result with manifest key of file, key is resolved in executor
+    as resolve may access file system
+    """
+    return convert(file_path), str(file_path.resolve())
+
+
+async def aconvert_dataset(
+    files: Iterable[Union[str, Path]],
+    out_dir: Union[str, Path],
+    to: str,
+    concurrency: Optional[int] = None,
+    executor: Optional[Executor] = None,
+    labels_map: Optional[dict] = None,
+    precision: int = 3,
+    img_dir: Optional[Union[str, Path]] = None,
+    save_img_data: bool = False,
+    attr_type_spec: Optional[dict] = None,
+    progress: Optional[Callable[[int, float], None]] = None,
+    incremental: bool = False,
+    use_hash: bool = False,
+) -> ConvertStats:
+    """
+    Convert PascalVOC annotation files without blocking event loop
+    Files are read and converted in executor, outputs are written by threads
+    of default executor, so reading, parsing and writing of different files overlap.
+    No more than concurrency files are in progress at once
+
+    Parameters
+    ----------
+    files: iterable of xml files, lazy iterables which are not sequences,
+        e.g. Path.glob, are iterated in default executor
+    out_dir: output directory, output file names are source file names with
+        format suffix: .txt for yolo, .json for labelme, .xml for voc
+    to: output format: "yolo", "labelme" or "voc"
+    concurrency: max number of files in progress, 4 * os.cpu_count() if None
+    executor: thread or process pool of conversion,
+        default executor of event loop if None
+    labels_map: dict of label ids, required for yolo
+        {"person": 0, "cat": 1, "dog": 2}
+    precision: yolo coord precision
+    img_dir: labelme images directory
+    save_img_data: if true store encoded image in labelme json
+    attr_type_spec: dict, optional
+        specify attribute types to explicitly cast attribute values
+    progress: callable(number of processed and skipped files, elapsed seconds),
+        called in event loop
+    incremental: convert only files added or modified since previous run,
+        see convert_dataset
+    use_hash: store content hash in manifest, see convert_dataset
+
+    Returns
+    -------
+    ConvertStats
+    """
+    if to not in OUTPUT_SUFFIX:
+        raise ValueError(f"Unknown format: {to}. Use one of {tuple(OUTPUT_SUFFIX)}")
+    if to == "yolo" and labels_map is None:
+        raise ValueError("labels_map is required for yolo format")
+    if concurrency is None:
+        concurrency = 4 * (os.cpu_count() or 1)
+    loop = asyncio.get_running_loop()
+    out_dir = Path(out_dir)
+    await loop.run_in_executor(
+        None, partial(out_dir.mkdir, parents=True, exist_ok=True)
+    )
+    suffix = OUTPUT_SUFFIX[to]
+    convert = partial(
+        _convert_file,
+        to=to,
+        labels_map=labels_map,
+        precision=precision,
+        img_dir=None if img_dir is None else Path(img_dir),
+        save_img_data=save_img_data,
+        attr_type_spec=attr_type_spec,
+        out_dir=out_dir,
+        suffix=suffix,
+    )
+    if not isinstance(executor, ProcessPoolExecutor):
+        # executor threads do not get context of the task
+        convert = _bind_active(convert)
+    stats = ConvertStats()
+    start = time.perf_counter()
+    manifest = None
+    fingerprints = {}
+    if incremental:
+        options = _manifest_options(
+            to, labels_map, precision, img_dir, save_img_data, attr_type_spec
+        )
+        manifest = await loop.run_in_executor(
+            None, Manifest.load, out_dir / MANIFEST_NAME, options
+        )
+        files = await loop.run_in_executor(
+            None,
+            _changed_files,
+            files,
+            out_dir,
+            suffix,
+            manifest,
+            fingerprints,
+            stats,
+        )
+
+    if manifest is not None:
+        convert = partial(_convert_with_key, convert)
+
+    async def convert_one(file_path: Path):
+        key = None
+        if manifest is None:
+            text, error = await loop.run_in_executor(executor, convert, file_path)
+        else:
+            (text, error), key = await loop.run_in_executor(
+                executor, convert, file_path
+            )
+        if error is None and text is not None:
+            out_file = out_dir / file_path.with_suffix(suffix).name
+            await loop.run_in_executor(None, _write_text, out_file, text)
+        if error is None and manifest is not None and use_hash:
+            # hash is stored by _record_result, it is computed here not to block loop
+            record = fingerprints[key]
+            if "hash" not in record:
+                record["hash"] = await loop.run_in_executor(
+                    None, _file_digest, file_path
+                )
+        _record_result(
+            file_path, error, suffix, stats, manifest, fingerprints, use_hash, key
+        )
+        if progress is not None:
+            done = stats.converted + stats.skipped + len(stats.errors)
+            progress(done, time.perf_counter() - start)
+
+    # concurrency workers take files from one iterator, so files in progress
+    # are limited. Files are not listed in memory, except changed files in
+    # incremental mode
+    if isinstance(files, Sequence):
+        file_iter = iter(files)
+
+        async def next_file():
+            return next(file_iter, None)
+
+    else:
+        # lazy iterable may list directories, so it is iterated in executor
+        # by one worker at a time
+        file_iter = await loop.run_in_executor(None, iter, files)
+        lock = asyncio.Lock()
+
+        async def next_file():
+            async with lock:
+                return await loop.run_in_executor(None, next, file_iter, None)
+
+    async def worker():
+        while True:
+            file_path = await next_file()
+            if file_path is None:
+                return
+            await convert_one(Path(file_path))
+
+    tasks = [asyncio.ensure_future(worker()) for _ in range(max(1, concurrency))]
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+    finally:
+        if manifest is not None:
+            await loop.run_in_executor(None, manifest.save)
+    stats.elapsed = time.perf_counter() - start
+    return stats
@@ -1,6 +1,6 @@
-from copy import deepcopy
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, Union
+from typing import Optional, Tuple, Union
 
 from xmlobj import get_xml_obj
 from xmlobj.xmlmapping import XMLMixin
@@ -8,10 +8,52 @@ from xmlobj.xmlmapping import XMLMixin
 from pascal.draw_objects import DrawObjectsMixin
 from pascal.exceptions import InconsistentAnnotation, ParseException
 from pascal.format_convertor import FormatConvertorMixin
+from pascal.instrumentation import _start, _stop
 from pascal.protocols import PascalAnnotation, Size
 from pascal.utils import _is_primitive, _check_bnd_box
 
 
+@lru_cache(maxsize=None)
+def _node_class(name: str, is_root: bool) -> type:
+    cls_ = type(name, (), {})
+    if is_root:
+        return type(name, (cls_, XMLMixin, DrawObjectsMixin, FormatConvertorMixin), {})
+    return type(name, (cls_, XMLMixin), {})
+
+
+def _to_state(obj: XMLMixin) -> Tuple[str, tuple]:
+    """
+    Convert annotation to a tree of builtin types, which can be pickled
+    and sent between processes.
+    xmlobj classes are generated on the fly, so annotation objects cannot be pickled directly
+    """
+    items = []
+    for attr_name, attr_val in obj.__dict__.items():
+        if isinstance(attr_val, list):
+            attr_val = [_to_state(item) for item in attr_val]
+        elif not _is_primitive(attr_val):
+            attr_val = _to_state(attr_val)
+        items.append((attr_name, attr_val))
+    return obj.__class__.__name__, tuple(items)
+
+
+def _from_state(
+    state: Tuple[str, tuple], is_root: bool = True
+) -> Union[PascalAnnotation, DrawObjectsMixin, FormatConvertorMixin, XMLMixin]:
+    """
+    Make annotation object from the tree returned by _to_state
+    """
+    name, items = state
+    obj = _node_class(name, is_root)()
+    for attr_name, attr_val in items:
+        if isinstance(attr_val, list):
+            attr_val = [_from_state(item, False) for item in attr_val]
+        elif isinstance(attr_val, tuple):
+            attr_val = _from_state(attr_val, False)
+        setattr(obj, attr_name, attr_val)
+    return obj
+
+
 def annotation_from_xml(
     file_path: Union[str, Path],
     attr_type_spec: Optional[dict] = None,
@@ -31,6 +73,7 @@ def annotation_from_xml(
     -------
     Annotation object
     """
+    start = _start()
     try:
         obj = get_xml_obj(
             file_path,
@@ -39,12 +82,15 @@ def annotation_from_xml(
         )
     except Exception as ex:
         raise ParseException(ex)
+    _stop("parse", start)
+    start = _start()
+    objects = None
     if hasattr(obj, "object"):
         obj_ = getattr(obj, "object")
         if isinstance(obj_, list):
-            objects = [deepcopy(obj) for obj in obj_]
+            objects = obj_
         elif not _is_primitive(obj_):
-            objects = [deepcopy(obj_)]
+            objects = [obj_]
         else:
             raise ParseException("Cannot parse objects")
         setattr(obj, "objects", objects)
@@ -54,6 +100,11 @@ def annotation_from_xml(
             obj.size, Size
         ):
             raise InconsistentAnnotation(f"File {file_path} is not PascalVOCAnnotation")
-    for object in obj:
+    if objects is None:
+        objects = obj.objects
+    # parsed objects are owned by annotation, so they are adopted without copy,
+    # box of every object is checked and clipped in the same pass
+    for object in objects:
         object.bndbox = _check_bnd_box(object.bndbox, clip_zero)
+    _stop("adopt", start)
     return obj
@@ -0,0 +1,286 @@
+from typing import Optional, Tuple, Union
+
+import numpy as np
+
+from pascal.dataset import AnnotationDataset
+from pascal.instrumentation import _skip_object
+from pascal.protocols import PascalAnnotation
+from pascal.protocols import PascalObject as PascalObjectProtocol
+from pascal.spatial import _default_cell_size, _GridIndex, _ranges
+
+
+def pairwise_iou(boxes1: np.ndarray, boxes2: np.ndarray) -> np.ndarray:
+    """
+    IoU of every pair of boxes
+
+    Parameters
+    ----------
+    boxes1: (n, 4) array of xmin, ymin, xmax, ymax
+    boxes2: (m, 4) array of xmin, ymin, xmax, ymax
+
+    Returns
+    -------
+    (n, m) array, IoU of boxes with zero union is 0
+    """
+    a = np.asarray(boxes1, dtype=np.float64).reshape(-1, 1, 4)
+    b = np.asarray(boxes2, dtype=np.float64).reshape(1, -1, 4)
+    inter_w = np.minimum(a[..., 2], b[..., 2]) - np.maximum(a[..., 0], b[..., 0])
+    inter_h = np.minimum(a[..., 3], b[..., 3]) - np.maximum(a[..., 1], b[..., 1])
+    inter = np.clip(inter_w, 0, None) * np.clip(inter_h, 0, None)
+    area_a = (a[..., 2] - a[..., 0]) * (a[..., 3] - a[..., 1])
+    area_b = (b[..., 2] - b[..., 0]) * (b[..., 3] - b[..., 1])
+    union = area_a + area_b - inter
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(union > 0, inter / union, 0.0)
+
+
+def _pair_iou(boxes: np.ndarray, i: np.ndarray, j: np.ndarray) -> np.ndarray:
+    a, b = boxes[i], boxes[j]
+    inter_w = np.minimum(a[:, 2], b[:, 2]) - np.maximum(a[:, 0], b[:, 0])
+    inter_h = np.minimum(a[:, 3], b[:, 3]) - np.maximum(a[:, 1], b[:, 1])
+    inter = np.clip(inter_w, 0, None) * np.clip(inter_h, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    union = area_a + area_b - inter
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(union > 0, inter / union, 0.0)
+
+
+def _overlapping_pairs(
+    boxes: np.ndarray, groups: Optional[np.ndarray] = None
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Pairs i < j of boxes of the same group which have common area, with their IoU
+    Candidates are boxes registered in the same grid cell and boxes intersecting
+    regions of large boxes, so no all pairs are compared
+    """
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+    n_boxes = len(boxes)
+    if groups is None:
+        groups = np.zeros(n_boxes, dtype=np.int64)
+    unique_groups, groups = np.unique(groups, return_inverse=True)
+    groups = groups.reshape(-1)
+    grid = _GridIndex(boxes, groups, len(unique_groups), _default_cell_size(boxes))
+    keys, ids = grid._keys, grid._ids
+    # every entry is paired with the next entries of the same cell
+    starts = np.flatnonzero(np.concatenate([[True], keys[1:] != keys[:-1]]))
+    ends = np.append(starts[1:], len(keys))
+    run_ends = np.repeat(ends, ends - starts)
+    positions = np.arange(len(keys))
+    second = _ranges(positions + 1, run_ends)
+    first = np.repeat(positions, run_ends - positions - 1)
+    a, b = [ids[first]], [ids[second]]
+    # large boxes are not in cells, they are paired with candidates of their region
+    for box_id in grid._large_ids:
+        candidates = grid._candidates(int(groups[box_id]), tuple(boxes[box_id]))
+        candidates = candidates[candidates != box_id]
+        a.append(np.full(len(candidates), box_id))
+        b.append(candidates)
+    a, b = np.concatenate(a), np.concatenate(b)
+    if len(a) == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, np.empty(0)
+    # boxes sharing several cells make the same pair several times
+    pair_keys = np.unique(np.minimum(a, b) * n_boxes + np.maximum(a, b))
+    i, j = np.divmod(pair_keys, n_boxes)
+    iou = _pair_iou(boxes, i, j)
+    mask = iou > 0
+    return i[mask], j[mask], iou[mask]
+
+
+def find_duplicates(
+    boxes: np.ndarray,
+    labels: Optional[np.ndarray] = None,
+    iou_threshold: float = 0.9,
+    groups: Optional[np.ndarray] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Find pairs of duplicate boxes of the same label
+
+    Parameters
+    ----------
+    boxes: (n, 4) array of xmin, ymin, xmax, ymax
+    labels: (n,) array of box labels, all boxes have one label if None
+    iou_threshold: pair with IoU >= iou_threshold is duplicate,
+        1.0 finds boxes with equal coordinates
+    groups: (n,) array of box groups, e.g. image index, boxes of different groups
+        are not compared
+
+    Returns
+    -------
+    (k, 2) array of pairs of box indices i < j sorted by i, j and (k,) array of IoU
+    """
+    if not 0 < iou_threshold <= 1:
+        raise ValueError("iou_threshold must be in (0, 1]")
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+    keys = np.zeros((len(boxes), 2), dtype=np.int64)
+    if groups is not None:
+        keys[:, 0] = np.unique(np.asarray(groups), return_inverse=True)[1].reshape(-1)
+    if labels is not None:
+        keys[:, 1] = np.unique(np.asarray(labels), return_inverse=True)[1].reshape(-1)
+    group_keys = keys[:, 0] * (int(keys[:, 1].max(initial=0)) + 1) + keys[:, 1]
+    i, j, iou = _overlapping_pairs(boxes, group_keys)
+    mask = iou >= iou_threshold
+    return np.stack([i[mask], j[mask]], axis=1), iou[mask]
+
+
+def _greedy_keep(
+    n_boxes: int, i: np.ndarray, j: np.ndarray, order: np.ndarray
+) -> np.ndarray:
+    """
+    Greedy suppression: box in priority order is kept if no kept box suppressed it,
+    kept box suppresses all its neighbours of lower priority
+    """
+    keep = np.ones(n_boxes, dtype=bool)
+    if len(i) == 0:
+        return keep
+    rank = np.empty(n_boxes, dtype=np.int64)
+    rank[order] = np.arange(n_boxes)
+    # edges from higher to lower priority box
+    src = np.where(rank[i] < rank[j], i, j)
+    dst = np.where(rank[i] < rank[j], j, i)
+    edge_order = np.argsort(src, kind="stable")
+    src, dst = src[edge_order], dst[edge_order]
+    starts = np.searchsorted(src, np.arange(n_boxes + 1))
+    has_edges = starts[1:] > starts[:-1]
+    suppressed = np.zeros(n_boxes, dtype=bool)
+    for box in order[has_edges[order]].tolist():
+        if not suppressed[box]:
+            suppressed[dst[starts[box] : starts[box + 1]]] = True
+    keep[suppressed] = False
+    return keep
+
+
+def _priority(n_boxes: int, scores: Optional[np.ndarray]) -> np.ndarray:
+    """
+    Box indices by decreasing score, by input order if scores is None
+    """
+    if scores is None:
+        return np.arange(n_boxes)
+    scores = np.asarray(scores, dtype=np.float64)
+    return np.argsort(-np.nan_to_num(scores, nan=-np.inf), kind="stable")
+
+
+def nms(
+    boxes: np.ndarray,
+    scores: Optional[np.ndarray] = None,
+    iou_threshold: float = 0.5,
+    labels: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Greedy non-maximum suppression
+    Box is suppressed by kept box of higher score with IoU > iou_threshold
+
+    Parameters
+    ----------
+    boxes: (n, 4) array of xmin, ymin, xmax, ymax
+    scores: (n,) array of box scores, earlier box has higher priority if None
+    iou_threshold: IoU threshold
+    labels: (n,) array of box labels, boxes of different labels do not suppress
+        each other
+
+    Returns
+    -------
+    indices of kept boxes in order of decreasing score
+    """
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+    i, j, iou = _overlapping_pairs(boxes, labels)
+    mask = iou > iou_threshold
+    order = _priority(len(boxes), scores)
+    keep = _greedy_keep(len(boxes), i[mask], j[mask], order)
+    return order[keep[order]]
+
+
+def _annotation_boxes(ann: PascalAnnotation) -> Tuple[np.ndarray, list, np.ndarray]:
+    positions = []
+    boxes = []
+    names = []
+    for position, obj in enumerate(ann.objects):
+        if not isinstance(obj, PascalObjectProtocol):
+            _skip_object()
+            continue
+        box = obj.bndbox
+        positions.append(position)
+        boxes.append((box.xmin, box.ymin, box.xmax, box.ymax))
+        names.append(str(obj.name))
+    boxes = np.array(boxes, dtype=np.float64).reshape(-1, 4)
+    return boxes, names, np.array(positions, dtype=np.int64)
+
+
+def annotation_duplicates(
+    ann: PascalAnnotation, iou_threshold: float = 0.9
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Find pairs of duplicate objects of the same name in annotation
+
+    Returns
+    -------
+    (k, 2) array of pairs of indices in ann.objects and (k,) array of IoU
+    """
+    boxes, names, positions = _annotation_boxes(ann)
+    pairs, iou = find_duplicates(boxes, np.array(names, dtype=object), iou_threshold)
+    return positions[pairs], iou
+
+
+def annotation_nms(
+    ann: PascalAnnotation,
+    iou_threshold: float = 0.5,
+    scores: Optional[np.ndarray] = None,
+) -> list:
+    """
+    Objects of annotation kept by class-wise greedy NMS, in order of ann.objects
+    Earlier object has higher priority if scores is None
+    """
+    boxes, names, positions = _annotation_boxes(ann)
+    if scores is not None:
+        scores = np.asarray(scores, dtype=np.float64)[positions]
+    keep = nms(boxes, scores, iou_threshold, np.array(names, dtype=object))
+    objects = ann.objects
+    return [objects[p] for p in np.sort(positions[keep]).tolist()]
+
+
+def dataset_duplicates(
+    dataset: AnnotationDataset, iou_threshold: float = 0.9
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Find pairs of duplicate objects of the same name in every image of dataset
+
+    Returns
+    -------
+    (k, 2) array of pairs of object indices in dataset and (k,) array of IoU
+    """
+    return find_duplicates(
+        dataset.boxes, dataset.label_ids, iou_threshold, dataset.image_ids()
+    )
+
+
+def dataset_nms(
+    dataset: AnnotationDataset,
+    iou_threshold: float = 0.5,
+    scores: Optional[Union[str, np.ndarray]] = None,
+) -> np.ndarray:
+    """
+    Class-wise greedy NMS in every image of dataset
+
+    Parameters
+    ----------
+    dataset: AnnotationDataset
+    iou_threshold: box is suppressed by kept box of the same image and name
+        with higher score and IoU > iou_threshold
+    scores: (n_objects,) array or name of attribute column, e.g. "confidence".
+        Earlier object has higher priority if None
+
+    Returns
+    -------
+    (n_objects,) bool mask of kept objects
+    """
+    if isinstance(scores, str):
+        scores = dataset.attributes[scores]
+    boxes = np.asarray(dataset.boxes, dtype=np.float64)
+    image_ids = dataset.image_ids()
+    n_labels = max(len(dataset.names), 1)
+    groups = image_ids * n_labels + dataset.label_ids
+    i, j, iou = _overlapping_pairs(boxes, groups)
+    mask = iou > iou_threshold
+    order = _priority(len(boxes), scores)
+    return _greedy_keep(len(boxes), i[mask], j[mask], order)
@@ -0,0 +1,199 @@
+import hashlib
+import mmap
+import os
+import pickle
+from pathlib import Path
+from typing import Optional, Tuple, Union
+
+from xmlobj.xmlmapping import XMLMixin
+
+from pascal.annotation_fabric import _from_state, _to_state, annotation_from_xml
+from pascal.draw_objects import DrawObjectsMixin
+from pascal.format_convertor import FormatConvertorMixin
+from pascal.protocols import PascalAnnotation
+from pascal.utils import _file_digest, _type_name
+
+_CACHE_VERSION = 1
+
+
+def _cache_key(attr_type_spec: Optional[dict], clip_zero: bool) -> Optional[str]:
+    """
+    Name of cache files, None if attr_type_spec has types without stable name
+    """
+    spec = []
+    if attr_type_spec is not None:
+        spec = sorted((k, _type_name(t)) for k, t in attr_type_spec.items())
+        if any(name is None for _, name in spec):
+            return None
+    key = repr((_CACHE_VERSION, spec, clip_zero))
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+
+class ParseCache:
+    """
+    On-disk cache of annotation_from_xml results
+
+    Parsed annotations are pickled to a single append-only data file, which is read
+    through memory mapping. Index maps file path to file size, modification time,
+    optional content hash and record position.
+    Cache files depend on attr_type_spec and clip_zero, so several configurations
+    may share one cache directory. Cache must not be written by several processes at once.
+    Types of attr_type_spec are identified by name, so lambdas and local functions
+    are not accepted, ValueError is raised
+
+    Parameters
+    ----------
+    cache_dir: cache directory
+    attr_type_spec: dict, optional
+        specify attribute types to explicitly cast attribute values
+    clip_zero: clip negative bbox values to 0
+    use_hash: if true, file with changed modification time is parsed again
+        only if its content hash has changed
+    """
+
+    def __init__(
+        self,
+        cache_dir: Union[str, Path],
+        attr_type_spec: Optional[dict] = None,
+        clip_zero: bool = True,
+        use_hash: bool = False,
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.attr_type_spec = attr_type_spec
+        self.clip_zero = clip_zero
+        self.use_hash = use_hash
+        key = _cache_key(attr_type_spec, clip_zero)
+        if key is None:
+            raise ValueError(
+                "attr_type_spec with lambda or local function cannot be cached"
+            )
+        self._index_path = self.cache_dir / f"{key}.idx"
+        self._data_path = self.cache_dir / f"{key}.bin"
+        self._index = {}
+        if self._index_path.exists():
+            with open(self._index_path, "rb") as f:
+                self._index = pickle.load(f)
+        self._data = open(self._data_path, "a+b")
+        self._mmap = None
+        self._changed = False
+
+    def __len__(self):
+        return len(self._index)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _read(self, offset: int, length: int) -> Tuple[str, tuple]:
+        if self._mmap is None or offset + length > len(self._mmap):
+            self._data.flush()
+            if self._mmap is not None:
+                self._mmap.close()
+            self._mmap = mmap.mmap(self._data.fileno(), 0, access=mmap.ACCESS_READ)
+        return pickle.loads(self._mmap[offset : offset + length])
+
+    def get_state(self, file_path: Union[str, Path]) -> Optional[Tuple[str, tuple]]:
+        """
+        Cached annotation state (see annotation_fabric._to_state) or None if file has changed
+        """
+        key = str(Path(file_path).resolve())
+        record = self._index.get(key)
+        if record is None:
+            return None
+        size, mtime_ns, digest, offset, length = record
+        stat = os.stat(file_path)
+        if stat.st_size != size:
+            return None
+        if stat.st_mtime_ns != mtime_ns:
+            if not self.use_hash or _file_digest(file_path) != digest:
+                return None
+            self._index[key] = (size, stat.st_mtime_ns, digest, offset, length)
+            self._changed = True
+        return self._read(offset, length)
+
+    def put_state(
+        self,
+        file_path: Union[str, Path],
+        state: Tuple[str, tuple],
+        stat: Optional[os.stat_result] = None,
+    ):
+        """
+        Store annotation state
+
+        Parameters
+        ----------
+        file_path: path to xml file
+        state: annotation state
+        stat: file stat taken before parsing, so file changed during parsing is parsed again
+        """
+        if stat is None:
+            stat = os.stat(file_path)
+        digest = _file_digest(file_path) if self.use_hash else None
+        data = pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
+        self._data.seek(0, os.SEEK_END)
+        offset = self._data.tell()
+        self._data.write(data)
+        key = str(Path(file_path).resolve())
+        self._index[key] = (stat.st_size, stat.st_mtime_ns, digest, offset, len(data))
+        self._changed = True
+
+    def load(
+        self, file_path: Union[str, Path]
+    ) -> Union[PascalAnnotation, DrawObjectsMixin, FormatConvertorMixin, XMLMixin]:
+        """
+        Make annotation object from cache or parse file if it has changed
+        """
+        state = self.get_state(file_path)
+        if state is not None:
+            return _from_state(state)
+        stat = os.stat(file_path)
+        ann = annotation_from_xml(file_path, self.attr_type_spec, self.clip_zero)
+        self.put_state(file_path, _to_state(ann), stat)
+        return ann
+
+    def flush(self):
+        """
+        Write index to disk
+        """
+        self._data.flush()
+        if not self._changed:
+            return
+        tmp_path = self._index_path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as f:
+            pickle.dump(self._index, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self._index_path)
+        self._changed = False
+
+    def compact(self):
+        """
+        Remove records of deleted files and outdated records from data file
+        """
+        index = {}
+        tmp_path = self._data_path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as out:
+            for key, (size, mtime_ns, digest, offset, length) in self._index.items():
+                if not os.path.exists(key):
+                    continue
+                state = self._read(offset, length)
+                data = pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
+                index[key] = (size, mtime_ns, digest, out.tell(), len(data))
+                out.write(data)
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._data.close()
+        os.replace(tmp_path, self._data_path)
+        self._data = open(self._data_path, "a+b")
+        self._index = index
+        self._changed = True
+        self.flush()
+
+    def close(self):
+        self.flush()
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._data.close()
@@ -0,0 +1,144 @@
+import argparse
+import json
+import sys
+import time
+from contextlib import nullcontext
+from pathlib import Path
+from typing import List, Optional, Union
+
+from pascal.convert import OUTPUT_SUFFIX, convert_dataset
+from pascal.instrumentation import Instrumentation, instrument
+from pascal.loader import list_annotation_files
+
+
+def read_labels_map(file_path: Union[str, Path]) -> dict:
+    """
+    Read labels map from json file {"person": 0, "cat": 1}
+    or from text file with one label per line, label id is line number
+    """
+    file_path = Path(file_path)
+    with open(file_path, "r") as f:
+        if file_path.suffix == ".json":
+            return json.load(f)
+        labels = [line.strip() for line in f.readlines()]
+    return {name: i for i, name in enumerate(labels) if name}
+
+
+class _Progress:
+    def __init__(self, total: int, interval: float = 0.5):
+        self.total = total
+        self.interval = interval
+        self._last = None
+
+    def __call__(self, done: int, elapsed: float):
+        if self._last is not None and elapsed - self._last < self.interval:
+            return
+        self._last = elapsed
+        rate = done / elapsed if elapsed > 0 else 0.0
+        sys.stderr.write(f"\r{done}/{self.total} files, {rate:.1f} files/s")
+        sys.stderr.flush()
+
+    def close(self, done: int, elapsed: float):
+        self._last = None
+        self(done, elapsed)
+        sys.stderr.write("\n")
+
+
+def _print_profile(instrumentation: Instrumentation):
+    report = instrumentation.report()
+    for stage, stats in report["stages"].items():
+        sys.stderr.write(f"{stage}: {stats['seconds']:.3f}s, {stats['calls']} calls\n")
+    for name, n in report["counters"].items():
+        sys.stderr.write(f"{name}: {n}\n")
+
+
+def _convert(args: argparse.Namespace) -> int:
+    labels_map = None
+    if args.labels_map is not None:
+        labels_map = read_labels_map(args.labels_map)
+    if args.to == "yolo" and labels_map is None:
+        sys.stderr.write("--labels-map is required for yolo format\n")
+        return 2
+    files = list_annotation_files(args.src)
+    progress = None if args.quiet else _Progress(len(files))
+    start = time.perf_counter()
+    with instrument() if args.profile else nullcontext() as instrumentation:
+        stats = convert_dataset(
+            files,
+            args.out,
+            args.to,
+            workers=args.workers,
+            backend=args.backend,
+            labels_map=labels_map,
+            precision=args.precision,
+            img_dir=args.img_dir,
+            save_img_data=args.save_img_data,
+            progress=progress,
+            incremental=args.incremental,
+            use_hash=args.use_hash,
+        )
+    if progress is not None:
+        done = stats.converted + stats.skipped + len(stats.errors)
+        progress.close(done, stats.elapsed)
+    for file_path, ex in stats.errors:
+        sys.stderr.write(f"Cannot convert {file_path}: {ex}\n")
+    elapsed = time.perf_counter() - start
+    print(
+        f"converted: {stats.converted}, skipped: {stats.skipped}, "
+        f"removed: {stats.removed}, errors: {len(stats.errors)}, "
+        f"{elapsed:.2f}s, {stats.files_per_second:.1f} files/s"
+    )
+    if instrumentation is not None:
+        _print_profile(instrumentation)
+    return 1 if stats.errors else 0
+
+
+def make_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="pascal", description="Tool to work with annotation formats"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    convert = commands.add_parser("convert", help="Convert annotation files")
+    convert.add_argument("src", type=Path, help="directory with xml annotations")
+    convert.add_argument("out", type=Path, help="output directory")
+    convert.add_argument("--from", dest="from_", choices=["voc"], default="voc")
+    convert.add_argument("--to", choices=list(OUTPUT_SUFFIX), required=True)
+    convert.add_argument("--workers", type=int, default=None)
+    convert.add_argument("--backend", choices=["process", "thread"], default="process")
+    convert.add_argument(
+        "--labels-map",
+        type=Path,
+        default=None,
+        help="json file with label ids or text file with one label per line",
+    )
+    convert.add_argument("--precision", type=int, default=3)
+    convert.add_argument("--img-dir", type=Path, default=None)
+    convert.add_argument("--save-img-data", action="store_true")
+    convert.add_argument(
+        "--incremental",
+        action="store_true",
+        help="convert only added or modified files, delete outputs of removed files",
+    )
+    convert.add_argument(
+        "--use-hash",
+        action="store_true",
+        help="check content hash of files with changed modification time",
+    )
+    convert.add_argument("--quiet", action="store_true")
+    convert.add_argument(
+        "--profile",
+        action="store_true",
+        help="print time of parse, conversion and serialization stages "
+        "and number of skipped objects",
+    )
+    convert.set_defaults(func=_convert)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = make_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
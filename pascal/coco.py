@@ -0,0 +1,385 @@
+import json
+import logging
+import os
+import tempfile
+from dataclasses import dataclass, field
+from functools import partial
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+from pascal.convert import _BACKENDS, _run_pipeline
+from pascal.dataset import AnnotationDataset
+from pascal.exceptions import InconsistentAnnotation, ParseException
+from pascal.instrumentation import UNMAPPED_LABEL, _skip_object, _start, _stop, count
+from pascal.pascal_annotation import Annotation
+from pascal.protocol_implementations import BndBox, Object, Size
+from pascal.protocols import PascalAnnotation, PascalObject
+from pascal.protocols import Size as SizeProtocol
+from pascal.voc_parser import annotation_from_voc
+
+_SUPERCATEGORY = "none"
+
+
+@dataclass
+class CocoStats:
+    images: int = 0
+    annotations: int = 0
+    skipped: int = 0
+    categories: Dict[str, int] = field(default_factory=dict)
+    errors: List[Tuple[Path, Exception]] = field(default_factory=list)
+
+
+def _image_record(ann: PascalAnnotation) -> tuple:
+    """
+    Plain record of annotation, which can be pickled:
+    file name, width, height, objects (name, xmin, ymin, xmax, ymax) and
+    number of skipped objects
+    """
+    if not isinstance(ann.size, SizeProtocol):
+        raise InconsistentAnnotation(
+            "Incorrect size. Size must have width and height attributes"
+        )
+    objects = []
+    skipped = 0
+    for obj in ann.objects:
+        if not isinstance(obj, PascalObject):
+            _skip_object()
+            skipped += 1
+            continue
+        box = obj.bndbox
+        objects.append((str(obj.name), box.xmin, box.ymin, box.xmax, box.ymax))
+    return str(ann.filename), ann.size.width, ann.size.height, objects, skipped
+
+
+def _parse_chunk(
+    chunk: Tuple[int, list], attr_type_spec: Optional[dict]
+) -> Tuple[list, None]:
+    """
+    Parse files of chunk to (image record, error) pairs,
+    records of annotation objects are made in calling thread
+    """
+    _, items = chunk
+    records = []
+    for item in items:
+        if isinstance(item, Path):
+            try:
+                item = _image_record(annotation_from_voc(item, attr_type_spec)), None
+            except (ParseException, InconsistentAnnotation, OSError) as ex:
+                # exception arguments may hold objects which cannot be pickled
+                item = (item, type(ex)(str(ex)))
+        records.append(item)
+    return records, None
+
+
+def _chunks(
+    annotations: Iterable[Union[str, Path, PascalAnnotation]], chunksize: int
+) -> Iterator[Tuple[int, list]]:
+    """
+    Numbered chunks of files and records of annotation objects in input order
+    """
+    annotations = iter(annotations)
+    index = 0
+    while True:
+        items = []
+        for item in islice(annotations, chunksize):
+            if isinstance(item, (str, Path)):
+                items.append(Path(item))
+            else:
+                items.append((_image_record(item), None))
+        if not items:
+            return
+        yield index, items
+        index += 1
+
+
+def _format_records(
+    records: list,
+    stats: CocoStats,
+    fixed_categories: bool,
+    missing: Dict[str, int],
+) -> Tuple[str, str]:
+    """
+    Assign ids to image records in input order and format them to json array items
+    """
+    categories = stats.categories
+    images = []
+    objects = []
+    for record, error in records:
+        if error is not None:
+            stats.errors.append((record, error))
+            continue
+        file_name, width, height, image_objects, skipped = record
+        stats.skipped += skipped
+        stats.images += 1
+        image_id = stats.images
+        images.append(
+            json.dumps(
+                dict(id=image_id, file_name=file_name, width=width, height=height)
+            )
+        )
+        for name, xmin, ymin, xmax, ymax in image_objects:
+            category_id = categories.get(name)
+            if category_id is None:
+                if fixed_categories:
+                    missing[name] = missing.get(name, 0) + 1
+                    count(UNMAPPED_LABEL)
+                    stats.skipped += 1
+                    continue
+                category_id = categories[name] = len(categories) + 1
+            stats.annotations += 1
+            objects.append(
+                json.dumps(
+                    dict(
+                        id=stats.annotations,
+                        image_id=image_id,
+                        category_id=category_id,
+                        bbox=[xmin, ymin, xmax - xmin, ymax - ymin],
+                        area=(xmax - xmin) * (ymax - ymin),
+                        iscrowd=0,
+                    )
+                )
+            )
+    return ",\n".join(images), ",\n".join(objects)
+
+
+def export_coco(
+    annotations: Iterable[Union[str, Path, PascalAnnotation]],
+    output: Union[str, Path],
+    categories: Optional[Union[List[str], Dict[str, int]]] = None,
+    workers: Optional[int] = None,
+    backend: str = "process",
+    attr_type_spec: Optional[dict] = None,
+    chunksize: int = 64,
+    queue_size: Optional[int] = None,
+) -> CocoStats:
+    """
+    Write annotations to COCO json file
+    Xml files are parsed by workers in chunks, ids are assigned and records are
+    formatted in calling thread in input order, so output is the same for any
+    number of workers. Formatted images are written to output and annotations
+    to temporary file, temporary file is appended to output at the end,
+    so whole document is never held in memory.
+    Image ids are 1-based positions of exported annotations in input, annotation ids
+    are 1-based positions of objects
+
+    Parameters
+    ----------
+    annotations: iterable of xml files or annotation objects,
+        annotation objects are not sent to workers
+    output: output json file
+    categories: list of category names, ids are 1-based positions,
+        or dict of category ids {"person": 1, "cat": 2}.
+        Objects of other categories are skipped.
+        If None, categories get ids in order of first appearance
+    workers: number of workers, os.cpu_count() if None
+    backend: "process" or "thread"
+    attr_type_spec: dict, optional
+        specify attribute types to explicitly cast attribute values
+    chunksize: number of files parsed by worker at once
+    queue_size: max number of chunks in progress, 2 * workers if None
+
+    Returns
+    -------
+    CocoStats: number of images, annotations and skipped objects, category ids,
+    files which cannot be parsed are in errors.
+    InconsistentAnnotation is raised for annotation object without size
+    """
+    if backend not in _BACKENDS:
+        raise ValueError(f"Unknown backend: {backend}. Use one of {_BACKENDS}")
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if queue_size is None:
+        queue_size = 2 * max(1, workers)
+    stats = CocoStats()
+    if isinstance(categories, dict):
+        stats.categories = dict(categories)
+    elif categories is not None:
+        stats.categories = {name: i + 1 for i, name in enumerate(categories)}
+    missing = {}
+
+    output = Path(output)
+    tmp_output = output.with_name(output.name + ".tmp")
+    with open(tmp_output, "w") as out, tempfile.TemporaryFile(
+        "w+", dir=output.parent
+    ) as objects_file:
+        # chunks come in completion order, records are formatted in input order
+        done = {}
+        next_index = 0
+        written = dict(images=False, objects=False)
+
+        def write(chunk, records, _):
+            nonlocal next_index
+            done[chunk[0]] = records
+            while next_index in done:
+                records = done.pop(next_index)
+                next_index += 1
+                start = _start()
+                images_text, objects_text = _format_records(
+                    records, stats, categories is not None, missing
+                )
+                for key, text, f in (
+                    ("images", images_text, out),
+                    ("objects", objects_text, objects_file),
+                ):
+                    if text:
+                        f.write(",\n" + text if written[key] else "\n" + text)
+                        written[key] = True
+                _stop("serialize", start)
+
+        def files_chunks():
+            for chunk in _chunks(annotations, max(1, chunksize)):
+                if any(isinstance(item, Path) for item in chunk[1]):
+                    yield chunk
+                else:
+                    # records of annotation objects are not sent to workers
+                    write(chunk, chunk[1], None)
+
+        try:
+            out.write('{"images": [')
+            parse = partial(_parse_chunk, attr_type_spec=attr_type_spec)
+            _run_pipeline(files_chunks(), parse, write, workers, backend, queue_size)
+            out.write("\n],\n" if written["images"] else "],\n")
+            out.write('"annotations": [')
+            objects_file.seek(0)
+            while True:
+                chunk = objects_file.read(2**20)
+                if not chunk:
+                    break
+                out.write(chunk)
+            out.write("\n],\n" if written["objects"] else "],\n")
+            coco_categories = [
+                dict(id=category_id, name=name, supercategory=_SUPERCATEGORY)
+                for name, category_id in stats.categories.items()
+            ]
+            out.write('"categories": ' + json.dumps(coco_categories) + "\n}\n")
+        except BaseException:
+            out.close()
+            tmp_output.unlink()
+            raise
+    os.replace(tmp_output, output)
+    if missing:
+        logging.warning(f"No categories. Skip objects: {missing}")
+    return stats
+
+
+def _read_coco(file_path: Union[str, Path]) -> Tuple[list, list, Dict[int, str]]:
+    """
+    Read images, annotations and category names of COCO json file
+    Names of categories which are not listed in file are category ids
+    """
+    try:
+        with open(file_path, "r") as f:
+            data = json.load(f)
+        images = data.get("images", [])
+        objects = data.get("annotations", [])
+        categories = {c["id"]: str(c["name"]) for c in data.get("categories", [])}
+    except (ValueError, KeyError, TypeError, AttributeError) as ex:
+        raise ParseException(f"{file_path}: {ex!r}")
+    missing = sorted({obj.get("category_id") for obj in objects} - set(categories))
+    if missing:
+        logging.warning(f"No categories {missing} in {file_path}")
+        categories.update((category_id, str(category_id)) for category_id in missing)
+    return images, objects, categories
+
+
+def annotations_from_coco(file_path: Union[str, Path]) -> Iterator[Annotation]:
+    """
+    Read COCO instances json file
+    Annotations are grouped by image in one pass, Annotation objects are created
+    on iteration in order of images in file
+
+    Parameters
+    ----------
+    file_path: path to COCO json file
+
+    Returns
+    -------
+    iterator of Annotation, one for every image, boxes are converted to
+    xmin, ymin, xmax, ymax
+    """
+    images, objects, categories = _read_coco(file_path)
+    by_image = {}
+    for obj in objects:
+        by_image.setdefault(obj.get("image_id"), []).append(obj)
+    for image in images:
+        try:
+            ann_objects = []
+            for obj in by_image.get(image["id"], ()):
+                x, y, w, h = obj["bbox"]
+                ann_objects.append(
+                    Object(categories[obj["category_id"]], BndBox(x, y, x + w, y + h))
+                )
+            size = Size(image["width"], image["height"])
+            yield Annotation(image["file_name"], ann_objects, size)
+        except (KeyError, TypeError, ValueError) as ex:
+            raise ParseException(f"{file_path}, image {image.get('id')}: {ex!r}")
+
+
+def dataset_from_coco(
+    file_path: Union[str, Path], dtype=np.float32
+) -> AnnotationDataset:
+    """
+    Read COCO instances json file into AnnotationDataset
+    Objects are ordered by image with one stable sort, "iscrowd" is stored as attribute
+
+    Parameters
+    ----------
+    file_path: path to COCO json file
+    dtype: box coordinates dtype
+
+    Returns
+    -------
+    AnnotationDataset with images in order of file, names are category names
+    """
+    images, objects, categories = _read_coco(file_path)
+    try:
+        image_index = {image["id"]: i for i, image in enumerate(images)}
+        n_objects = len(objects)
+        image_ids = np.fromiter(
+            (image_index.get(obj["image_id"], -1) for obj in objects),
+            dtype=np.int64,
+            count=n_objects,
+        )
+        category_index = {category_id: i for i, category_id in enumerate(categories)}
+        label_ids = np.fromiter(
+            (category_index[obj["category_id"]] for obj in objects),
+            dtype=np.int32,
+            count=n_objects,
+        )
+        boxes = np.array([obj["bbox"] for obj in objects], dtype=np.float64)
+        iscrowd = np.fromiter(
+            (obj.get("iscrowd", 0) for obj in objects),
+            dtype=np.float32,
+            count=n_objects,
+        )
+        sizes = np.array(
+            [(image["width"], image["height"]) for image in images], dtype=np.float64
+        )
+        filenames = [image["file_name"] for image in images]
+    except (KeyError, TypeError, ValueError) as ex:
+        raise ParseException(f"{file_path}: {ex!r}")
+    keep = image_ids >= 0
+    if not keep.all():
+        logging.warning(f"Skip {int((~keep).sum())} annotations of unknown images")
+    order = np.flatnonzero(keep)[np.argsort(image_ids[keep], kind="stable")]
+    boxes = boxes.reshape(-1, 4)[order]
+    boxes[:, 2:] += boxes[:, :2]
+    counts = np.bincount(image_ids[order], minlength=len(images))
+    offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+    sizes = sizes.reshape(-1, 2)
+    if np.all(np.mod(sizes, 1) == 0):
+        sizes = sizes.astype(np.int32)
+    else:
+        sizes = sizes.astype(np.float32)
+    return AnnotationDataset(
+        boxes=boxes.astype(dtype),
+        label_ids=label_ids[order],
+        offsets=offsets,
+        sizes=sizes,
+        names=list(categories.values()),
+        filenames=filenames,
+        attributes=dict(iscrowd=iscrowd[order]),
+    )
@@ -0,0 +1,332 @@
+import json
+import os
+import time
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from dataclasses import dataclass, field
+from functools import partial
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional, Tuple, Union
+
+from pascal.exceptions import InconsistentAnnotation, ParseException
+from pascal.instrumentation import (
+    _bind_active,
+    _call_recorded,
+    _start,
+    _stop,
+    active,
+)
+from pascal.manifest import (
+    MANIFEST_NAME,
+    Manifest,
+    _spec_option,
+    fingerprint,
+    is_unchanged,
+)
+from pascal.utils import _file_digest, xml_to_str
+from pascal.voc_parser import annotation_from_voc
+
+OUTPUT_SUFFIX = {"yolo": ".txt", "labelme": ".json", "voc": ".xml"}
+_BACKENDS = ("process", "thread")
+
+
+@dataclass
+class ConvertStats:
+    converted: int = 0
+    skipped: int = 0
+    removed: int = 0
+    errors: List[Tuple[Path, Exception]] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def files_per_second(self) -> float:
+        if self.elapsed <= 0:
+            return 0.0
+        return self.converted / self.elapsed
+
+
+def _convert_file(
+    file_path: Path,
+    to: str,
+    labels_map: Optional[dict],
+    precision: int,
+    img_dir: Optional[Path],
+    save_img_data: bool,
+    attr_type_spec: Optional[dict],
+    out_dir: Path,
+    suffix: str,
+) -> Tuple[Optional[str], Optional[Exception]]:
+    """
+    Read annotation file and convert it to output format str
+    Labelme file with image data is written by worker, None is returned
+    """
+    try:
+        ann = annotation_from_voc(file_path, attr_type_spec)
+        if to == "yolo":
+            return ann.to_yolo(labels_map, precision), None
+        if to == "labelme":
+            img_path = ann.filename
+            if img_dir is not None:
+                img_path = img_dir / str(ann.filename)
+            if save_img_data:
+                out_file = out_dir / file_path.with_suffix(suffix).name
+                ann.save_labelme(out_file, img_path, save_img_data=True)
+                return None, None
+            res = ann.to_labelme(img_path)
+            start = _start()
+            text = json.dumps(res, indent=2)
+            _stop("serialize", start)
+            return text, None
+        # to_xml of xmlobj annotations is XMLMixin.to_xml, so it is timed here
+        start = _start()
+        xml_obj = ann.to_xml()
+        _stop("to_xml", start)
+        return xml_to_str(xml_obj), None
+    except (ParseException, InconsistentAnnotation, FileNotFoundError) as ex:
+        return None, type(ex)(str(ex))
+
+
+def _make_executor(workers: int, backend: str) -> Optional[Executor]:
+    if workers <= 1:
+        return None
+    if backend == "process":
+        return ProcessPoolExecutor(max_workers=workers)
+    return ThreadPoolExecutor(max_workers=workers)
+
+
+def convert_dataset(
+    files: Iterable[Union[str, Path]],
+    out_dir: Union[str, Path],
+    to: str,
+    workers: Optional[int] = None,
+    backend: str = "process",
+    labels_map: Optional[dict] = None,
+    precision: int = 3,
+    img_dir: Optional[Union[str, Path]] = None,
+    save_img_data: bool = False,
+    attr_type_spec: Optional[dict] = None,
+    queue_size: Optional[int] = None,
+    progress: Optional[Callable[[int, float], None]] = None,
+    incremental: bool = False,
+    use_hash: bool = False,
+) -> ConvertStats:
+    """
+    Convert PascalVOC annotation files
+    Files are read and converted by workers and written by calling thread.
+    Number of files in progress is limited by queue_size, so dataset is never held in memory
+
+    Parameters
+    ----------
+    files: iterable of xml files
+    out_dir: output directory, output file names are source file names with
+        format suffix: .txt for yolo, .json for labelme, .xml for voc
+    to: output format: "yolo", "labelme" or "voc"
+    workers: number of workers, os.cpu_count() if None
+    backend: "process" or "thread"
+    labels_map: dict of label ids, required for yolo
+        {"person": 0, "cat": 1, "dog": 2}
+    precision: yolo coord precision
+    img_dir: labelme images directory
+    save_img_data: if true store encoded image in labelme json
+    attr_type_spec: dict, optional
+        specify attribute types to explicitly cast attribute values
+    queue_size: max number of files in progress, 4 * workers if None
+    progress: callable(number of processed and skipped files, elapsed seconds)
+    incremental: convert only files added or modified since previous run and
+        delete outputs of removed files. Source fingerprints and output names
+        are stored in out_dir/.pascal_manifest.json
+    use_hash: store content hash in manifest, file with changed modification time
+        is converted again only if its content has changed
+
+    Returns
+    -------
+    ConvertStats
+    """
+    if to not in OUTPUT_SUFFIX:
+        raise ValueError(f"Unknown format: {to}. Use one of {tuple(OUTPUT_SUFFIX)}")
+    if backend not in _BACKENDS:
+        raise ValueError(f"Unknown backend: {backend}. Use one of {_BACKENDS}")
+    if to == "yolo" and labels_map is None:
+        raise ValueError("labels_map is required for yolo format")
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if queue_size is None:
+        queue_size = 4 * max(1, workers)
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    suffix = OUTPUT_SUFFIX[to]
+    convert = partial(
+        _convert_file,
+        to=to,
+        labels_map=labels_map,
+        precision=precision,
+        img_dir=None if img_dir is None else Path(img_dir),
+        save_img_data=save_img_data,
+        attr_type_spec=attr_type_spec,
+        out_dir=out_dir,
+        suffix=suffix,
+    )
+    stats = ConvertStats()
+    start = time.perf_counter()
+    manifest = None
+    fingerprints = {}
+    if incremental:
+        options = _manifest_options(
+            to, labels_map, precision, img_dir, save_img_data, attr_type_spec
+        )
+        manifest = Manifest.load(out_dir / MANIFEST_NAME, options)
+        files = _changed_files(files, out_dir, suffix, manifest, fingerprints, stats)
+
+    def write(file_path: Path, text: Optional[str], error: Optional[Exception]):
+        if error is None and text is not None:
+            with open(out_dir / file_path.with_suffix(suffix).name, "w") as f:
+                f.write(text)
+        _record_result(
+            file_path, error, suffix, stats, manifest, fingerprints, use_hash
+        )
+        if progress is not None:
+            done = stats.converted + stats.skipped + len(stats.errors)
+            progress(done, time.perf_counter() - start)
+
+    try:
+        files = (Path(file_path) for file_path in files)
+        _run_pipeline(files, convert, write, workers, backend, queue_size)
+    finally:
+        if manifest is not None:
+            manifest.save()
+    stats.elapsed = time.perf_counter() - start
+    return stats
+
+
+def _run_pipeline(items, func, callback, workers, backend, queue_size):
+    """
+    Call func for every item in executor and pass results to callback in calling thread
+    No more than queue_size items are in progress at once
+    """
+    executor = _make_executor(workers, backend)
+    instrumentation = active()
+    if executor is not None and backend == "process" and instrumentation is not None:
+        # records of process workers are merged into active instrumentation
+        func = partial(_call_recorded, func)
+        recorded_callback = callback
+
+        def callback(item, res, worker_instrumentation):
+            instrumentation.merge(worker_instrumentation)
+            recorded_callback(item, *res)
+
+    elif executor is not None:
+        func = _bind_active(func)
+
+    if executor is None:
+        for item in items:
+            callback(item, *func(item))
+        return
+    with executor:
+        in_progress = {}
+        for item in items:
+            if len(in_progress) >= queue_size:
+                done, _ = wait(in_progress, return_when=FIRST_COMPLETED)
+                for future in done:
+                    callback(in_progress.pop(future), *future.result())
+            in_progress[executor.submit(func, item)] = item
+        for future in list(in_progress):
+            callback(in_progress.pop(future), *future.result())
+
+
+def _manifest_options(
+    to, labels_map, precision, img_dir, save_img_data, attr_type_spec
+) -> dict:
+    options = dict(
+        to=to,
+        labels_map=labels_map,
+        precision=precision if to == "yolo" else None,
+        img_dir=None if img_dir is None else str(img_dir),
+        save_img_data=save_img_data,
+        attr_type_spec=_spec_option(attr_type_spec),
+    )
+    # compare with options loaded from json
+    return json.loads(json.dumps(options))
+
+
+def _record_result(
+    file_path: Path,
+    error: Optional[Exception],
+    suffix: str,
+    stats: ConvertStats,
+    manifest: Optional[Manifest],
+    fingerprints: dict,
+    use_hash: bool,
+    key: Optional[str] = None,
+):
+    """
+    Count converted file or error and update manifest entry of file
+    Entry of file which cannot be converted keeps name of its previous output,
+    so the output is deleted when file is removed.
+    key is manifest key of file, resolved path of file if None
+    """
+    if error is not None:
+        stats.errors.append((file_path, error))
+    else:
+        stats.converted += 1
+    if manifest is None:
+        return
+    if key is None:
+        key = str(file_path.resolve())
+    if error is not None:
+        output = manifest.entries.pop(key, {}).get("output")
+        if output is not None:
+            manifest.entries[key] = dict(output=output)
+        return
+    record = fingerprints[key]
+    if use_hash and "hash" not in record:
+        record["hash"] = _file_digest(file_path)
+    manifest.entries[key] = dict(record, output=file_path.with_suffix(suffix).name)
+
+
+def _changed_files(
+    files: Iterable[Union[str, Path]],
+    out_dir: Path,
+    suffix: str,
+    manifest: Manifest,
+    fingerprints: dict,
+    stats: ConvertStats,
+) -> List[Path]:
+    """
+    Files added or modified since previous conversion
+    Outputs of removed files and previous outputs with other names,
+    e.g. of other format, are deleted
+    """
+    changed = []
+    outputs = set()
+    stale = []
+    for file_path in files:
+        file_path = Path(file_path)
+        key = str(file_path.resolve())
+        current = fingerprint(file_path)
+        fingerprints[key] = current
+        record = manifest.entries.get(key)
+        out_name = file_path.with_suffix(suffix).name
+        outputs.add(out_name)
+        if is_unchanged(file_path, record, current) and (out_dir / out_name).exists():
+            if record["mtime_ns"] != current["mtime_ns"]:
+                manifest.entries[key] = dict(current, output=out_name)
+            stats.skipped += 1
+            continue
+        changed.append(file_path)
+        if record is not None and record.get("output") not in (None, out_name):
+            stale.append(manifest.entries.pop(key)["output"])
+    for key in [k for k in manifest.entries if k not in fingerprints]:
+        output = manifest.entries.pop(key).get("output")
+        if output is not None:
+            stale.append(output)
+    # output name may be taken by other source file
+    for output in stale:
+        if output not in outputs:
+            (out_dir / output).unlink(missing_ok=True)
+            stats.removed += 1
+    return changed
@@ -0,0 +1,569 @@
+import logging
+import warnings
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from pascal.draw_objects import DrawObjectsMixin
+from pascal.exceptions import InconsistentAnnotation, ParseException
+from pascal.format_convertor import FormatConvertorMixin
+from pascal.instrumentation import UNMAPPED_LABEL, _skip_object, _start, _stop, count
+from pascal.protocols import BndBox as BndBoxProtocol
+from pascal.protocols import PascalAnnotation
+from pascal.protocols import PascalObject as PascalObjectProtocol
+from pascal.protocols import Size as SizeProtocol
+
+_DEFAULT_ATTRIBUTES = ("difficult", "truncated")
+# whitespace chars of C isspace, separators of np.fromstring
+_SPACE = np.zeros(256, dtype=bool)
+_SPACE[[ord(c) for c in " \t\n\r\v\f"]] = True
+
+
+class BndBoxView(BndBoxProtocol):
+    """
+    Bounding box stored in AnnotationDataset.boxes row
+    """
+
+    __slots__ = ("_boxes", "_index")
+
+    def __init__(self, boxes: np.ndarray, index: int):
+        self._boxes = boxes
+        self._index = index
+
+    @property
+    def xmin(self) -> float:
+        return self._boxes[self._index, 0].item()
+
+    @property
+    def ymin(self) -> float:
+        return self._boxes[self._index, 1].item()
+
+    @property
+    def xmax(self) -> float:
+        return self._boxes[self._index, 2].item()
+
+    @property
+    def ymax(self) -> float:
+        return self._boxes[self._index, 3].item()
+
+    @property
+    def __dict__(self) -> dict:
+        return dict(xmin=self.xmin, ymin=self.ymin, xmax=self.xmax, ymax=self.ymax)
+
+    def __repr__(self):
+        return f"BndBoxView(xmin={self.xmin}, ymin={self.ymin}, xmax={self.xmax}, ymax={self.ymax})"
+
+
+class ObjectView(PascalObjectProtocol):
+    """
+    Object stored in AnnotationDataset
+    Attribute columns of dataset (difficult, truncated, etc.) are available as object attributes
+    """
+
+    __slots__ = ("_dataset", "_index")
+
+    def __init__(self, dataset: "AnnotationDataset", index: int):
+        self._dataset = dataset
+        self._index = index
+
+    @property
+    def name(self) -> str:
+        return self._dataset.names[self._dataset.label_ids[self._index]]
+
+    @property
+    def bndbox(self) -> BndBoxView:
+        return BndBoxView(self._dataset.boxes, self._index)
+
+    def __getattr__(self, item):
+        if item.startswith("_"):
+            raise AttributeError(item)
+        column = self._dataset.attributes.get(item)
+        if column is None or np.isnan(column[self._index]):
+            raise AttributeError(item)
+        return _to_python(column[self._index])
+
+    @property
+    def __dict__(self) -> dict:
+        # format convertors read object attributes through __dict__
+        attributes = dict(name=self.name)
+        for attr_name, column in self._dataset.attributes.items():
+            if not np.isnan(column[self._index]):
+                attributes[attr_name] = _to_python(column[self._index])
+        attributes["bndbox"] = self.bndbox
+        return attributes
+
+    def __repr__(self):
+        return f"ObjectView(name={self.name!r}, bndbox={self.bndbox!r})"
+
+
+class SizeView(SizeProtocol):
+    __slots__ = ("_sizes", "_index")
+
+    def __init__(self, sizes: np.ndarray, index: int):
+        self._sizes = sizes
+        self._index = index
+
+    @property
+    def width(self):
+        return self._sizes[self._index, 0].item()
+
+    @property
+    def height(self):
+        return self._sizes[self._index, 1].item()
+
+    @property
+    def __dict__(self) -> dict:
+        return dict(width=self.width, height=self.height)
+
+    def __repr__(self):
+        return f"SizeView(width={self.width}, height={self.height})"
+
+
+class AnnotationView(DrawObjectsMixin, FormatConvertorMixin):
+    """
+    Annotation of one image stored in AnnotationDataset
+    Objects are created on access and read values from dataset arrays
+    """
+
+    def __init__(self, dataset: "AnnotationDataset", index: int):
+        self._dataset = dataset
+        self._index = index
+        self._objects = None
+
+    @property
+    def filename(self) -> Optional[str]:
+        return self._dataset.filenames[self._index]
+
+    @property
+    def size(self) -> SizeView:
+        return SizeView(self._dataset.sizes, self._index)
+
+    @property
+    def objects(self) -> List[ObjectView]:
+        if self._objects is None:
+            start, stop = self._dataset.offsets[self._index : self._index + 2]
+            self._objects = [ObjectView(self._dataset, i) for i in range(start, stop)]
+        return self._objects
+
+    @objects.setter
+    def objects(self, objects: List[PascalObjectProtocol]):
+        self._objects = objects
+
+    @property
+    def boxes(self) -> np.ndarray:
+        """(n, 4) view of image boxes: xmin, ymin, xmax, ymax"""
+        return self._dataset.boxes[self._dataset.image_slice(self._index)]
+
+    @property
+    def label_ids(self) -> np.ndarray:
+        return self._dataset.label_ids[self._dataset.image_slice(self._index)]
+
+    def __repr__(self):
+        return f"AnnotationView(filename={self.filename!r}, n_objects={len(self)})"
+
+
+def _to_python(value):
+    value = value.item()
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _attr_value(obj, attr_name: str) -> float:
+    value = getattr(obj, attr_name, None)
+    if isinstance(value, (bool, int, float)):
+        return float(value)
+    return np.nan
+
+
+class AnnotationDataset:
+    """
+    Columnar storage of annotations
+
+    boxes: (n_objects, 4) array of xmin, ymin, xmax, ymax
+    label_ids: (n_objects,) int32 array of indices in names
+    offsets: (n_images + 1,) int64 array, objects of image i are boxes[offsets[i]:offsets[i + 1]]
+    sizes: (n_images, 2) array of image width and height
+    names: list of unique object names
+    filenames: list of image file names
+    attributes: dict of (n_objects,) float32 arrays of numeric object attributes,
+        nan for missing values
+    """
+
+    def __init__(
+        self,
+        boxes: np.ndarray,
+        label_ids: np.ndarray,
+        offsets: np.ndarray,
+        sizes: np.ndarray,
+        names: Sequence[str],
+        filenames: Sequence[Optional[str]],
+        attributes: Optional[Dict[str, np.ndarray]] = None,
+    ):
+        self.boxes = np.asarray(boxes).reshape(-1, 4)
+        self.label_ids = np.asarray(label_ids, dtype=np.int32)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.sizes = np.asarray(sizes).reshape(-1, 2)
+        self.names = list(names)
+        self.filenames = list(filenames)
+        self.attributes = {} if attributes is None else dict(attributes)
+        n_images = len(self.offsets) - 1
+        n_objects = len(self.boxes)
+        if n_images < 0 or self.offsets[0] != 0 or self.offsets[-1] != n_objects:
+            raise ValueError("offsets do not match boxes")
+        if len(self.label_ids) != n_objects:
+            raise ValueError("label_ids do not match boxes")
+        if len(self.sizes) != n_images or len(self.filenames) != n_images:
+            raise ValueError("sizes and filenames must have one row per image")
+        for attr_name, column in self.attributes.items():
+            if len(column) != n_objects:
+                raise ValueError(f"Attribute {attr_name} does not match boxes")
+
+    @classmethod
+    def from_annotations(
+        cls,
+        annotations: Iterable[PascalAnnotation],
+        attr_names: Sequence[str] = _DEFAULT_ATTRIBUTES,
+        dtype=np.float32,
+    ) -> "AnnotationDataset":
+        """
+        Make dataset from annotation objects
+
+        Parameters
+        ----------
+        annotations: iterable of PascalAnnotation
+        attr_names: numeric object attributes to store
+        dtype: box coordinates dtype
+
+        Returns
+        -------
+        AnnotationDataset
+        """
+        boxes = []
+        label_ids = []
+        offsets = [0]
+        sizes = []
+        filenames = []
+        name_ids = {}
+        attributes = {attr_name: [] for attr_name in attr_names}
+        for ann in annotations:
+            for obj in ann.objects:
+                if not isinstance(obj, PascalObjectProtocol):
+                    _skip_object()
+                    continue
+                box = obj.bndbox
+                boxes.append((box.xmin, box.ymin, box.xmax, box.ymax))
+                label_ids.append(name_ids.setdefault(str(obj.name), len(name_ids)))
+                for attr_name, column in attributes.items():
+                    column.append(_attr_value(obj, attr_name))
+            offsets.append(len(boxes))
+            size = ann.size
+            if isinstance(size, SizeProtocol):
+                sizes.append((size.width, size.height))
+            else:
+                sizes.append((np.nan, np.nan))
+            filenames.append(None if ann.filename is None else str(ann.filename))
+        sizes = np.array(sizes, dtype=np.float64).reshape(-1, 2)
+        if np.all(np.mod(sizes, 1) == 0):
+            sizes = sizes.astype(np.int32)
+        else:
+            sizes = sizes.astype(np.float32)
+        return cls(
+            boxes=np.array(boxes, dtype=dtype).reshape(-1, 4),
+            label_ids=np.array(label_ids, dtype=np.int32),
+            offsets=np.array(offsets, dtype=np.int64),
+            sizes=sizes,
+            names=list(name_ids.keys()),
+            filenames=filenames,
+            attributes={
+                attr_name: np.array(column, dtype=np.float32)
+                for attr_name, column in attributes.items()
+            },
+        )
+
+    @property
+    def n_objects(self) -> int:
+        return len(self.boxes)
+
+    def image_slice(self, index: int) -> slice:
+        return slice(int(self.offsets[index]), int(self.offsets[index + 1]))
+
+    def image_ids(self) -> np.ndarray:
+        """Image index of every object"""
+        return np.repeat(np.arange(len(self), dtype=np.int64), np.diff(self.offsets))
+
+    def object_names(self) -> np.ndarray:
+        """Name of every object"""
+        return np.array(self.names, dtype=object)[self.label_ids]
+
+    def select(self, mask: np.ndarray) -> "AnnotationDataset":
+        """
+        Dataset of objects where mask is true, all images are kept
+
+        Parameters
+        ----------
+        mask: (n_objects,) bool array, e.g. ObjectFilter.mask result
+
+        Returns
+        -------
+        AnnotationDataset with the same images and names
+        """
+        mask = np.asarray(mask, dtype=bool)
+        if mask.shape != (self.n_objects,):
+            raise ValueError("mask must have one value per object")
+        kept_offsets = np.concatenate([[0], np.cumsum(mask)])[self.offsets]
+        return AnnotationDataset(
+            boxes=self.boxes[mask],
+            label_ids=self.label_ids[mask],
+            offsets=kept_offsets,
+            sizes=self.sizes,
+            names=self.names,
+            filenames=self.filenames,
+            attributes={k: v[mask] for k, v in self.attributes.items()},
+        )
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> AnnotationView:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return AnnotationView(self, index)
+
+    def __iter__(self) -> Iterator[AnnotationView]:
+        for i in range(len(self)):
+            yield AnnotationView(self, i)
+
+    def __repr__(self):
+        return f"AnnotationDataset(n_images={len(self)}, n_objects={self.n_objects}, n_names={len(self.names)})"
+
+
+def _label_file_name(filename: Optional[str], index: int, suffix: str) -> str:
+    if filename is None:
+        return f"{index:06d}{suffix}"
+    return Path(filename).with_suffix(suffix).name
+
+
+def export_yolo(
+    dataset: AnnotationDataset,
+    out_dir: Union[str, Path],
+    labels_map: dict,
+    precision: int = 3,
+) -> List[Path]:
+    """
+    Save all dataset annotations in yolo format
+    Output files are the same as FormatConvertorMixin.to_yolo results of source
+    annotations if dataset dtype holds box coords exactly. Float32 boxes
+    (default dtype of dataset) hold integer pixel coords, dataset of fractional
+    coords has to be made with dtype=np.float64, otherwise last digits may differ
+
+    Parameters
+    ----------
+    dataset: AnnotationDataset
+    out_dir: output directory, file names are image file names with .txt suffix
+    labels_map: dict of label ids
+        {"person": 0, "cat": 1, "dog": 2}
+    precision: int, coord precision
+
+    Returns
+    -------
+    List of written files
+    """
+    sizes = dataset.sizes.astype(np.float64)
+    if np.isnan(sizes).any():
+        index = int(np.argwhere(np.isnan(sizes))[0, 0])
+        raise InconsistentAnnotation(
+            f"Incorrect size of {dataset.filenames[index]}. Size must have width and height attributes"
+        )
+    start = _start()
+    labels = [labels_map.get(name) for name in dataset.names]
+    mapped = np.array([label is not None for label in labels], dtype=bool)
+    keep = mapped[dataset.label_ids] if len(mapped) else np.zeros(0, dtype=bool)
+    skipped = np.bincount(dataset.label_ids[~keep], minlength=len(dataset.names))
+    if skipped.any():
+        skipped = {
+            dataset.names[i]: int(n) for i, n in enumerate(skipped.tolist()) if n > 0
+        }
+        logging.warning(f"No labels in label map. Skip objects: {skipped}")
+        count(UNMAPPED_LABEL, sum(skipped.values()))
+
+    # same operations as to_yolo, so values are equal
+    boxes = dataset.boxes[keep].astype(np.float64)
+    obj_sizes = sizes[dataset.image_ids()[keep]]
+    dx = boxes[:, 2] - boxes[:, 0]
+    dy = boxes[:, 3] - boxes[:, 1]
+    x = boxes[:, 0] + dx * 0.5
+    y = boxes[:, 1] + dy * 0.5
+    dx /= obj_sizes[:, 0]
+    dy /= obj_sizes[:, 1]
+    x /= obj_sizes[:, 0]
+    y /= obj_sizes[:, 1]
+
+    line_fmt = f"%s %.{precision}f %.{precision}f %.{precision}f %.{precision}f"
+    obj_labels = np.array(labels, dtype=object)[dataset.label_ids[keep]]
+    lines = [
+        line_fmt % line
+        for line in zip(
+            obj_labels.tolist(), x.tolist(), y.tolist(), dx.tolist(), dy.tolist()
+        )
+    ]
+    kept_offsets = np.concatenate([[0], np.cumsum(keep)])[dataset.offsets].tolist()
+    _stop("to_yolo", start, len(dataset))
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    files = []
+    for i, filename in enumerate(dataset.filenames):
+        out_file = out_dir / _label_file_name(filename, i, ".txt")
+        with open(out_file, "w") as f:
+            f.write("\n".join(lines[kept_offsets[i] : kept_offsets[i + 1]]))
+        files.append(out_file)
+    return files
+
+
+def _yolo_values(
+    texts: List[bytes], ann_paths: List[Union[str, Path]]
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Values of yolo files, number of values of every non blank line and
+    offsets of lines of every file.
+    Texts of all files are joined, values are parsed by one numpy call,
+    values of lines are counted on char array
+    """
+    buffer = b"\n".join(texts)
+    chars = np.frombuffer(buffer, dtype=np.uint8)
+    space = _SPACE[chars]
+    token_starts = ~space
+    token_starts[1:] &= space[:-1]
+    # lines end with \n, \r\n or \r
+    newline = chars == ord("\n")
+    newline[:-1] |= (chars[:-1] == ord("\r")) & (chars[1:] != ord("\n"))
+    if len(chars):
+        newline[-1] |= chars[-1] == ord("\r")
+    # line of char position, last item is line of buffer end
+    char_lines = np.concatenate([[0], np.cumsum(newline)])
+    line_sizes = np.bincount(
+        char_lines[:-1][token_starts], minlength=int(char_lines[-1]) + 1
+    )
+    text_lengths = np.array([len(text) + 1 for text in texts], dtype=np.int64)
+    first_lines = char_lines[np.cumsum(text_lengths) - text_lengths]
+    bad = (line_sizes != 0) & (line_sizes != 5) & (line_sizes != 6)
+    if bad.any():
+        i = int(np.argmax(bad))
+        k = int(np.searchsorted(first_lines, i, side="right")) - 1
+        raise ParseException(
+            f"{ann_paths[k]}, line {i - first_lines[k] + 1}: "
+            f"expected 5 or 6 values, got {line_sizes[i]}"
+        )
+    filled = np.flatnonzero(line_sizes)
+    file_ids = np.searchsorted(first_lines, filled, side="right") - 1
+    counts = np.bincount(file_ids, minlength=len(texts))
+    offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+    line_sizes = line_sizes[filled].astype(np.int64)
+    n_values = int(line_sizes.sum())
+    if n_values == 0:
+        # np.fromstring returns -1 for whitespace only text
+        return np.zeros(0, dtype=np.float64), line_sizes, offsets
+    try:
+        with warnings.catch_warnings():
+            # older numpy warns and returns values read before unmatched data
+            warnings.simplefilter("error", DeprecationWarning)
+            values = np.fromstring(buffer, dtype=np.float64, sep=" ")
+        if len(values) != n_values:
+            raise ValueError("cannot convert values to float")
+    except (ValueError, DeprecationWarning):
+        if len(texts) == 1:
+            raise ParseException(f"{ann_paths[0]}: cannot convert values to float")
+        # file of error is found by parsing files one by one
+        for text, ann_path in zip(texts, ann_paths):
+            _yolo_values([text], [ann_path])
+        raise ParseException("Cannot convert values to float")
+    return values, line_sizes, offsets
+
+
+def dataset_from_yolo(
+    ann_paths: Sequence[Union[str, Path]],
+    img_w: Union[int, Sequence[int]] = 1,
+    img_h: Union[int, Sequence[int]] = 1,
+    label_map: Optional[dict] = None,
+    precision: int = 4,
+    dtype=np.float32,
+) -> AnnotationDataset:
+    """
+    Read many yolo annotation files into AnnotationDataset
+    Texts of all files are split and converted to float at once.
+    Lines may be separated by any whitespace, blank lines are skipped,
+    optional sixth column is stored as "confidence" attribute
+
+    Parameters
+    ----------
+    ann_paths: paths to yolo annotations
+    img_w: image width, px, one value for all images or value per image
+    img_h: image height, px, one value for all images or value per image
+    label_map: dict of labels and correspond ids, example:
+        label_map = {0: "person", 1: "dog"}
+    precision: coordinates precision
+    dtype: box coordinates dtype
+
+    Returns
+    -------
+    AnnotationDataset, file names are annotation file names without suffix
+    """
+    ann_paths = list(ann_paths)
+    texts = []
+    for ann_path in ann_paths:
+        with open(ann_path, "rb") as f:
+            texts.append(f.read())
+    filenames = [Path(ann_path).stem for ann_path in ann_paths]
+    values, line_sizes, offsets = _yolo_values(texts, ann_paths)
+    starts = np.cumsum(line_sizes) - line_sizes
+    class_ids = values[starts].astype(np.int64)
+    x, y, dx, dy = (values[starts + k] for k in range(1, 5))
+    dx = dx * 0.5
+    dy = dy * 0.5
+
+    n_images = len(filenames)
+    widths = np.broadcast_to(np.asarray(img_w), (n_images,))
+    heights = np.broadcast_to(np.asarray(img_h), (n_images,))
+    if np.any(widths <= 1) or np.any(heights <= 1):
+        logging.warning(
+            "Relative coordinates! Cannot work with labelimg or other tools. Please, set correct image size"
+        )
+    obj_w = np.repeat(widths, np.diff(offsets))
+    obj_h = np.repeat(heights, np.diff(offsets))
+    boxes = np.stack(
+        [(x - dx) * obj_w, (y - dy) * obj_h, (x + dx) * obj_w, (y + dy) * obj_h],
+        axis=1,
+    )
+    boxes = np.round(boxes, precision).astype(dtype)
+
+    unique_ids, label_ids = np.unique(class_ids, return_inverse=True)
+    names = []
+    missing = []
+    for class_id in unique_ids.tolist():
+        if label_map is not None and class_id in label_map:
+            names.append(str(label_map[class_id]))
+        else:
+            names.append(str(class_id))
+            missing.append(class_id)
+    if label_map is not None and missing:
+        logging.warning(f"No ids {missing} in label map")
+
+    attributes = {}
+    has_confidence = line_sizes == 6
+    if has_confidence.any():
+        confidence = np.full(len(line_sizes), np.nan, dtype=np.float32)
+        confidence[has_confidence] = values[starts[has_confidence] + 5]
+        attributes["confidence"] = confidence
+    return AnnotationDataset(
+        boxes=boxes,
+        label_ids=label_ids.reshape(-1).astype(np.int32),
+        offsets=offsets,
+        sizes=np.stack([widths, heights], axis=1),
+        names=names,
+        filenames=filenames,
+        attributes=attributes,
+    )
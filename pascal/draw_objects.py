@@ -1,14 +1,16 @@
 import hashlib
-import logging
+import math
 import random
 from functools import lru_cache
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Optional, Tuple, Union
 
+import numpy as np
 import PIL.ImageFont
 from PIL import Image, ImageDraw
 from transliterate import translit
 
+from pascal.instrumentation import _skip_object, _start, _stop
 from pascal.protocols import BndBox, PascalAnnotation
 from pascal.protocols import PascalObject as PascalObjectProtocol
 
@@ -21,6 +23,11 @@ RAND_COLORS = [
 ]
 
 
+_LABEL_FILL = (32, 32, 28)
+# image modes where text is drawn through cached glyph mask
+_MASK_MODES = ("RGB", "RGBA")
+
+
 @lru_cache()
 def get_name_hash(name: str) -> int:
     """
@@ -33,6 +40,180 @@ def is_relative_coords(box: BndBox) -> bool:
     return any(c < 1 for c in [box.xmin, box.ymin, box.xmax, box.ymax])
 
 
+@lru_cache(maxsize=32)
+def get_font(font_path: str, size: int) -> PIL.ImageFont.FreeTypeFont:
+    """
+    Load TrueType font, loaded fonts are shared by all calls
+    """
+    return PIL.ImageFont.truetype(font_path, size=size)
+
+
+@lru_cache(maxsize=4096)
+def _translit(name: str, language_code: str) -> str:
+    return str(translit(name, language_code, reversed=True))
+
+
+@lru_cache(maxsize=4096)
+def _text_extent(
+    text: str, font: PIL.ImageFont.FreeTypeFont, mode: str
+) -> Tuple[float, float, float, float]:
+    """
+    Text bounding box at (0, 0), textbbox at other point is the same box shifted
+    """
+    img_draw = ImageDraw.Draw(Image.new(mode, (1, 1)))
+    return img_draw.textbbox((0, 0), text, font=font)
+
+
+@lru_cache(maxsize=4096)
+def _text_mask(
+    text: str, font: PIL.ImageFont.FreeTypeFont, mode: str, start: Tuple[float, float]
+) -> Tuple[Image.Image, int, int]:
+    """
+    Text rendered once to "L" mask for fractional part of text point
+    Returns mask and offset of mask from integer part of text point
+    """
+    extent = _text_extent(text, font, mode)
+    left = min(0, math.floor(extent[0])) - 2
+    top = min(0, math.floor(extent[1])) - 2
+    size = (math.ceil(extent[2]) + 2 - left, math.ceil(extent[3]) + 2 - top)
+    mask = Image.new("L", size)
+    ImageDraw.Draw(mask).text(
+        (start[0] - left, start[1] - top), text, fill=255, font=font
+    )
+    return mask, left, top
+
+
+def _draw_text(
+    img: Image.Image,
+    img_draw: ImageDraw.ImageDraw,
+    coord: Tuple[float, float],
+    text: str,
+    font: PIL.ImageFont.FreeTypeFont,
+):
+    """
+    Draw white text, glyphs are rendered once and pasted through cached mask
+    """
+    if img.mode not in _MASK_MODES:
+        img_draw.text(coord, text, align="left", font=font)
+        return
+    x, y = coord
+    mask, left, top = _text_mask(text, font, img.mode, (x % 1, y % 1))
+    img.paste("white", (math.floor(x) + left, math.floor(y) + top), mask)
+
+
+def _clip_span(a: int, b: int, size: int) -> slice:
+    return slice(max(a, 0), max(min(b + 1, size), 0))
+
+
+def _outline_array(arr: np.ndarray, p1, p2, color, width: int):
+    """
+    ImageDraw.rectangle outline drawn into array
+    """
+    if width == 0:
+        return
+    height, img_width = arr.shape[:2]
+    x0, y0, x1, y1 = int(p1[0]), int(p1[1]), int(p2[0]), int(p2[1])
+    if (
+        x0 >= 0
+        and y0 >= 0
+        and x1 < img_width
+        and y1 < height
+        and x1 - x0 >= 2 * width
+        and y1 - y0 >= 2 * width
+    ):
+        # box inside image with separate sides, no clipping
+        arr[y0 : y0 + width, x0 : x1 + 1] = color
+        arr[y1 - width + 1 : y1 + 1, x0 : x1 + 1] = color
+        rows = slice(y0 + width, y1 - width + 1)
+        arr[rows, x0 : x0 + width] = color
+        arr[rows, x1 - width + 1 : x1 + 1] = color
+        return
+    cols = _clip_span(x0, x1, img_width)
+    arr[_clip_span(y0, y0 + width - 1, height), cols] = color
+    arr[_clip_span(y1 - width + 1, y1, height), cols] = color
+    # vertical sides are drawn between horizontal sides, end point excluded
+    a, b = y0 + width, y1 - width + 1
+    if a == b:
+        return
+    rows = _clip_span(a, b - 1, height) if a < b else _clip_span(b + 1, a, height)
+    arr[rows, _clip_span(x0, x0 + width - 1, img_width)] = color
+    arr[rows, _clip_span(x1 - width + 1, x1, img_width)] = color
+
+
+def _fill_array(arr: np.ndarray, coords, color):
+    """
+    ImageDraw.rectangle fill drawn into array
+    """
+    height, img_width = arr.shape[:2]
+    x0, y0, x1, y1 = (int(c) for c in coords)
+    if x0 >= 0 and y0 >= 0 and x1 < img_width and y1 < height:
+        arr[y0 : y1 + 1, x0 : x1 + 1] = color
+        return
+    arr[_clip_span(y0, y1, height), _clip_span(x0, x1, img_width)] = color
+
+
+def _make_blend_table() -> np.ndarray:
+    """
+    Flat table of white text blending, value at mask * 256 + pixel
+    is rounded the same way as Pillow
+    """
+    m, p = np.meshgrid(
+        np.arange(256, dtype=np.uint32), np.arange(256, dtype=np.uint32), indexing="ij"
+    )
+    tmp = p * (255 - m) + 255 * m + 128
+    return (((tmp >> 8) + tmp) >> 8).astype(np.uint8).ravel()
+
+
+_BLEND_TABLE = _make_blend_table()
+
+
+@lru_cache(maxsize=4096)
+def _blend_offsets(
+    text: str, font: PIL.ImageFont.FreeTypeFont, start: Tuple[float, float]
+) -> Tuple[np.ndarray, int, int]:
+    """
+    Text mask as offsets of rows of blend table
+    """
+    mask, left, top = _text_mask(text, font, "RGB", start)
+    offsets = np.asarray(mask, dtype=np.intp)[:, :, None] * 256
+    return offsets, left, top
+
+
+def _text_array(
+    arr: np.ndarray,
+    coord: Tuple[float, float],
+    text: str,
+    font: PIL.ImageFont.FreeTypeFont,
+):
+    """
+    Blend white text into array with the same rounding as Pillow
+    """
+    x, y = coord
+    offsets, left, top = _blend_offsets(text, font, (x % 1, y % 1))
+    x0, y0 = math.floor(x) + left, math.floor(y) + top
+    height, img_width = arr.shape[:2]
+    mask_height, mask_width = offsets.shape[:2]
+    if (
+        x0 >= 0
+        and y0 >= 0
+        and x0 + mask_width <= img_width
+        and y0 + mask_height <= height
+    ):
+        region = arr[y0 : y0 + mask_height, x0 : x0 + mask_width]
+        region[...] = _BLEND_TABLE[offsets + region]
+        return
+    rows = _clip_span(y0, y0 + mask_height - 1, height)
+    cols = _clip_span(x0, x0 + mask_width - 1, img_width)
+    if rows.start >= rows.stop or cols.start >= cols.stop:
+        return
+    weights = (
+        slice(rows.start - y0, rows.stop - y0),
+        slice(cols.start - x0, cols.stop - x0),
+    )
+    region = arr[rows, cols]
+    region[...] = _BLEND_TABLE[offsets[weights] + region]
+
+
 def _get_rect_coords(text_coord, d):
     x0 = text_coord[0] - d if text_coord[0] - 1 >= 0 else text_coord[0]
     y0 = text_coord[1] - d if text_coord[1] - 1 >= 0 else text_coord[1]
@@ -41,6 +222,14 @@ def _get_rect_coords(text_coord, d):
     return x0, y0, x1, y1
 
 
+@lru_cache(maxsize=1024)
+def _array_color(color: Tuple[int, ...], channels: int) -> np.ndarray:
+    # array is assigned to pixels faster than tuple
+    res = np.array(tuple(color[:3]) + (255,) * (channels - 3), dtype=np.uint8)
+    res.flags.writeable = False
+    return res
+
+
 class DrawObjectsMixin(PascalAnnotation):
     """
     Draw objects
@@ -48,49 +237,82 @@ class DrawObjectsMixin(PascalAnnotation):
 
     _font_path = str(Path(__file__).parent / "fonts/arialmt.ttf")
 
+    def _is_relative(self, box: BndBox) -> bool:
+        return is_relative_coords(box)
+
     def draw_boxes(
         self,
-        image: Image.Image,
+        image: Union[Image.Image, np.ndarray],
         width: int = 5,
         color: Optional[Tuple[int, int, int]] = None,
         fontsize: int = 10,
         font_path: str = None,
         language_code: Optional[str] = None,
-    ) -> Image.Image:
+        inplace: bool = False,
+    ) -> Union[Image.Image, np.ndarray]:
         """
         Draw bounding boxes and obj names
 
         Parameters
         ----------
-        image: Pillow image
+        image: Pillow image or uint8 array of shape (height, width, 3) or
+            (height, width, 4) in RGB(A) channel order
         width: The line width, in pixels
         color: bounding box color
         fontsize: requested font size, in pixels
         font_path: path to font
         language_code: str language code if transliteration needs
+        inplace: draw on image itself instead of copy, e.g. on video frame buffer
 
         Returns
         -------
-        Copy of image with rendered boxes
+        Copy of image with rendered boxes or image itself if inplace is true
         """
-        img_copy = image.copy()
-        img_width = img_copy.width
-        img_height = img_copy.height
-        img_draw = ImageDraw.Draw(img_copy)
-        set_color = color is None
-        if font_path is not None:
-            font = PIL.ImageFont.truetype(font_path, size=fontsize)
+        start = _start()
+        res = self._draw_boxes(
+            image, width, color, fontsize, font_path, language_code, inplace
+        )
+        _stop("draw", start)
+        return res
+
+    def _draw_boxes(
+        self,
+        image: Union[Image.Image, np.ndarray],
+        width: int,
+        color: Optional[Tuple[int, int, int]],
+        fontsize: int,
+        font_path: Optional[str],
+        language_code: Optional[str],
+        inplace: bool,
+    ) -> Union[Image.Image, np.ndarray]:
+        if isinstance(image, np.ndarray):
+            if (
+                image.dtype != np.uint8
+                or image.ndim != 3
+                or image.shape[2] not in (3, 4)
+            ):
+                raise ValueError(
+                    "Array image must be uint8 of shape (height, width, 3 or 4)"
+                )
+            img_copy = image if inplace else image.copy()
+            img_height, img_width = img_copy.shape[:2]
+            img_draw = None
         else:
-            font = PIL.ImageFont.truetype(self._font_path, size=fontsize)
+            img_copy = image if inplace else image.copy()
+            img_width = img_copy.width
+            img_height = img_copy.height
+            img_draw = ImageDraw.Draw(img_copy)
+        set_color = color is None
+        font = get_font(font_path or self._font_path, fontsize)
         for obj in self.objects:
             if not isinstance(obj, PascalObjectProtocol):
-                logging.warning("Annotation has object which is not PascalObject")
+                _skip_object()
                 continue
             if set_color:
                 hash_id = get_name_hash(str(obj.name))
                 color = RAND_COLORS[hash_id]
             # draw rectangle
-            if is_relative_coords(obj.bndbox):
+            if self._is_relative(obj.bndbox):
                 p1 = (
                     float(obj.bndbox.xmin * img_width),
                     float(obj.bndbox.ymin * img_height),
@@ -102,18 +324,37 @@ class DrawObjectsMixin(PascalAnnotation):
             else:
                 p1 = (float(obj.bndbox.xmin), float(obj.bndbox.ymin))
                 p2 = (float(obj.bndbox.xmax), float(obj.bndbox.ymax))
-            img_draw.rectangle((p1, p2), outline=color, width=width)
+            if img_draw is None and (p2[0] < p1[0] or p2[1] < p1[1]):
+                raise ValueError("x1 must be greater than or equal to x0")
+            if img_draw is None:
+                channels = img_copy.shape[2]
+                _outline_array(
+                    img_copy, p1, p2, _array_color(tuple(color), channels), width
+                )
+            else:
+                img_draw.rectangle((p1, p2), outline=color, width=width)
             # draw text
             text_coord = (
                 float(p1[0] + width + 1),
                 float(p1[1] + width + 1),
             )
             if language_code is not None:
-                obj_name = str(translit(obj.name, language_code, reversed=True))
+                obj_name = _translit(str(obj.name), language_code)
             else:
                 obj_name = str(obj.name)
-            text_box = img_draw.textbbox(text_coord, obj_name, font=font)
+            mode = img_copy.mode if img_draw is not None else "RGB"
+            extent = _text_extent(obj_name, font, mode)
+            text_box = (
+                extent[0] + text_coord[0],
+                extent[1] + text_coord[1],
+                extent[2] + text_coord[0],
+                extent[3] + text_coord[1],
+            )
             rect_coords = _get_rect_coords(text_box, width // 2)
-            img_draw.rectangle(rect_coords, fill=(32, 32, 28))
-            img_draw.text(text_coord, obj_name, align="left", font=font)
+            if img_draw is None:
+                _fill_array(img_copy, rect_coords, _array_color(_LABEL_FILL, channels))
+                _text_array(img_copy, text_coord, obj_name, font)
+            else:
+                img_draw.rectangle(rect_coords, fill=_LABEL_FILL)
+                _draw_text(img_copy, img_draw, text_coord, obj_name, font)
         return img_copy
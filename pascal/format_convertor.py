@@ -1,12 +1,12 @@
+import json
 import logging
 from pathlib import Path
 from typing import List, Union
 
-from PIL import Image
-
 from pascal.exceptions import InconsistentAnnotation
+from pascal.instrumentation import UNMAPPED_LABEL, _skip_object, _start, _stop, count
 from pascal.protocols import PascalAnnotation, PascalObject, Size
-from pascal.utils import _is_primitive, base64img
+from pascal.utils import _attr_items, _is_primitive, _write_base64, base64file
 
 
 def get_shapes(obj_data) -> List[dict]:
@@ -15,7 +15,7 @@ def get_shapes(obj_data) -> List[dict]:
     shapes = []
     for obj in obj_data:
         if not isinstance(obj, PascalObject):
-            logging.warning("Annotation has object which is not PascalObject")
+            _skip_object()
             continue
         label = obj.name
         points = [
@@ -25,7 +25,7 @@ def get_shapes(obj_data) -> List[dict]:
             [obj.bndbox.xmin, obj.bndbox.ymax],
         ]
         obj_flags = {}
-        for k, v in obj.__dict__.items():
+        for k, v in _attr_items(obj):
             if _is_primitive(v) and k != "name":
                 obj_flags[k] = v
             if isinstance(v, list):
@@ -62,15 +62,17 @@ class FormatConvertorMixin(PascalAnnotation):
                 "Incorrect size. Size must have width and height attributes"
             )
 
+        start = _start()
         objects = []
         for obj in self:
             if not isinstance(obj, PascalObject):
-                logging.warning("Annotation has object which is not PascalObject")
+                _skip_object()
                 continue
             try:
                 label = labels_map[obj.name]
             except KeyError:
                 logging.warning(f"No label {obj.name} in label map. Skip object")
+                count(UNMAPPED_LABEL)
                 continue
             dx = float(obj.bndbox.xmax - obj.bndbox.xmin)
             dy = float(obj.bndbox.ymax - obj.bndbox.ymin)
@@ -82,6 +84,7 @@ class FormatConvertorMixin(PascalAnnotation):
             y /= self.size.height
             s = f"{label} {x:.{precision}f} {y:.{precision}f} {dx:.{precision}f} {dy:.{precision}f}"
             objects.append(s)
+        _stop("to_yolo", start)
         return "\n".join(objects)
 
     def to_labelme(
@@ -96,7 +99,7 @@ class FormatConvertorMixin(PascalAnnotation):
         Parameters
         ----------
         img_path: path to image
-        save_img_data: if true store encoded image in output dict
+        save_img_data: if true store base64 of image file bytes in output dict
         label_me_version: version of labelme app
 
         Returns
@@ -108,10 +111,10 @@ class FormatConvertorMixin(PascalAnnotation):
             if not img_path.exists():
                 raise FileNotFoundError(f"No such file: {img_path}")
 
+        start = _start()
         encoded_string = None
         if save_img_data:
-            img = Image.open(img_path)
-            encoded_string = base64img(img, img_path.suffix)
+            encoded_string = base64file(img_path)
 
         shapes = get_shapes(self.objects)
 
@@ -124,4 +127,47 @@ class FormatConvertorMixin(PascalAnnotation):
             imageHeight=self.size.height,
             imageWidth=self.size.width,
         )
+        _stop("to_labelme", start)
         return res
+
+    def save_labelme(
+        self,
+        output: Union[str, Path],
+        img_path: Union[str, Path] = None,
+        save_img_data: bool = False,
+        label_me_version: str = "5.3.0",
+        indent: int = 2,
+    ):
+        """
+        Save annotation to labelme json file
+        Image data is encoded and written by chunks, so neither image nor its base64 str
+        is held in memory. File content is the same as json.dumps of to_labelme result
+
+        Parameters
+        ----------
+        output: output json file
+        img_path: path to image
+        save_img_data: if true store base64 of image file bytes in json
+        label_me_version: version of labelme app
+        indent: json indent
+        """
+        if save_img_data:
+            img_path = Path(img_path)
+            if not img_path.exists():
+                raise FileNotFoundError(f"No such file: {img_path}")
+        res = self.to_labelme(img_path, False, label_me_version)
+        start = _start()
+        newline = "\n" + " " * indent
+        with open(output, "w") as f:
+            f.write("{")
+            for i, (key, value) in enumerate(res.items()):
+                f.write(("," if i else "") + newline + json.dumps(key) + ": ")
+                if key == "imageData" and save_img_data:
+                    f.write('"')
+                    _write_base64(f, img_path)
+                    f.write('"')
+                else:
+                    value = json.dumps(value, indent=indent)
+                    f.write(value.replace("\n", newline))
+            f.write("\n}")
+        _stop("serialize", start)
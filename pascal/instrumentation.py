@@ -0,0 +1,199 @@
+import logging
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from functools import partial
+from typing import Callable, Dict, Iterator, Optional
+
+NOT_PASCAL_OBJECT = "skipped.not_pascal_object"
+UNMAPPED_LABEL = "skipped.unmapped_label"
+
+# name, seconds (None for counters), number of calls or counted events
+Callback = Callable[[str, Optional[float], int], None]
+
+
+@dataclass
+class StageStats:
+    calls: int = 0
+    seconds: float = 0.0
+
+
+class Instrumentation:
+    """
+    Wall time and number of calls of library stages and counters of skipped objects
+
+    Stages:
+        parse: xml parsing by annotation_from_xml (xmlobj), annotation_from_voc
+            and annotation_from_yolo, annotation_from_voc checks boxes while parsing
+        adopt: moving parsed objects of annotation_from_xml to annotation.objects
+            with bndbox type check and clipping, objects are not copied
+        to_yolo, to_labelme: conversion of annotation
+        to_xml: conversion to xml elements in convert_dataset
+        serialize: xml and json text formatting and writing
+        draw: draw_boxes
+    Counters:
+        skipped.not_pascal_object: objects without name or bndbox
+        skipped.unmapped_label: objects without label in labels map or categories
+
+    Parameters
+    ----------
+    callback: optional callable(name, seconds, calls) called on every record,
+        seconds is None for counters
+    """
+
+    def __init__(self, callback: Optional[Callback] = None):
+        self.stages: Dict[str, StageStats] = {}
+        self.counters: Counter = Counter()
+        self.callback = callback
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, seconds: float, calls: int = 1):
+        with self._lock:
+            stats = self.stages.get(stage)
+            if stats is None:
+                stats = self.stages[stage] = StageStats()
+            stats.calls += calls
+            stats.seconds += seconds
+        if self.callback is not None:
+            self.callback(stage, seconds, calls)
+
+    def count(self, name: str, n: int = 1):
+        with self._lock:
+            self.counters[name] += n
+        if self.callback is not None:
+            self.callback(name, None, n)
+
+    def merge(self, other: "Instrumentation"):
+        """
+        Add records of other instrumentation, e.g. of process worker
+        Callback is called once for every stage and counter of other
+        """
+        for stage, stats in other.stages.items():
+            self.record(stage, stats.seconds, stats.calls)
+        for name, n in other.counters.items():
+            self.count(name, n)
+
+    def report(self) -> dict:
+        """
+        Json serializable dict of stages and counters
+        """
+        with self._lock:
+            return dict(
+                stages={
+                    stage: dict(calls=stats.calls, seconds=stats.seconds)
+                    for stage, stats in self.stages.items()
+                },
+                counters=dict(self.counters),
+            )
+
+    def __getstate__(self):
+        # sent from process workers without lock and callback
+        return dict(stages=self.stages, counters=self.counters)
+
+    def __setstate__(self, state):
+        self.__init__()
+        self.stages = state["stages"]
+        self.counters = state["counters"]
+
+
+# scoped to thread and asyncio task, thread workers of library pipelines
+# get instrumentation of calling thread by _bind_active
+_active: ContextVar[Optional[Instrumentation]] = ContextVar(
+    "pascal_instrumentation", default=None
+)
+
+
+def active() -> Optional[Instrumentation]:
+    """
+    Instrumentation of current instrument() block, None if instrumentation is off
+    """
+    return _active.get()
+
+
+@contextmanager
+def instrument(
+    instrumentation: Optional[Instrumentation] = None,
+    callback: Optional[Callback] = None,
+) -> Iterator[Instrumentation]:
+    """
+    Record stages and counters of library calls in block
+    Instrumentation is active in current thread or asyncio task and tasks
+    created in block, calls of other threads are not recorded.
+    Pipelines of convert_dataset, export_coco and others send records
+    of their thread and process workers to calling thread
+
+    Parameters
+    ----------
+    instrumentation: records are added to it, new Instrumentation if None
+    callback: callback of new Instrumentation,
+        ValueError is raised if it is passed with instrumentation
+
+    Returns
+    -------
+    Instrumentation
+    """
+    if instrumentation is not None and callback is not None:
+        raise ValueError("Pass callback to Instrumentation instead")
+    if instrumentation is None:
+        instrumentation = Instrumentation(callback)
+    token = _active.set(instrumentation)
+    try:
+        yield instrumentation
+    finally:
+        _active.reset(token)
+
+
+def _start() -> Optional[float]:
+    """
+    Start time of stage, None if instrumentation is off
+    """
+    return None if _active.get() is None else time.perf_counter()
+
+
+def _stop(stage: str, start: Optional[float], calls: int = 1):
+    if start is not None:
+        instrumentation = _active.get()
+        if instrumentation is not None:
+            instrumentation.record(stage, time.perf_counter() - start, calls)
+
+
+def count(name: str, n: int = 1):
+    instrumentation = _active.get()
+    if instrumentation is not None and n:
+        instrumentation.count(name, n)
+
+
+def _skip_object():
+    logging.warning("Annotation has object which is not PascalObject")
+    count(NOT_PASCAL_OBJECT)
+
+
+def _call_recorded(func, item):
+    """
+    Call func in process worker and return its result with worker records
+    """
+    with instrument() as instrumentation:
+        res = func(item)
+    return res, instrumentation
+
+
+def _call_with(instrumentation, func, *args):
+    token = _active.set(instrumentation)
+    try:
+        return func(*args)
+    finally:
+        _active.reset(token)
+
+
+def _bind_active(func):
+    """
+    func which records to instrumentation active in calling thread,
+    when it is called by thread worker
+    """
+    instrumentation = _active.get()
+    if instrumentation is None:
+        return func
+    return partial(_call_with, instrumentation, func)
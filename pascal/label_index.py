@@ -0,0 +1,234 @@
+import os
+from dataclasses import dataclass, field
+from functools import partial
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from pascal.convert import _BACKENDS, _run_pipeline
+from pascal.exceptions import InconsistentAnnotation, ParseException
+from pascal.instrumentation import _skip_object
+from pascal.manifest import Manifest, _spec_option, fingerprint, is_unchanged
+from pascal.protocols import PascalObject as PascalObjectProtocol
+from pascal.voc_parser import annotation_from_voc
+
+
+@dataclass
+class IndexStats:
+    indexed: int = 0
+    skipped: int = 0
+    removed: int = 0
+    errors: List[Tuple[Path, Exception]] = field(default_factory=list)
+
+
+def _index_file(
+    file_path: Path, attributes: Sequence[str], attr_type_spec: Optional[dict]
+) -> Tuple[Optional[dict], Optional[Exception]]:
+    """
+    Positions of objects of every name and attribute value in annotation file
+    """
+    try:
+        ann = annotation_from_voc(file_path, attr_type_spec)
+    except (ParseException, InconsistentAnnotation, OSError) as ex:
+        return None, type(ex)(str(ex))
+    labels = {}
+    values = {attr: {} for attr in attributes}
+    for position, obj in enumerate(ann.objects):
+        if not isinstance(obj, PascalObjectProtocol):
+            _skip_object()
+            continue
+        labels.setdefault(str(obj.name), []).append(position)
+        for attr in attributes:
+            value = getattr(obj, attr, None)
+            if value is not None:
+                values[attr].setdefault(str(value), []).append(position)
+    return dict(labels=labels, attributes=values), None
+
+
+class LabelIndex:
+    """
+    Inverted index of object names and attribute values of annotation files
+    Index is stored in json file with fingerprints of indexed files,
+    update parses only added and modified files
+
+    Parameters
+    ----------
+    path: index json file, loaded if exists
+    attributes: object attributes to index, e.g. ("difficult", "pose")
+    attr_type_spec: dict, optional
+        specify attribute types to explicitly cast attribute values
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        attributes: Sequence[str] = (),
+        attr_type_spec: Optional[dict] = None,
+    ):
+        self.attributes = list(attributes)
+        self.attr_type_spec = attr_type_spec
+        options = dict(
+            attributes=self.attributes, attr_type_spec=_spec_option(attr_type_spec)
+        )
+        # entries of other attributes are parsed again on update
+        self._manifest = Manifest.load(path, options)
+        self._postings = None
+
+    @property
+    def path(self) -> Path:
+        return self._manifest.path
+
+    def __len__(self) -> int:
+        return sum("labels" in entry for entry in self._manifest.entries.values())
+
+    def update(
+        self,
+        files: Iterable[Union[str, Path]],
+        workers: Optional[int] = None,
+        backend: str = "process",
+        use_hash: bool = False,
+        queue_size: Optional[int] = None,
+    ) -> IndexStats:
+        """
+        Index added and modified files and drop files which are not in files,
+        index is saved to path
+
+        Parameters
+        ----------
+        files: all xml files of dataset
+        workers: number of workers, os.cpu_count() if None
+        backend: "process" or "thread"
+        use_hash: store content hash, file with changed modification time
+            is parsed again only if its content has changed
+        queue_size: max number of files in progress, 4 * workers if None
+
+        Returns
+        -------
+        IndexStats
+        """
+        if backend not in _BACKENDS:
+            raise ValueError(f"Unknown backend: {backend}. Use one of {_BACKENDS}")
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if queue_size is None:
+            queue_size = 4 * max(1, workers)
+        stats = IndexStats()
+        entries = self._manifest.entries
+        fingerprints = {}
+        changed = []
+        for file_path in files:
+            file_path = Path(file_path)
+            key = str(file_path.resolve())
+            current = fingerprint(file_path, use_hash)
+            fingerprints[key] = current
+            record = entries.get(key)
+            if "labels" in (record or {}) and is_unchanged(file_path, record, current):
+                record.update(current)
+                stats.skipped += 1
+            else:
+                changed.append(file_path)
+        for key in [k for k in entries if k not in fingerprints]:
+            del entries[key]
+            stats.removed += 1
+
+        def add(file_path: Path, entry: Optional[dict], error: Optional[Exception]):
+            key = str(file_path.resolve())
+            if error is not None:
+                entries.pop(key, None)
+                stats.errors.append((file_path, error))
+                return
+            entries[key] = dict(fingerprints[key], **entry)
+            stats.indexed += 1
+
+        index = partial(
+            _index_file,
+            attributes=self.attributes,
+            attr_type_spec=self.attr_type_spec,
+        )
+        try:
+            _run_pipeline(changed, index, add, workers, backend, queue_size)
+        finally:
+            self._postings = None
+            self._manifest.save()
+        return stats
+
+    def _build_postings(self) -> Dict[Tuple, Dict[str, List[int]]]:
+        """
+        Positions in every file of (name,) and (attribute, value) keys
+        """
+        if self._postings is None:
+            postings = {}
+            for key, entry in sorted(self._manifest.entries.items()):
+                for name, positions in entry.get("labels", {}).items():
+                    postings.setdefault((name,), {})[key] = positions
+                for attr, values in entry.get("attributes", {}).items():
+                    for value, positions in values.items():
+                        postings.setdefault((attr, value), {})[key] = positions
+            self._postings = postings
+        return self._postings
+
+    @property
+    def names(self) -> Dict[str, int]:
+        """
+        Number of files with objects of every name
+        """
+        return {
+            key[0]: len(files)
+            for key, files in self._build_postings().items()
+            if len(key) == 1
+        }
+
+    def objects(
+        self, name: Optional[str] = None, **attributes
+    ) -> Dict[Path, List[int]]:
+        """
+        Positions in ann.objects of objects with name and attribute values
+
+        Parameters
+        ----------
+        name: object name, any name if None
+        attributes: indexed attribute values, e.g. difficult=0, pose="Left",
+            values are compared as str
+
+        Returns
+        -------
+        dict of file path and sorted positions of matched objects
+        """
+        postings = self._build_postings()
+        keys = [] if name is None else [(name,)]
+        for attr, value in attributes.items():
+            if attr not in self.attributes:
+                raise ValueError(f"Attribute {attr} is not indexed")
+            keys.append((attr, str(value)))
+        if not keys:
+            keys = [key for key in postings if len(key) == 1]
+            res = {}
+            for key in keys:
+                for file, positions in postings[key].items():
+                    res.setdefault(file, []).extend(positions)
+            return {Path(k): sorted(v) for k, v in sorted(res.items())}
+        lists = [postings.get(key, {}) for key in keys]
+        res = {}
+        for file in sorted(min(lists, key=len)):
+            common = None
+            for files in lists:
+                positions = files.get(file)
+                if positions is None:
+                    common = None
+                    break
+                common = set(positions) if common is None else common & set(positions)
+            if common:
+                res[Path(file)] = sorted(common)
+        return res
+
+    def files(self, *names: str, match: str = "all") -> List[Path]:
+        """
+        Sorted files with objects of all names (match="all") or any name (match="any")
+        """
+        if match not in ("all", "any"):
+            raise ValueError(f"Unknown match: {match}. Use 'all' or 'any'")
+        postings = self._build_postings()
+        sets = [set(postings.get((name,), {})) for name in names]
+        if not sets:
+            return []
+        files = set.intersection(*sets) if match == "all" else set.union(*sets)
+        return [Path(file) for file in sorted(files)]
@@ -0,0 +1,138 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple, Union
+
+from pascal.annotation_fabric import _from_state, _to_state, annotation_from_xml
+from pascal.cache import ParseCache, _cache_key
+from pascal.exceptions import InconsistentAnnotation, ParseException
+from pascal.instrumentation import _bind_active
+from pascal.protocols import PascalAnnotation
+
+_BACKENDS = ("process", "thread")
+
+
+def list_annotation_files(ann_dir: Union[str, Path]) -> List[Path]:
+    """
+    Sorted list of xml files in annotation directory
+    """
+    return sorted(Path(ann_dir).glob("*.xml"))
+
+
+def _load_one(
+    file_path: Path,
+    attr_type_spec: Optional[dict],
+    clip_zero: bool,
+    as_state: bool,
+):
+    try:
+        ann = annotation_from_xml(file_path, attr_type_spec, clip_zero)
+    except (ParseException, InconsistentAnnotation) as ex:
+        # exception arguments may hold objects which cannot be pickled
+        return None, type(ex)(str(ex))
+    if as_state:
+        return _to_state(ann), None
+    return ann, None
+
+
+def load_dataset(
+    ann_dir: Union[str, Path, Iterable[Union[str, Path]]],
+    workers: Optional[int] = None,
+    backend: str = "process",
+    attr_type_spec: Optional[dict] = None,
+    clip_zero: bool = True,
+    chunksize: int = 64,
+    cache_dir: Optional[Union[str, Path]] = None,
+    use_hash: bool = False,
+) -> Tuple[List[PascalAnnotation], List[Tuple[Path, Exception]]]:
+    """
+    Parse all PascalVOC annotation files in parallel
+
+    Parameters
+    ----------
+    ann_dir: path to directory with xml files or iterable of xml files
+    workers: number of workers, os.cpu_count() if None
+    backend: "process" or "thread"
+    attr_type_spec: dict, optional
+        specify attribute types to explicitly cast attribute values
+    clip_zero: clip negative bbox values to 0
+    chunksize: number of files sent to process worker at once
+    cache_dir: optional ParseCache directory, only changed files are parsed.
+        Cache is not used if attr_type_spec has lambdas or local functions
+    use_hash: check content hash of files with changed modification time,
+        see ParseCache
+
+    Returns
+    -------
+    List of annotations sorted by file path and list of (file, exception) pairs
+    for files which cannot be parsed
+    """
+    if backend not in _BACKENDS:
+        raise ValueError(f"Unknown backend: {backend}. Use one of {_BACKENDS}")
+    if isinstance(ann_dir, (str, Path)):
+        files = list_annotation_files(ann_dir)
+    else:
+        files = sorted(Path(f) for f in ann_dir)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if cache_dir is None or _cache_key(attr_type_spec, clip_zero) is None:
+        return _load_files(
+            files, workers, backend, attr_type_spec, clip_zero, chunksize
+        )
+    with ParseCache(cache_dir, attr_type_spec, clip_zero, use_hash) as cache:
+        cached = {}
+        for file in files:
+            state = cache.get_state(file)
+            if state is not None:
+                cached[file] = state
+        changed = [file for file in files if file not in cached]
+        stats = {file: os.stat(file) for file in changed}
+        results = _run(
+            changed, workers, backend, attr_type_spec, clip_zero, chunksize, True
+        )
+        annotations = []
+        errors = []
+        for file, (state, error) in zip(changed, results):
+            if error is not None:
+                errors.append((file, error))
+                continue
+            cache.put_state(file, state, stats[file])
+            cached[file] = state
+        for file in files:
+            if file in cached:
+                annotations.append(_from_state(cached[file]))
+    return annotations, errors
+
+
+def _run(files, workers, backend, attr_type_spec, clip_zero, chunksize, as_state):
+    load = partial(
+        _load_one,
+        attr_type_spec=attr_type_spec,
+        clip_zero=clip_zero,
+        as_state=as_state,
+    )
+    if workers <= 1:
+        return list(map(load, files))
+    if backend == "process":
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(load, files, chunksize=max(1, chunksize)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_bind_active(load), files))
+
+
+def _load_files(files, workers, backend, attr_type_spec, clip_zero, chunksize):
+    as_state = backend == "process" and workers > 1
+    results = _run(
+        files, workers, backend, attr_type_spec, clip_zero, chunksize, as_state
+    )
+    annotations = []
+    errors = []
+    for file, (ann, error) in zip(files, results):
+        if error is not None:
+            errors.append((file, error))
+            continue
+        if as_state:
+            ann = _from_state(ann)
+        annotations.append(ann)
+    return annotations, errors
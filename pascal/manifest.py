@@ -0,0 +1,107 @@
+import json
+import os
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+from pascal.utils import _file_digest, _type_name
+
+MANIFEST_NAME = ".pascal_manifest.json"
+_MANIFEST_VERSION = 1
+
+
+def _spec_option(attr_type_spec: Optional[dict]) -> Optional[dict]:
+    """
+    Attribute type spec stored in manifest options, types are stored by name,
+    None for lambdas and local functions
+    """
+    if attr_type_spec is None:
+        return None
+    return {k: _type_name(t) for k, t in attr_type_spec.items()}
+
+
+def _reusable(options: dict) -> bool:
+    # types without name may differ from types of previous run
+    spec = options.get("attr_type_spec") or {}
+    return None not in spec.values()
+
+
+def fingerprint(file_path: Union[str, Path], use_hash: bool = False) -> dict:
+    """
+    Size, modification time and optional content hash of file
+    """
+    stat = os.stat(file_path)
+    res = dict(size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+    if use_hash:
+        res["hash"] = _file_digest(file_path)
+    return res
+
+
+def is_unchanged(
+    file_path: Union[str, Path], record: Optional[dict], current: dict
+) -> bool:
+    """
+    Compare current file fingerprint with stored record
+    If modification time has changed, file is unchanged only if content hash is the same
+    """
+    if record is None or record.get("size") != current["size"]:
+        return False
+    if record.get("mtime_ns") == current["mtime_ns"]:
+        return True
+    if record.get("hash") is None:
+        return False
+    if "hash" not in current:
+        current["hash"] = _file_digest(file_path)
+    return record["hash"] == current["hash"]
+
+
+class Manifest:
+    """
+    Fingerprints of converted source files and names of output files
+
+    Parameters
+    ----------
+    path: manifest json file
+    options: conversion options, manifest entries are valid only for the same options
+    """
+
+    def __init__(self, path: Union[str, Path], options: Optional[dict] = None):
+        self.path = Path(path)
+        self.options = {} if options is None else options
+        self.entries: Dict[str, dict] = {}
+
+    @classmethod
+    def load(cls, path: Union[str, Path], options: Optional[dict] = None) -> "Manifest":
+        """
+        Load manifest from file
+        Manifest is empty if file does not exist. If file was written with other
+        options, entries keep output names only, so all files are converted again
+        and previous outputs with other names are deleted.
+        Entries are not reused either if attr_type_spec option has types without name
+        """
+        manifest = cls(path, options)
+        if not manifest.path.exists():
+            return manifest
+        with open(manifest.path, "r") as f:
+            data = json.load(f)
+        if (
+            data.get("version") == _MANIFEST_VERSION
+            and data.get("options") == manifest.options
+            and _reusable(manifest.options)
+        ):
+            manifest.entries = data.get("entries", {})
+        else:
+            # fingerprints are outdated, outputs are kept to be replaced or deleted
+            manifest.entries = {
+                k: dict(output=v.get("output"))
+                for k, v in data.get("entries", {}).items()
+            }
+        return manifest
+
+    def save(self):
+        data = dict(
+            version=_MANIFEST_VERSION, options=self.options, entries=self.entries
+        )
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,180 @@
+from dataclasses import dataclass, field
+from typing import Collection, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+from pascal.dataset import AnnotationDataset, _attr_value
+from pascal.instrumentation import _skip_object
+from pascal.protocols import PascalAnnotation
+from pascal.protocols import PascalObject as PascalObjectProtocol
+from pascal.protocols import Size as SizeProtocol
+
+AttrValue = Union[float, Collection[float]]
+
+
+@dataclass
+class ObjectFilter:
+    """
+    Predicate over objects, object is kept if all conditions hold
+    Conditions are evaluated on arrays of all objects at once
+
+    Parameters
+    ----------
+    names: keep only objects of these names, any name if None
+    exclude_names: drop objects of these names
+    min_area, max_area: box area limits
+    min_aspect, max_aspect: box width / height limits
+    min_side: min box width and height
+    attributes: numeric attribute values, e.g. {"difficult": 0} or
+        {"truncated": (0, 1)}, objects without attribute are dropped.
+        mask raises ValueError if dataset has no column of attribute,
+        see attr_names of AnnotationDataset.from_annotations
+    inside_image: drop boxes which are not inside image,
+        objects of images without size are dropped
+    """
+
+    names: Optional[Collection[str]] = None
+    exclude_names: Collection[str] = ()
+    min_area: Optional[float] = None
+    max_area: Optional[float] = None
+    min_aspect: Optional[float] = None
+    max_aspect: Optional[float] = None
+    min_side: Optional[float] = None
+    attributes: Dict[str, AttrValue] = field(default_factory=dict)
+    inside_image: bool = False
+
+    def __post_init__(self):
+        if self.names is not None:
+            self.names = frozenset(self.names)
+        self.exclude_names = frozenset(self.exclude_names)
+        self.attributes = {
+            attr: np.atleast_1d(np.asarray(value, dtype=np.float64))
+            for attr, value in self.attributes.items()
+        }
+
+    def _name_table(self, names: Sequence[str]) -> Optional[np.ndarray]:
+        """
+        Bool value for every name, None if names are not checked
+        """
+        if self.names is None and not self.exclude_names:
+            return None
+        return np.array(
+            [
+                (self.names is None or name in self.names)
+                and name not in self.exclude_names
+                for name in names
+            ],
+            dtype=bool,
+        )
+
+    def _mask(
+        self,
+        boxes: np.ndarray,
+        label_ids: np.ndarray,
+        names: Sequence[str],
+        sizes: np.ndarray,
+        attributes: Dict[str, np.ndarray],
+    ) -> np.ndarray:
+        """
+        Bool mask of objects, sizes are image sizes of objects
+        """
+        keep = np.ones(len(boxes), dtype=bool)
+        table = self._name_table(names)
+        if table is not None and len(boxes) > 0:
+            keep &= table[label_ids]
+        w = boxes[:, 2] - boxes[:, 0]
+        h = boxes[:, 3] - boxes[:, 1]
+        if self.min_area is not None or self.max_area is not None:
+            area = w * h
+            if self.min_area is not None:
+                keep &= area >= self.min_area
+            if self.max_area is not None:
+                keep &= area <= self.max_area
+        if self.min_aspect is not None or self.max_aspect is not None:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                aspect = w / h
+            if self.min_aspect is not None:
+                keep &= aspect >= self.min_aspect
+            if self.max_aspect is not None:
+                keep &= aspect <= self.max_aspect
+        if self.min_side is not None:
+            keep &= np.minimum(w, h) >= self.min_side
+        for attr, values in self.attributes.items():
+            column = attributes.get(attr)
+            if column is None:
+                raise ValueError(f"No attribute {attr}")
+            keep &= np.isin(column, values)
+        if self.inside_image:
+            keep &= (boxes[:, 0] >= 0) & (boxes[:, 1] >= 0)
+            keep &= (boxes[:, 2] <= sizes[:, 0]) & (boxes[:, 3] <= sizes[:, 1])
+        return keep
+
+    def mask(self, dataset: AnnotationDataset) -> np.ndarray:
+        """
+        (n_objects,) bool mask of kept objects of dataset,
+        use dataset.select(mask) to make filtered dataset
+        Objects without attribute have NaN in its column and are dropped,
+        ValueError is raised if dataset does not store attribute at all
+        """
+        sizes = dataset.sizes.astype(np.float64)[dataset.image_ids()]
+        return self._mask(
+            np.asarray(dataset.boxes, dtype=np.float64),
+            dataset.label_ids,
+            dataset.names,
+            sizes,
+            dataset.attributes,
+        )
+
+    def filter_annotations(self, annotations: List[PascalAnnotation]) -> int:
+        """
+        Remove objects which do not match filter from annotations
+        Objects of all annotations are checked at once,
+        objects which are not PascalObject are kept
+
+        Returns
+        -------
+        number of removed objects
+        """
+        boxes = []
+        label_ids = []
+        sizes = []
+        name_ids = {}
+        attributes = {attr: [] for attr in self.attributes}
+        positions = []
+        for ann in annotations:
+            size = ann.size
+            if isinstance(size, SizeProtocol):
+                size = (size.width, size.height)
+            else:
+                size = (np.nan, np.nan)
+            ann_positions = []
+            for position, obj in enumerate(ann.objects):
+                if not isinstance(obj, PascalObjectProtocol):
+                    _skip_object()
+                    continue
+                box = obj.bndbox
+                boxes.append((box.xmin, box.ymin, box.xmax, box.ymax))
+                label_ids.append(name_ids.setdefault(str(obj.name), len(name_ids)))
+                sizes.append(size)
+                for attr, column in attributes.items():
+                    column.append(_attr_value(obj, attr))
+                ann_positions.append(position)
+            positions.append(ann_positions)
+        keep = self._mask(
+            np.array(boxes, dtype=np.float64).reshape(-1, 4),
+            np.array(label_ids, dtype=np.int64),
+            list(name_ids),
+            np.array(sizes, dtype=np.float64).reshape(-1, 2),
+            {attr: np.array(column) for attr, column in attributes.items()},
+        ).tolist()
+        removed = 0
+        start = 0
+        for ann, ann_positions in zip(annotations, positions):
+            ann_keep = keep[start : start + len(ann_positions)]
+            start += len(ann_positions)
+            if all(ann_keep):
+                continue
+            dropped = {p for p, k in zip(ann_positions, ann_keep) if not k}
+            ann.objects = [obj for p, obj in enumerate(ann.objects) if p not in dropped]
+            removed += len(dropped)
+        return removed
@@ -7,7 +7,9 @@ from xmlobj.xmlmapping import XMLMixin
 from pascal.draw_objects import DrawObjectsMixin
 from pascal.exceptions import InconsistentAnnotation
 from pascal.format_convertor import FormatConvertorMixin
+from pascal.instrumentation import _start, _stop
 from pascal.protocol_implementations import BndBox, Object, Size
+from pascal.utils import _to_xml, xml_to_str
 
 
 class Annotation(DrawObjectsMixin, XMLMixin, FormatConvertorMixin):
@@ -16,6 +18,19 @@ class Annotation(DrawObjectsMixin, XMLMixin, FormatConvertorMixin):
         self.objects = objects
         self.size = size
 
+    def to_xml(self):
+        # objects and size may be compact classes, which are not XMLMixin
+        return _to_xml(self, "annotation")
+
+    def __str__(self):
+        # XMLMixin.__str__ skips or fails on children which are not XMLMixin,
+        # such as compact classes, they are formatted from to_xml
+        if isinstance(self.size, XMLMixin) and all(
+            isinstance(obj, XMLMixin) for obj in self.objects
+        ):
+            return super().__str__()
+        return xml_to_str(self.to_xml())
+
 
 def annotation_from_yolo(
     ann_path: Union[str, Path],
@@ -39,6 +54,7 @@ def annotation_from_yolo(
     -------
     PascalAnnotation object
     """
+    start = _start()
     objects = []
     has_label_map = label_map is not None
     if img_w <= 1 or img_h <= 1:
@@ -48,7 +64,9 @@ def annotation_from_yolo(
     with open(ann_path, "r") as f:
         lines = f.readlines()
     for line in lines:
-        vals = line.split(" ")
+        vals = line.split()
+        if len(vals) == 0:
+            continue
         class_id = int(vals[0])
         x = float(vals[1])
         y = float(vals[2])
@@ -82,4 +100,5 @@ def annotation_from_yolo(
     ann = Annotation(Path(ann_path).stem, objects, Size(img_w, img_h))
     if not isinstance(ann, Annotation):
         raise InconsistentAnnotation(f"Cannot make annotation from file: {ann_path}")
+    _stop("parse", start)
     return ann
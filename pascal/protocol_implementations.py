@@ -1,11 +1,12 @@
 from dataclasses import dataclass
-from typing import Union
+from typing import Optional, Union
 
 from xmlobj.xmlmapping import XMLMixin
 
 from pascal.protocols import BndBox as BndBoxProtocol
 from pascal.protocols import PascalObject as PascalObjectProtocol
 from pascal.protocols import Size as SizeProtocol
+from pascal.utils import _attr_items, _to_xml, xml_to_str
 
 
 @dataclass
@@ -22,7 +23,127 @@ class Object(PascalObjectProtocol, XMLMixin):
     bndbox: BndBox
 
 
+@dataclass
+class Part(Object):
+    pass
+
+
 @dataclass
 class Size(SizeProtocol, XMLMixin):
     width: Union[float, int]
     height: Union[float, int]
+
+
+class _CompactMixin:
+    """
+    to_xml, repr and comparison for classes with __slots__
+    Compact classes do not inherit protocols and XMLMixin to avoid instance __dict__,
+    protocols are satisfied structurally
+    """
+
+    __slots__ = ()
+    _root_name = ""
+
+    def to_xml(self):
+        return _to_xml(self, self._root_name)
+
+    def __str__(self):
+        return xml_to_str(self.to_xml())
+
+    def __repr__(self):
+        attrs = ", ".join(f"{k}={v!r}" for k, v in _attr_items(self))
+        return f"{self.__class__.__name__}({attrs})"
+
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return all(
+            getattr(self, k, None) == getattr(other, k, None) for k in self.__slots__
+        )
+
+
+class CompactBndBox(_CompactMixin):
+    __slots__ = ("xmin", "ymin", "xmax", "ymax")
+    _root_name = "bndbox"
+
+    def __init__(
+        self,
+        xmin: Union[float, int],
+        ymin: Union[float, int],
+        xmax: Union[float, int],
+        ymax: Union[float, int],
+    ):
+        self.xmin = xmin
+        self.ymin = ymin
+        self.xmax = xmax
+        self.ymax = ymax
+
+    @classmethod
+    def from_box(cls, box: BndBoxProtocol) -> "CompactBndBox":
+        return cls(box.xmin, box.ymin, box.xmax, box.ymax)
+
+
+class CompactObject(_CompactMixin):
+    """
+    Object with __slots__ of standard PascalVOC attributes
+    Other attributes, e.g. part, are kept in extra dict and read as attributes
+    """
+
+    __slots__ = ("name", "pose", "truncated", "difficult", "bndbox", "extra")
+    _root_name = "object"
+    _known = frozenset(__slots__)
+
+    def __init__(
+        self,
+        name: str,
+        bndbox: CompactBndBox,
+        pose: Optional[str] = None,
+        truncated: Optional[Union[int, bool]] = None,
+        difficult: Optional[Union[int, bool]] = None,
+        extra: Optional[dict] = None,
+    ):
+        self.name = name
+        self.pose = pose
+        self.truncated = truncated
+        self.difficult = difficult
+        self.bndbox = bndbox
+        self.extra = extra or None
+
+    def __getattr__(self, item):
+        # called for attributes which are not slots
+        if item != "extra" and self.extra is not None and item in self.extra:
+            return self.extra[item]
+        raise AttributeError(
+            f"{self.__class__.__name__!r} object has no attribute {item!r}"
+        )
+
+    @classmethod
+    def from_object(cls, obj: PascalObjectProtocol) -> "CompactObject":
+        extra = {k: v for k, v in _attr_items(obj) if k not in cls._known}
+        return cls(
+            obj.name,
+            CompactBndBox.from_box(obj.bndbox),
+            getattr(obj, "pose", None),
+            getattr(obj, "truncated", None),
+            getattr(obj, "difficult", None),
+            extra,
+        )
+
+
+class CompactSize(_CompactMixin):
+    __slots__ = ("width", "height", "depth")
+    _root_name = "size"
+
+    def __init__(
+        self,
+        width: Union[float, int],
+        height: Union[float, int],
+        depth: Optional[int] = None,
+    ):
+        self.width = width
+        self.height = height
+        self.depth = depth
+
+    @classmethod
+    def from_size(cls, size: SizeProtocol) -> "CompactSize":
+        return cls(size.width, size.height, getattr(size, "depth", None))
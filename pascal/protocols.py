@@ -37,6 +37,7 @@ class PascalAnnotation(Protocol):
 
     def filter_objects(self, names: List):
         """Filter objects by names"""
+        names = set(names)
         ind = []
         for i, obj in enumerate(self.objects):
             if obj.name not in names:
@@ -0,0 +1,409 @@
+import os
+import re
+import time
+from functools import partial
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from PIL import Image, ImageDraw
+
+from pascal.convert import _BACKENDS, ConvertStats, _run_pipeline
+from pascal.draw_objects import DrawObjectsMixin, get_font, is_relative_coords
+from pascal.exceptions import InconsistentAnnotation, ParseException
+from pascal.instrumentation import _skip_object
+from pascal.pascal_annotation import Annotation
+from pascal.protocol_implementations import BndBox, Object, Size
+from pascal.protocols import PascalAnnotation, PascalObject
+from pascal.voc_parser import annotation_from_voc
+
+IMAGE_SUFFIX = {"JPEG": ".jpg", "PNG": ".png", "WEBP": ".webp"}
+
+AnnotationSource = Union[PascalAnnotation, str, Path]
+
+_CAPTION_FONTSIZE = 10
+_CAPTION_HEIGHT = 14
+_BACKGROUND = (24, 24, 24)
+
+
+class _PixelAnnotation(Annotation):
+    """
+    Annotation with boxes in pixels of drawn image, see _drawable
+    """
+
+    def _is_relative(self, box: BndBox) -> bool:
+        return False
+
+
+def _drawable(
+    ann: PascalAnnotation,
+    img_size: Optional[Tuple[int, int]] = None,
+    sx: float = 1.0,
+    sy: float = 1.0,
+) -> Annotation:
+    """
+    Copy of annotation with names and boxes only
+    Result can be pickled and sent to worker process
+
+    If img_size is given, boxes are converted to pixels of image of that size:
+    relative boxes are multiplied by image size, absolute boxes are scaled by sx, sy.
+    Relative coords are checked on original box, scaled absolute box near image
+    border may look like relative one
+    """
+    objects = []
+    for obj in ann.objects:
+        if not isinstance(obj, PascalObject):
+            _skip_object()
+            continue
+        box = obj.bndbox
+        if img_size is None:
+            box = BndBox(box.xmin, box.ymin, box.xmax, box.ymax)
+        else:
+            if is_relative_coords(box):
+                kx, ky = img_size
+            else:
+                kx, ky = sx, sy
+            box = BndBox(box.xmin * kx, box.ymin * ky, box.xmax * kx, box.ymax * ky)
+        objects.append(Object(str(obj.name), box))
+    size = None
+    if ann.size is not None:
+        size = Size(ann.size.width, ann.size.height)
+    if img_size is None:
+        return Annotation(ann.filename, objects, size)
+    return _PixelAnnotation(ann.filename, objects, size)
+
+
+def load_preview(
+    img_path: Union[str, Path], max_size: Optional[int] = None
+) -> Tuple[Image.Image, float, float]:
+    """
+    Open image reduced to max_size
+    JPEG images are decoded at reduced scale (draft mode)
+
+    Parameters
+    ----------
+    img_path: path to image
+    max_size: max side of result image, full size image if None
+
+    Returns
+    -------
+    RGB image and its scale along x and y relative to original image
+    """
+    img = Image.open(img_path)
+    width, height = img.size
+    if max_size is not None and max(width, height) > max_size:
+        img.draft("RGB", (max_size, max_size))
+    img = img.convert("RGB")
+    if max_size is not None and max(img.size) > max_size:
+        img.thumbnail((max_size, max_size))
+    return img, img.width / width, img.height / height
+
+
+def _render_one(
+    item: Tuple[Union[Annotation, str, Path], Union[str, Path]],
+    max_size: Optional[int],
+    draw_kwargs: dict,
+) -> Tuple[Optional[Image.Image], Optional[Exception]]:
+    ann, img_path = item
+    try:
+        if isinstance(ann, (str, Path)):
+            ann = annotation_from_voc(ann)
+        img, sx, sy = load_preview(img_path, max_size)
+        return _drawable(ann, img.size, sx, sy).draw_boxes(img, **draw_kwargs), None
+    except (OSError, ParseException, InconsistentAnnotation) as ex:
+        return None, type(ex)(str(ex))
+
+
+def _render_and_save(item, out_file_name, max_size, draw_kwargs, save_kwargs):
+    img, error = _render_one(item, max_size, draw_kwargs)
+    if error is not None:
+        return None, error
+    out_file = out_file_name(item[1])
+    img.save(out_file, **save_kwargs)
+    return out_file, None
+
+
+def render_dataset(
+    pairs: Iterable[Tuple[AnnotationSource, Union[str, Path]]],
+    out_dir: Union[str, Path],
+    workers: Optional[int] = None,
+    format: str = "JPEG",
+    quality: int = 85,
+    max_size: Optional[int] = None,
+    backend: str = "thread",
+    queue_size: Optional[int] = None,
+    **draw_kwargs,
+) -> ConvertStats:
+    """
+    Render annotated previews of images
+    Images are decoded, drawn and encoded by workers, number of images in progress
+    is limited by queue_size
+
+    Parameters
+    ----------
+    pairs: iterable of (annotation, image path), annotation is PascalAnnotation
+        or path to PascalVOC xml file
+    out_dir: output directory, file names are image file names with format suffix
+    workers: number of workers, os.cpu_count() if None
+    format: output image format: "JPEG", "PNG" or "WEBP"
+    quality: JPEG and WEBP quality
+    max_size: max side of preview, JPEG images are decoded at reduced scale
+    backend: "thread" or "process"
+    queue_size: max number of images in progress, 2 * workers if None
+    draw_kwargs: draw_boxes arguments: width, color, fontsize, font_path, language_code
+
+    Returns
+    -------
+    ConvertStats, converted is number of rendered images
+    """
+    format = format.upper()
+    if format not in IMAGE_SUFFIX:
+        raise ValueError(f"Unknown format: {format}. Use one of {tuple(IMAGE_SUFFIX)}")
+    if backend not in _BACKENDS:
+        raise ValueError(f"Unknown backend: {backend}. Use one of {_BACKENDS}")
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if queue_size is None:
+        queue_size = 2 * max(1, workers)
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    suffix = IMAGE_SUFFIX[format]
+    save_kwargs = dict(format=format)
+    if format != "PNG":
+        save_kwargs["quality"] = quality
+    render = partial(
+        _render_and_save,
+        out_file_name=partial(_out_file_name, out_dir=out_dir, suffix=suffix),
+        max_size=max_size,
+        draw_kwargs=draw_kwargs,
+        save_kwargs=save_kwargs,
+    )
+    stats = ConvertStats()
+
+    def collect(item, out_file, error):
+        if error is not None:
+            stats.errors.append((Path(item[1]), error))
+        else:
+            stats.converted += 1
+
+    items = (
+        (ann if isinstance(ann, (str, Path)) else _drawable(ann), img_path)
+        for ann, img_path in pairs
+    )
+    start = time.perf_counter()
+    _run_pipeline(items, render, collect, workers, backend, queue_size)
+    stats.elapsed = time.perf_counter() - start
+    return stats
+
+
+def _out_file_name(img_path: Union[str, Path], out_dir: Path, suffix: str) -> Path:
+    return out_dir / Path(img_path).with_suffix(suffix).name
+
+
+def _make_tile(
+    img: Image.Image, thumb_size: int, caption: Optional[str]
+) -> Image.Image:
+    """
+    Center thumbnail in square cell, caption is drawn below the cell
+    """
+    height = thumb_size + (_CAPTION_HEIGHT if caption is not None else 0)
+    tile = Image.new("RGB", (thumb_size, height), _BACKGROUND)
+    tile.paste(img, ((thumb_size - img.width) // 2, (thumb_size - img.height) // 2))
+    if caption is not None:
+        font = get_font(DrawObjectsMixin._font_path, _CAPTION_FONTSIZE)
+        ImageDraw.Draw(tile).text((2, thumb_size + 1), caption, font=font)
+    return tile
+
+
+def _sheet_tiles(
+    item: Tuple[int, Union[Annotation, str, Path], Union[str, Path]],
+    thumb_size: int,
+    by_class: bool,
+    caption: bool,
+    draw_kwargs: dict,
+) -> Tuple[Optional[List[Tuple[str, Image.Image]]], Optional[Exception]]:
+    """
+    Decode image once and draw tile for every class found in annotation
+    """
+    _, ann, img_path = item
+    try:
+        if isinstance(ann, (str, Path)):
+            ann = annotation_from_voc(ann)
+        img, sx, sy = load_preview(img_path, thumb_size)
+        ann = _drawable(ann, img.size, sx, sy)
+        if by_class:
+            groups = {}
+            for obj in ann.objects:
+                groups.setdefault(obj.name, []).append(obj)
+        else:
+            groups = {"": ann.objects}
+        text = Path(img_path).name if caption else None
+        tiles = []
+        for name, objects in groups.items():
+            drawn = _PixelAnnotation(ann.filename, objects, ann.size).draw_boxes(
+                img, **draw_kwargs
+            )
+            tiles.append((name, _make_tile(drawn, thumb_size, text)))
+        return tiles, None
+    except (OSError, ParseException, InconsistentAnnotation) as ex:
+        return None, type(ex)(str(ex))
+
+
+def _sheet_stem(name: str) -> str:
+    return re.sub(r"[^\w\-]+", "_", name).strip("_") or "sheet"
+
+
+class _SheetWriter:
+    """
+    Fill sheets of columns x rows tiles, full sheet is saved and released
+    """
+
+    def __init__(self, stem, columns, rows, tile_size, out_dir, suffix, save_kwargs):
+        self.stem = stem
+        self.columns = columns
+        self.rows = rows
+        self.tile_size = tile_size
+        self.out_dir = out_dir
+        self.suffix = suffix
+        self.save_kwargs = save_kwargs
+        self.paths: List[Path] = []
+        self._sheet = None
+        self._count = 0
+
+    def add(self, tile: Image.Image):
+        tile_w, tile_h = self.tile_size
+        if self._sheet is None:
+            size = (self.columns * tile_w, self.rows * tile_h)
+            self._sheet = Image.new("RGB", size, _BACKGROUND)
+        row, col = divmod(self._count, self.columns)
+        self._sheet.paste(tile, (col * tile_w, row * tile_h))
+        self._count += 1
+        if self._count == self.columns * self.rows:
+            self.close()
+
+    def close(self):
+        if self._sheet is None:
+            return
+        # partially filled sheet is cropped to used tiles
+        n_rows = -(-self._count // self.columns)
+        n_cols = min(self._count, self.columns)
+        tile_w, tile_h = self.tile_size
+        sheet = self._sheet.crop((0, 0, n_cols * tile_w, n_rows * tile_h))
+        out_file = self.out_dir / f"{self.stem}_{len(self.paths):03d}{self.suffix}"
+        sheet.save(out_file, **self.save_kwargs)
+        self.paths.append(out_file)
+        self._sheet = None
+        self._count = 0
+
+
+def render_contact_sheets(
+    pairs: Iterable[Tuple[AnnotationSource, Union[str, Path]]],
+    out_dir: Union[str, Path],
+    thumb_size: int = 256,
+    columns: int = 10,
+    rows: int = 10,
+    by_class: bool = True,
+    caption: bool = True,
+    workers: Optional[int] = None,
+    format: str = "JPEG",
+    quality: int = 85,
+    backend: str = "thread",
+    queue_size: Optional[int] = None,
+    **draw_kwargs,
+) -> Tuple[Dict[str, List[Path]], List[Tuple[Path, Exception]]]:
+    """
+    Tile annotated thumbnails into large sheets for visual check of dataset
+    Images are decoded at reduced scale, boxes are scaled to match and colored by class
+    name. Tiles are placed in input order, full sheet is saved at once,
+    so only one sheet per class is held in memory
+
+    Parameters
+    ----------
+    pairs: iterable of (annotation, image path), annotation is PascalAnnotation
+        or path to PascalVOC xml file
+    out_dir: output directory, sheets are named <class>_000.jpg, <class>_001.jpg, ...
+    thumb_size: max side of thumbnail
+    columns: number of tiles in sheet row
+    rows: number of tile rows in sheet
+    by_class: if true, make separate sheets for every class, image is tiled to sheets
+        of all classes it contains with boxes of that class only.
+        If false, all images with all boxes are tiled to sheets named sheet_000.jpg, ...
+    caption: draw image file name below thumbnail
+    workers: number of workers, os.cpu_count() if None
+    format: output image format: "JPEG", "PNG" or "WEBP"
+    quality: JPEG and WEBP quality
+    backend: "thread" or "process"
+    queue_size: max number of images in progress, 2 * workers if None
+    draw_kwargs: draw_boxes arguments: width, color, fontsize, font_path, language_code
+
+    Returns
+    -------
+    dict of class name and list of its sheet files ("" is the key if by_class is false),
+    list of (image path, exception) for images which were not rendered
+    """
+    format = format.upper()
+    if format not in IMAGE_SUFFIX:
+        raise ValueError(f"Unknown format: {format}. Use one of {tuple(IMAGE_SUFFIX)}")
+    if backend not in _BACKENDS:
+        raise ValueError(f"Unknown backend: {backend}. Use one of {_BACKENDS}")
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if queue_size is None:
+        queue_size = 2 * max(1, workers)
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    save_kwargs = dict(format=format)
+    if format != "PNG":
+        save_kwargs["quality"] = quality
+    draw_kwargs.setdefault("width", 2)
+    tile_size = (thumb_size, thumb_size + (_CAPTION_HEIGHT if caption else 0))
+    render = partial(
+        _sheet_tiles,
+        thumb_size=thumb_size,
+        by_class=by_class,
+        caption=caption,
+        draw_kwargs=draw_kwargs,
+    )
+    writers: Dict[str, _SheetWriter] = {}
+    stems = set()
+    errors = []
+    # results come in completion order, tiles are placed in input order
+    done = {}
+    next_index = 0
+
+    def place(tiles):
+        for name, tile in tiles:
+            writer = writers.get(name)
+            if writer is None:
+                stem = _sheet_stem(name)
+                if stem in stems:
+                    stem = f"{stem}_{len(writers)}"
+                stems.add(stem)
+                writer = _SheetWriter(
+                    stem,
+                    columns,
+                    rows,
+                    tile_size,
+                    out_dir,
+                    IMAGE_SUFFIX[format],
+                    save_kwargs,
+                )
+                writers[name] = writer
+            writer.add(tile)
+
+    def collect(item, tiles, error):
+        nonlocal next_index
+        if error is not None:
+            errors.append((Path(item[2]), error))
+        done[item[0]] = tiles or []
+        while next_index in done:
+            place(done.pop(next_index))
+            next_index += 1
+
+    items = (
+        (i, ann if isinstance(ann, (str, Path)) else _drawable(ann), img_path)
+        for i, (ann, img_path) in enumerate(pairs)
+    )
+    _run_pipeline(items, render, collect, workers, backend, queue_size)
+    for writer in writers.values():
+        writer.close()
+    return {name: writer.paths for name, writer in writers.items()}, errors
@@ -0,0 +1,284 @@
+import math
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from pascal.dataset import AnnotationDataset
+from pascal.instrumentation import _skip_object
+from pascal.protocols import PascalAnnotation
+from pascal.protocols import PascalObject as PascalObjectProtocol
+
+Region = Tuple[float, float, float, float]
+# box covering more cells is stored in list of large boxes of its group,
+# so few large boxes among small ones do not fill the grid
+_MAX_BOX_CELLS = 16
+
+
+def _ranges(lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
+    """
+    Concatenation of arange(lo[i], hi[i]) for all i
+    """
+    lengths = hi - lo
+    total = int(lengths.sum())
+    if total == 0:
+        return np.empty(0, dtype=np.int64)
+    starts = np.cumsum(lengths) - lengths
+    return np.repeat(lo - starts, lengths) + np.arange(total)
+
+
+def _default_cell_size(boxes: np.ndarray) -> float:
+    """
+    Median of max box side, so typical box covers few cells
+    """
+    if len(boxes) == 0:
+        return 1.0
+    sides = np.maximum(boxes[:, 2] - boxes[:, 0], boxes[:, 3] - boxes[:, 1])
+    cell_size = float(np.median(sides))
+    if not np.isfinite(cell_size) or cell_size <= 0:
+        extent = float(np.nanmax(boxes[:, 2:]) - np.nanmin(boxes[:, :2]))
+        cell_size = extent / np.sqrt(len(boxes)) if extent > 0 else 1.0
+    return cell_size
+
+
+class _GridIndex:
+    """
+    Uniform grid over boxes of several groups (images)
+    Every box is registered in all cells it covers. Cells are not stored,
+    sorted cell keys of (group, row, column) are searched instead,
+    so empty cells take no memory.
+    Boxes covering more than _MAX_BOX_CELLS cells are not registered in cells,
+    they are candidates of every query in their group
+    """
+
+    def __init__(
+        self, boxes: np.ndarray, groups: np.ndarray, n_groups: int, cell_size: float
+    ):
+        boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        self.boxes = boxes
+        self.cell_size = cell_size
+        n_boxes = len(boxes)
+        # grid of every group starts at its min box corner
+        self._origin = np.zeros((n_groups, 2))
+        self._n_cols = np.ones(n_groups, dtype=np.int64)
+        n_rows = np.ones(n_groups, dtype=np.int64)
+        if n_boxes > 0:
+            for axis in (0, 1):
+                origin = np.full(n_groups, np.inf)
+                np.minimum.at(origin, groups, boxes[:, axis])
+                self._origin[:, axis] = np.where(np.isfinite(origin), origin, 0)
+            x0, y0, x1, y1 = self._cells(groups, boxes)
+            max_col = np.zeros(n_groups, dtype=np.int64)
+            max_row = np.zeros(n_groups, dtype=np.int64)
+            np.maximum.at(max_col, groups, x1)
+            np.maximum.at(max_row, groups, y1)
+            self._n_cols = max_col + 1
+            n_rows = max_row + 1
+        self._group_start = np.concatenate([[0], np.cumsum(self._n_cols * n_rows)])
+        if n_boxes == 0:
+            self._keys = np.empty(0, dtype=np.int64)
+            self._ids = np.empty(0, dtype=np.int64)
+            self._large_ids = np.empty(0, dtype=np.int64)
+            self._large_start = np.zeros(n_groups + 1, dtype=np.int64)
+            return
+        n_x = x1 - x0 + 1
+        counts = n_x * (y1 - y0 + 1)
+        large = counts > _MAX_BOX_CELLS
+        large_ids = np.flatnonzero(large)
+        large_ids = large_ids[np.argsort(groups[large_ids], kind="stable")]
+        self._large_ids = large_ids
+        self._large_start = np.searchsorted(groups[large_ids], np.arange(n_groups + 1))
+        counts[large] = 0
+        ids = np.repeat(np.arange(n_boxes), counts)
+        k = _ranges(np.zeros_like(counts), counts)
+        cols = x0[ids] + k % n_x[ids]
+        rows = y0[ids] + k // n_x[ids]
+        box_groups = groups[ids]
+        keys = self._group_start[box_groups] + rows * self._n_cols[box_groups] + cols
+        order = np.argsort(keys, kind="stable")
+        self._keys = keys[order]
+        self._ids = ids[order]
+
+    def _cells(self, groups, boxes):
+        origin = self._origin[groups]
+        cells = np.floor((boxes - np.tile(origin, 2)) / self.cell_size)
+        cells = np.maximum(cells, 0).astype(np.int64)
+        # inverted box is registered in its min corner cell
+        x0, y0 = cells[:, 0], cells[:, 1]
+        return x0, y0, np.maximum(cells[:, 2], x0), np.maximum(cells[:, 3], y0)
+
+    def _candidates(self, group: int, region: Region) -> np.ndarray:
+        """
+        Sorted indices of boxes registered in cells covered by region
+        and large boxes of group
+        """
+        ids = self._cell_candidates(group, region)
+        large = self._large_ids[self._large_start[group] : self._large_start[group + 1]]
+        if len(large) == 0:
+            return ids
+        return np.union1d(ids, large)
+
+    def _cell_candidates(self, group: int, region: Region) -> np.ndarray:
+        n_cols = int(self._n_cols[group])
+        start = int(self._group_start[group])
+        n_rows = (int(self._group_start[group + 1]) - start) // n_cols
+        ox, oy = self._origin[group]
+        x0, y0, x1, y1 = region
+        col0 = max(math.floor((x0 - ox) / self.cell_size), 0)
+        row0 = max(math.floor((y0 - oy) / self.cell_size), 0)
+        col1 = min(math.floor((x1 - ox) / self.cell_size), n_cols - 1)
+        row1 = min(math.floor((y1 - oy) / self.cell_size), n_rows - 1)
+        if col0 > col1 or row0 > row1:
+            return np.empty(0, dtype=np.int64)
+        if row0 == row1:
+            row_key = start + row0 * n_cols
+            lo = self._keys.searchsorted(row_key + col0, side="left")
+            hi = self._keys.searchsorted(row_key + col1, side="right")
+            ids = self._ids[lo:hi]
+            # box is registered once in one cell
+            return ids if col0 == col1 else np.unique(ids)
+        row_keys = start + np.arange(row0, row1 + 1) * n_cols
+        lo = self._keys.searchsorted(row_keys + col0, side="left")
+        hi = self._keys.searchsorted(row_keys + col1, side="right")
+        return np.unique(self._ids[_ranges(lo, hi)])
+
+    def _intersecting(self, group: int, region: Region) -> np.ndarray:
+        ids = self._candidates(group, region)
+        b = self.boxes[ids]
+        x0, y0, x1, y1 = region
+        mask = (b[:, 0] <= x1) & (b[:, 2] >= x0) & (b[:, 1] <= y1) & (b[:, 3] >= y0)
+        return ids[mask]
+
+    def _overlapping(
+        self, group: int, box: Region, iou_threshold: float
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        ids = self._intersecting(group, box)
+        b = self.boxes[ids]
+        x0, y0, x1, y1 = box
+        inter_w = np.minimum(b[:, 2], x1) - np.maximum(b[:, 0], x0)
+        inter_h = np.minimum(b[:, 3], y1) - np.maximum(b[:, 1], y0)
+        inter = np.clip(inter_w, 0, None) * np.clip(inter_h, 0, None)
+        areas = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+        union = areas + (x1 - x0) * (y1 - y0) - inter
+        with np.errstate(divide="ignore", invalid="ignore"):
+            iou = np.where(union > 0, inter / union, 0.0)
+        mask = iou >= iou_threshold
+        return ids[mask], iou[mask]
+
+
+class BoxIndex(_GridIndex):
+    """
+    Spatial index of boxes of one image
+    Boxes are closed: boxes which share only border intersect
+
+    Parameters
+    ----------
+    boxes: (n, 4) array of xmin, ymin, xmax, ymax
+    cell_size: grid cell side, median of max box side if None
+    """
+
+    def __init__(self, boxes: np.ndarray, cell_size: Optional[float] = None):
+        boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        if cell_size is None:
+            cell_size = _default_cell_size(boxes)
+        super().__init__(boxes, np.zeros(len(boxes), dtype=np.int64), 1, cell_size)
+        self.objects: List[PascalObjectProtocol] = []
+
+    @classmethod
+    def from_annotation(
+        cls, ann: PascalAnnotation, cell_size: Optional[float] = None
+    ) -> "BoxIndex":
+        """
+        Index objects of annotation, query results are indices in index.objects
+        """
+        objects = []
+        for obj in ann.objects:
+            if not isinstance(obj, PascalObjectProtocol):
+                _skip_object()
+                continue
+            objects.append(obj)
+        boxes = [
+            (o.bndbox.xmin, o.bndbox.ymin, o.bndbox.xmax, o.bndbox.ymax)
+            for o in objects
+        ]
+        index = cls(np.array(boxes, dtype=np.float64), cell_size)
+        index.objects = objects
+        return index
+
+    def __len__(self) -> int:
+        return len(self.boxes)
+
+    def intersecting(self, region: Region) -> np.ndarray:
+        """
+        Sorted indices of boxes intersecting region xmin, ymin, xmax, ymax
+        """
+        return self._intersecting(0, region)
+
+    def containing(self, x: float, y: float) -> np.ndarray:
+        """
+        Sorted indices of boxes containing point
+        """
+        return self._intersecting(0, (x, y, x, y))
+
+    def overlapping(
+        self, box: Region, iou_threshold: float = 0.5, return_iou: bool = False
+    ):
+        """
+        Sorted indices of boxes which IoU with box is not less than iou_threshold
+
+        Parameters
+        ----------
+        box: xmin, ymin, xmax, ymax
+        iou_threshold: min IoU
+        return_iou: also return IoU of found boxes
+
+        Returns
+        -------
+        indices or (indices, iou)
+        """
+        ids, iou = self._overlapping(0, box, iou_threshold)
+        return (ids, iou) if return_iou else ids
+
+
+class DatasetIndex(_GridIndex):
+    """
+    Spatial index of boxes of all images of AnnotationDataset, built at once
+    Queries are made in one image, results are object indices in dataset
+
+    Parameters
+    ----------
+    dataset: AnnotationDataset
+    cell_size: grid cell side, median of max box side if None
+    """
+
+    def __init__(self, dataset: AnnotationDataset, cell_size: Optional[float] = None):
+        boxes = np.asarray(dataset.boxes, dtype=np.float64)
+        if cell_size is None:
+            cell_size = _default_cell_size(boxes)
+        super().__init__(boxes, dataset.image_ids(), len(dataset), cell_size)
+        self.dataset = dataset
+
+    def intersecting(self, image_index: int, region: Region) -> np.ndarray:
+        """
+        Sorted indices of objects of image intersecting region xmin, ymin, xmax, ymax
+        """
+        return self._intersecting(image_index, region)
+
+    def containing(self, image_index: int, x: float, y: float) -> np.ndarray:
+        """
+        Sorted indices of objects of image containing point
+        """
+        return self._intersecting(image_index, (x, y, x, y))
+
+    def overlapping(
+        self,
+        image_index: int,
+        box: Region,
+        iou_threshold: float = 0.5,
+        return_iou: bool = False,
+    ):
+        """
+        Sorted indices of objects of image which IoU with box is not less than
+        iou_threshold, with IoU if return_iou is true
+        """
+        ids, iou = self._overlapping(image_index, box, iou_threshold)
+        return (ids, iou) if return_iou else ids
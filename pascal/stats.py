@@ -0,0 +1,247 @@
+import os
+from collections import Counter
+from dataclasses import dataclass, field
+from functools import partial
+from itertools import islice
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+from pascal.convert import _BACKENDS, _run_pipeline
+from pascal.dataset import _attr_value
+from pascal.exceptions import InconsistentAnnotation, ParseException
+from pascal.instrumentation import _skip_object
+from pascal.protocols import PascalAnnotation
+from pascal.protocols import PascalObject as PascalObjectProtocol
+from pascal.voc_parser import annotation_from_voc
+
+# histogram bins are fixed, so partial histograms of workers are summed
+SIZE_BINS = np.array(
+    [0, 1, 8, 16, 32, 64, 128, 256, 512, 1024, 2048, 4096, np.inf], dtype=np.float64
+)
+AREA_BINS = np.array(
+    [0, 1, 64, 256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, np.inf],
+    dtype=np.float64,
+)
+ASPECT_BINS = np.array(
+    [0, 1 / 8, 1 / 4, 1 / 2, 3 / 4, 4 / 3, 2, 4, 8, np.inf], dtype=np.float64
+)
+
+
+def _histogram(values: np.ndarray, edges: np.ndarray) -> np.ndarray:
+    """
+    Counts of values in bins [edges[i], edges[i + 1]), negative values are counted
+    in first bin, nan values are not counted
+    """
+    values = values[~np.isnan(values)]
+    bins = np.searchsorted(edges, values, side="right") - 1
+    bins = np.clip(bins, 0, len(edges) - 2)
+    return np.bincount(bins, minlength=len(edges) - 1)
+
+
+def _zeros(edges: np.ndarray):
+    return lambda: np.zeros(len(edges) - 1, dtype=np.int64)
+
+
+@dataclass
+class DatasetStats:
+    """
+    Statistics of annotations, partial statistics of several workers are merged
+
+    class_counts: number of objects of every name
+    class_images: number of images with objects of every name
+    objects_per_image: number of images with every number of objects
+    width_hist, height_hist: box side counts in SIZE_BINS
+    area_hist: box area counts in AREA_BINS
+    aspect_hist: box width / height counts in ASPECT_BINS
+    difficult, truncated: number of objects with difficult or truncated equal to 1
+    relative_objects: number of boxes with relative coords, see is_relative_coords
+    relative_images: number of images with relative coords boxes
+    """
+
+    images: int = 0
+    objects: int = 0
+    class_counts: Counter = field(default_factory=Counter)
+    class_images: Counter = field(default_factory=Counter)
+    objects_per_image: Counter = field(default_factory=Counter)
+    width_hist: np.ndarray = field(default_factory=_zeros(SIZE_BINS))
+    height_hist: np.ndarray = field(default_factory=_zeros(SIZE_BINS))
+    area_hist: np.ndarray = field(default_factory=_zeros(AREA_BINS))
+    aspect_hist: np.ndarray = field(default_factory=_zeros(ASPECT_BINS))
+    difficult: int = 0
+    truncated: int = 0
+    relative_objects: int = 0
+    relative_images: int = 0
+    skipped: int = 0
+    errors: List[Tuple[Path, Exception]] = field(default_factory=list)
+
+    @property
+    def difficult_ratio(self) -> float:
+        return self.difficult / self.objects if self.objects else 0.0
+
+    @property
+    def truncated_ratio(self) -> float:
+        return self.truncated / self.objects if self.objects else 0.0
+
+    @property
+    def has_relative_coords(self) -> bool:
+        return self.relative_objects > 0
+
+    def add(self, annotations: Iterable[PascalAnnotation]) -> "DatasetStats":
+        """
+        Add annotations to statistics
+        Boxes of all annotations are collected first and counted in histograms at once
+        """
+        boxes = []
+        image_objects = []
+        for ann in annotations:
+            names = set()
+            n_objects = 0
+            for obj in ann.objects:
+                if not isinstance(obj, PascalObjectProtocol):
+                    _skip_object()
+                    self.skipped += 1
+                    continue
+                name = str(obj.name)
+                self.class_counts[name] += 1
+                names.add(name)
+                box = obj.bndbox
+                boxes.append((box.xmin, box.ymin, box.xmax, box.ymax))
+                self.difficult += _attr_value(obj, "difficult") == 1
+                self.truncated += _attr_value(obj, "truncated") == 1
+                n_objects += 1
+            self.class_images.update(names)
+            self.objects_per_image[n_objects] += 1
+            image_objects.append(n_objects)
+            self.images += 1
+            self.objects += n_objects
+        boxes = np.array(boxes, dtype=np.float64).reshape(-1, 4)
+        widths = boxes[:, 2] - boxes[:, 0]
+        heights = boxes[:, 3] - boxes[:, 1]
+        self.width_hist += _histogram(widths, SIZE_BINS)
+        self.height_hist += _histogram(heights, SIZE_BINS)
+        self.area_hist += _histogram(widths * heights, AREA_BINS)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            aspect = np.where(heights > 0, widths / heights, np.nan)
+        self.aspect_hist += _histogram(aspect, ASPECT_BINS)
+        # same rule as is_relative_coords
+        relative = (boxes < 1).any(axis=1)
+        self.relative_objects += int(relative.sum())
+        if len(image_objects) > 0:
+            image_ids = np.repeat(np.arange(len(image_objects)), image_objects)
+            per_image = np.bincount(image_ids[relative], minlength=len(image_objects))
+            self.relative_images += int((per_image > 0).sum())
+        return self
+
+    def merge(self, other: "DatasetStats") -> "DatasetStats":
+        """
+        Add statistics of other annotations
+        """
+        self.images += other.images
+        self.objects += other.objects
+        self.class_counts.update(other.class_counts)
+        self.class_images.update(other.class_images)
+        self.objects_per_image.update(other.objects_per_image)
+        self.width_hist += other.width_hist
+        self.height_hist += other.height_hist
+        self.area_hist += other.area_hist
+        self.aspect_hist += other.aspect_hist
+        self.difficult += other.difficult
+        self.truncated += other.truncated
+        self.relative_objects += other.relative_objects
+        self.relative_images += other.relative_images
+        self.skipped += other.skipped
+        self.errors.extend(other.errors)
+        return self
+
+
+def _chunk_stats(
+    files: List[Path], attr_type_spec: Optional[dict]
+) -> Tuple[DatasetStats, None]:
+    stats = DatasetStats()
+    annotations = []
+    for file_path in files:
+        try:
+            annotations.append(annotation_from_voc(file_path, attr_type_spec))
+        except (ParseException, InconsistentAnnotation, OSError) as ex:
+            # exception arguments may hold objects which cannot be pickled
+            stats.errors.append((file_path, type(ex)(str(ex))))
+    return stats.add(annotations), None
+
+
+def _chunks(
+    items: Iterable[Union[str, Path, PascalAnnotation]],
+    stats: DatasetStats,
+    chunksize: int,
+) -> Iterator[List[Path]]:
+    """
+    Chunks of files for workers, annotation objects are added to stats
+    in calling thread
+    """
+    items = iter(items)
+    while True:
+        chunk = []
+        annotations = []
+        for item in islice(items, chunksize):
+            if isinstance(item, (str, Path)):
+                chunk.append(Path(item))
+            else:
+                annotations.append(item)
+        if not chunk and not annotations:
+            return
+        if annotations:
+            stats.add(annotations)
+        if chunk:
+            yield chunk
+
+
+def dataset_stats(
+    annotations: Iterable[Union[str, Path, PascalAnnotation]],
+    workers: Optional[int] = None,
+    backend: str = "process",
+    attr_type_spec: Optional[dict] = None,
+    chunksize: int = 64,
+    queue_size: Optional[int] = None,
+) -> DatasetStats:
+    """
+    Compute statistics of annotations in one pass
+    Chunks of files are parsed by workers which return partial statistics,
+    partial statistics are merged in calling thread, annotations are not held
+    in memory
+
+    Parameters
+    ----------
+    annotations: iterable of xml files or annotation objects,
+        annotation objects are not sent to workers
+    workers: number of workers, os.cpu_count() if None
+    backend: "process" or "thread"
+    attr_type_spec: dict, optional
+        specify attribute types to explicitly cast attribute values
+    chunksize: number of files parsed by worker at once
+    queue_size: max number of chunks in progress, 2 * workers if None
+
+    Returns
+    -------
+    DatasetStats, files which cannot be parsed are in errors
+    """
+    if backend not in _BACKENDS:
+        raise ValueError(f"Unknown backend: {backend}. Use one of {_BACKENDS}")
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if queue_size is None:
+        queue_size = 2 * max(1, workers)
+    stats = DatasetStats()
+    chunks = _chunks(annotations, stats, max(1, chunksize))
+    func = partial(_chunk_stats, attr_type_spec=attr_type_spec)
+    _run_pipeline(
+        chunks,
+        func,
+        lambda chunk, partial_stats, _: stats.merge(partial_stats),
+        workers,
+        backend,
+        queue_size,
+    )
+    # chunks are merged in completion order
+    stats.errors.sort(key=lambda error: str(error[0]))
+    return stats
@@ -1,18 +1,80 @@
 import base64
+import hashlib
 import xml.etree.ElementTree as xml
 from io import BytesIO
 from pathlib import Path
-from typing import Union
+from typing import IO, Optional, Union
 
 from PIL import Image
 from xmlobj import XMLMixin
 
+from pascal.instrumentation import _start, _stop
+
 
 def _is_primitive(obj):
     """
     https://stackoverflow.com/questions/6391694/how-to-check-if-a-variables-type-is-primitive
     """
-    return not hasattr(obj, "__dict__") and not isinstance(obj, list)
+    return (
+        not hasattr(obj, "__dict__")
+        and not hasattr(obj, "__slots__")
+        and not isinstance(obj, list)
+    )
+
+
+def _type_name(attr_type) -> Optional[str]:
+    """
+    Module and qualified name of attribute type or converter function
+    None for lambdas, local functions and objects without name,
+    which cannot be told apart by name
+    """
+    qualname = getattr(attr_type, "__qualname__", None)
+    if qualname is None or "<lambda>" in qualname or "<locals>" in qualname:
+        return None
+    return f"{getattr(attr_type, '__module__', '')}.{qualname}"
+
+
+def _attr_items(obj):
+    """
+    Attribute names and values of object with __dict__ or __slots__
+    Unset and None slots are skipped, items of "extra" slot are attributes
+    """
+    if hasattr(obj, "__dict__"):
+        return obj.__dict__.items()
+    items = []
+    for attr_name in obj.__slots__:
+        attr_val = getattr(obj, attr_name, None)
+        if attr_val is None:
+            continue
+        if attr_name == "extra":
+            items.extend(attr_val.items())
+        else:
+            items.append((attr_name, attr_val))
+    return items
+
+
+def _to_xml(obj, root_name: str) -> xml.Element:
+    """
+    Same as XMLMixin.to_xml, but also accepts attributes which are not XMLMixin
+    and have to_xml method
+    """
+    root = xml.Element(root_name)
+    for attr_name, attr_val in _attr_items(obj):
+        if isinstance(attr_val, list):
+            for item in attr_val:
+                root.append(item.to_xml())
+        elif hasattr(attr_val, "to_xml"):
+            root.append(attr_val.to_xml())
+        else:
+            elem = xml.Element(attr_name)
+            elem.text = str(attr_val)
+            root.append(elem)
+    return root
+
+
+def _file_digest(file_path: Union[str, Path]) -> str:
+    with open(file_path, "rb") as f:
+        return hashlib.blake2b(f.read(), digest_size=16).hexdigest()
 
 
 def base64img(img: Image.Image, img_suffix: str) -> str:
@@ -33,32 +95,71 @@ def base64img(img: Image.Image, img_suffix: str) -> str:
     return encoded_string
 
 
-def save_xml(output: Union[str, Path], xml_obj):
+# multiple of 3 bytes, so encoded chunks are concatenated without padding
+_BASE64_CHUNK = 3 * 2**16
+
+
+def base64file(file_path: Union[str, Path]) -> str:
     """
-    Save object to output file
+    Encode file bytes to base64 without decoding image
+    """
+    with open(file_path, "rb") as f:
+        return base64.b64encode(f.read()).decode("utf-8")
+
+
+def _write_base64(out: IO[str], file_path: Union[str, Path]):
+    """
+    Write base64 of file bytes to text stream by chunks
+    """
+    with open(file_path, "rb") as f:
+        while True:
+            chunk = f.read(_BASE64_CHUNK)
+            if not chunk:
+                break
+            out.write(base64.b64encode(chunk).decode("ascii"))
+
+
+def xml_to_str(xml_obj: xml.Element) -> str:
+    """
+    Indented xml str, same as save_xml output
     """
+    start = _start()
     tree = xml.ElementTree(xml_obj)
     xml.indent(tree, space="    ", level=0)
-    with open(output, "w") as out:
-        tree.write(out, encoding="unicode", method="xml")
+    text = xml.tostring(xml_obj, encoding="unicode", method="xml")
+    _stop("serialize", start)
+    return text
 
 
-def _set_attr(box, obj_type, clip_zero: bool = True):
-    for attr_name, attr_val in box.__dict__.items():
-        attr_val = obj_type(attr_val)
-        if clip_zero:
-            attr_val = obj_type(max(0, attr_val))
-        setattr(box, attr_name, attr_val)
-    return box
+def save_xml(output: Union[str, Path], xml_obj):
+    """
+    Save object to output file
+    """
+    with open(output, "w") as out:
+        out.write(xml_to_str(xml_obj))
 
 
 def _check_bnd_box(box: XMLMixin, clip_zero: bool = True):
-    attr_types = [type(attr) for attr in box.__dict__.values()]
-    if all(attr is int or attr is float for attr in attr_types):
-        return box
-    if any(attr is float for attr in attr_types):
-        val_type = float
+    """
+    Cast bndbox values to one numeric type and clip negative values to 0
+    Box with int and float values only is returned as is
+    """
+    values = box.__dict__
+    has_float = False
+    for attr_val in values.values():
+        attr_type = type(attr_val)
+        if attr_type is float:
+            has_float = True
+        elif attr_type is not int:
+            break
     else:
-        val_type = int
-    box = _set_attr(box, val_type, clip_zero)
+        return box
+    if not has_float:
+        has_float = any(type(attr_val) is float for attr_val in values.values())
+    val_type = float if has_float else int
+    for attr_name, attr_val in values.items():
+        attr_val = val_type(attr_val)
+        if clip_zero:
+            attr_val = val_type(max(0, attr_val))
+        values[attr_name] = attr_val
     return box
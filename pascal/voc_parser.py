@@ -0,0 +1,170 @@
+import re
+import xml.etree.ElementTree as xml
+from pathlib import Path
+from typing import Optional, Union
+
+from pascal.annotation_fabric import _node_class, annotation_from_xml
+from pascal.exceptions import ParseException
+from pascal.instrumentation import _start, _stop
+from pascal.pascal_annotation import Annotation
+from pascal.protocol_implementations import BndBox, Object, Part, Size
+from pascal.utils import _check_bnd_box
+
+_FLOAT_RE = re.compile(r"^\d+\.\d+")
+_BOOL_STR = {"True": True, "False": False}
+_BOX_KEYS = {"xmin", "ymin", "xmax", "ymax"}
+
+
+class _UnsupportedSchema(Exception):
+    """File must be parsed with xmlobj"""
+
+
+def _cast(key: str, elem: xml.Element, attr_type_spec: Optional[dict]):
+    """
+    Cast element text the same way as xmlobj does
+    """
+    if len(elem) > 0 or elem.attrib:
+        raise _UnsupportedSchema(key)
+    text = elem.text.strip() if elem.text is not None else ""
+    if not text:
+        # xmltodict returns None for empty element, xmlobj stores it as str
+        val = "None"
+    elif _FLOAT_RE.search(text):
+        val = float(text)
+    elif all(char.isnumeric() for char in text):
+        val = int(text)
+    elif text in _BOOL_STR:
+        val = _BOOL_STR[text]
+    elif text in ("true", "false"):
+        raise _UnsupportedSchema(key)
+    else:
+        val = text
+    if attr_type_spec is not None and key in attr_type_spec:
+        try:
+            val = attr_type_spec[key](val)
+        except Exception as ex:
+            # same as annotation_from_xml, which wraps errors of xmlobj
+            raise ParseException(ex)
+    return val
+
+
+def _check_node(elem: xml.Element):
+    if elem.attrib or (elem.text is not None and elem.text.strip()):
+        raise _UnsupportedSchema(elem.tag)
+
+
+def _make(cls, attributes: dict):
+    # keep attributes in document order, as xmlobj does
+    obj = cls.__new__(cls)
+    obj.__dict__.update(attributes)
+    return obj
+
+
+def _parse_leaves(elem: xml.Element, attr_type_spec: Optional[dict]) -> dict:
+    _check_node(elem)
+    attributes = {}
+    for child in elem:
+        if child.tag in attributes:
+            raise _UnsupportedSchema(child.tag)
+        attributes[child.tag] = _cast(child.tag, child, attr_type_spec)
+    return attributes
+
+
+def _parse_object(elem: xml.Element, cls, attr_type_spec: Optional[dict]):
+    _check_node(elem)
+    attributes = {}
+    parts = []
+    for child in elem:
+        tag = child.tag
+        if tag == "part" and cls is Object:
+            parts.append(_parse_object(child, Part, attr_type_spec))
+            if len(parts) == 1:
+                attributes[tag] = parts[0]
+            else:
+                attributes[tag] = parts
+            continue
+        if tag in attributes:
+            raise _UnsupportedSchema(tag)
+        if tag == "bndbox":
+            box = _parse_leaves(child, attr_type_spec)
+            if set(box.keys()) != _BOX_KEYS:
+                raise _UnsupportedSchema(tag)
+            attributes[tag] = _make(BndBox, box)
+        else:
+            attributes[tag] = _cast(tag, child, attr_type_spec)
+    if "name" not in attributes or "bndbox" not in attributes:
+        raise _UnsupportedSchema(elem.tag)
+    return _make(cls, attributes)
+
+
+def _parse_annotation(
+    file_path: Union[str, Path],
+    attr_type_spec: Optional[dict],
+    clip_zero: bool,
+) -> Annotation:
+    root = xml.parse(file_path).getroot()
+    if root.tag != "annotation":
+        raise _UnsupportedSchema(root.tag)
+    _check_node(root)
+    attributes = {}
+    objects = []
+    for child in root:
+        tag = child.tag
+        if tag == "object":
+            obj = _parse_object(child, Object, attr_type_spec)
+            obj.bndbox = _check_bnd_box(obj.bndbox, clip_zero)
+            objects.append(obj)
+            continue
+        if tag in attributes:
+            raise _UnsupportedSchema(tag)
+        if tag == "size":
+            size = _parse_leaves(child, attr_type_spec)
+            if "width" not in size or "height" not in size:
+                raise _UnsupportedSchema(tag)
+            attributes[tag] = _make(Size, size)
+        elif len(child) > 0:
+            node = _node_class(tag.capitalize(), False)()
+            node.__dict__.update(_parse_leaves(child, attr_type_spec))
+            attributes[tag] = node
+        else:
+            attributes[tag] = _cast(tag, child, attr_type_spec)
+    if "size" not in attributes:
+        raise _UnsupportedSchema("size")
+    if attributes.get("filename") is None and len(objects) == 0:
+        raise _UnsupportedSchema("filename")
+    attributes["objects"] = objects
+    return _make(Annotation, attributes)
+
+
+def annotation_from_voc(
+    file_path: Union[str, Path],
+    attr_type_spec: Optional[dict] = None,
+    clip_zero: bool = True,
+) -> Annotation:
+    """
+    Make annotation object from PascalVOC annotation file
+    Fast path for standard PascalVOC schema: filename, size, object with name, bndbox,
+    parts and simple attributes (difficult, truncated, pose, etc.)
+    Objects are made of protocol_implementations dataclasses.
+    Files with other nested tags are parsed by annotation_from_xml
+
+    Parameters
+    ----------
+    file_path: path to xml file
+    attr_type_spec: dict, optional
+        specify attribute types to explicitly cast attribute values
+    clip_zero: clip negative bbox values to 0
+
+    Returns
+    -------
+    Annotation object, ParseException is raised if file or attribute value cannot be
+    parsed, InconsistentAnnotation if file is not PascalVOC annotation
+    """
+    start = _start()
+    try:
+        ann = _parse_annotation(file_path, attr_type_spec, clip_zero)
+    except (_UnsupportedSchema, xml.ParseError):
+        # unknown tags or malformed file: xmlobj path raises the proper exception
+        return annotation_from_xml(file_path, attr_type_spec, clip_zero)
+    _stop("parse", start)
+    return ann
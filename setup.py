@@ -16,7 +16,9 @@ setuptools.setup(
         exclude=["*.tests", "*.tests.*", "tests.*", "tests"],
     ),
     data_files=[("pascal", ["pascal/fonts/arialmt.ttf"])],
+    entry_points={"console_scripts": ["pascal=pascal.cli:main"]},
     install_requires=[
+        "numpy>=1.17.0",
         "Pillow>=8.1.0",
         "transliterate>=1.10.2",
         "xmlobj>=1.2.2",
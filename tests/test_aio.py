@@ -0,0 +1,157 @@
+import asyncio
+import shutil
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from pascal import annotation_from_xml
+from pascal.aio import aconvert_dataset, aload_annotation
+from pascal.convert import OUTPUT_SUFFIX, convert_dataset
+from pascal.exceptions import InconsistentAnnotation
+
+
+@pytest.fixture
+def xml_files(yolo_data):
+    return sorted(Path(s.get("xml_ann_file")) for s in yolo_data)
+
+
+@pytest.mark.parametrize(
+    "executor_cls", [None, ThreadPoolExecutor, ProcessPoolExecutor]
+)
+def test_aload_annotation(xml_files, executor_cls):
+    """Асинхронная загрузка совпадает с annotation_from_xml"""
+
+    async def load(executor):
+        semaphore = asyncio.Semaphore(2)
+        return await asyncio.gather(
+            *(
+                aload_annotation(f, executor=executor, semaphore=semaphore)
+                for f in xml_files
+            )
+        )
+
+    if executor_cls is None:
+        annotations = asyncio.run(load(None))
+    else:
+        with executor_cls(max_workers=2) as executor:
+            annotations = asyncio.run(load(executor))
+    for file, ann in zip(xml_files, annotations):
+        expected = annotation_from_xml(file)
+        assert str(ann) == str(expected)
+        assert ann.to_labelme() == expected.to_labelme()
+
+
+def test_aload_annotation_error():
+    with pytest.raises(InconsistentAnnotation):
+        asyncio.run(aload_annotation("test_data/invalid_annotations/books.xml"))
+
+
+@pytest.mark.parametrize("to", ["yolo", "labelme", "voc"])
+def test_aconvert_dataset(yolo_data, xml_files, tmp_path, to):
+    """Асинхронная конвертация совпадает с convert_dataset"""
+    label_map = yolo_data[0].get("label_map")
+    done = []
+    stats = asyncio.run(
+        aconvert_dataset(
+            xml_files + [Path("test_data/invalid_annotations/books.xml")],
+            tmp_path / "async",
+            to,
+            concurrency=3,
+            labels_map=label_map,
+            progress=lambda n, _: done.append(n),
+        )
+    )
+    assert stats.converted == len(xml_files)
+    assert len(stats.errors) == 1
+    assert done == list(range(1, len(xml_files) + 2))
+    convert_dataset(xml_files, tmp_path / "sync", to, workers=1, labels_map=label_map)
+    for file in xml_files:
+        name = file.with_suffix(OUTPUT_SUFFIX[to]).name
+        expected = (tmp_path / "sync" / name).read_text()
+        assert (tmp_path / "async" / name).read_text() == expected
+
+
+def test_aconvert_dataset_incremental(xml_files, tmp_path):
+    with ProcessPoolExecutor(max_workers=2) as executor:
+
+        def convert(files):
+            return asyncio.run(
+                aconvert_dataset(
+                    files,
+                    tmp_path,
+                    "labelme",
+                    executor=executor,
+                    incremental=True,
+                    use_hash=True,
+                )
+            )
+
+        stats = convert(xml_files)
+        assert (stats.converted, stats.skipped, stats.removed) == (len(xml_files), 0, 0)
+        stats = convert(xml_files[1:])
+        assert (stats.converted, stats.skipped, stats.removed) == (
+            0,
+            len(xml_files) - 1,
+            1,
+        )
+    assert not (tmp_path / xml_files[0].with_suffix(".json").name).exists()
+
+
+def test_aconvert_dataset_args(tmp_path):
+    with pytest.raises(ValueError):
+        asyncio.run(aconvert_dataset([], tmp_path, "coco"))
+    with pytest.raises(ValueError):
+        asyncio.run(aconvert_dataset([], tmp_path, "yolo"))
+
+
+def test_aconvert_dataset_removed_error(xml_files, tmp_path):
+    """Выход файла, который перестал конвертироваться и удален, удаляется"""
+    src = tmp_path / "src"
+    src.mkdir()
+    for file in xml_files[:3]:
+        shutil.copy(file, src)
+
+    def convert():
+        files = sorted(src.glob("*.xml"))
+        return asyncio.run(
+            aconvert_dataset(files, tmp_path / "out", "voc", incremental=True)
+        )
+
+    convert()
+    bad = sorted(src.glob("*.xml"))[0]
+    bad.write_text("<annotation>")
+    assert len(convert().errors) == 1
+    bad.unlink()
+    assert convert().removed == 1
+    assert not (tmp_path / "out" / bad.name).exists()
+
+
+def test_aconvert_dataset_off_loop(xml_files, tmp_path, monkeypatch):
+    """
+    Ленивый итератор файлов и resolve путей не выполняются в потоке цикла событий
+    """
+    loop_threads = set()
+    resolve_threads = []
+    resolve = Path.resolve
+
+    def tracked_resolve(self, *args, **kwargs):
+        resolve_threads.append(threading.get_ident())
+        return resolve(self, *args, **kwargs)
+
+    def lazy_files():
+        for file in xml_files:
+            assert threading.get_ident() not in loop_threads
+            yield file
+
+    async def convert(files, incremental):
+        loop_threads.add(threading.get_ident())
+        return await aconvert_dataset(files, tmp_path, "voc", incremental=incremental)
+
+    stats = asyncio.run(convert(lazy_files(), False))
+    assert stats.converted == len(xml_files)
+    monkeypatch.setattr(Path, "resolve", tracked_resolve)
+    stats = asyncio.run(convert(list(reversed(xml_files)), True))
+    assert stats.converted == len(xml_files)
+    assert resolve_threads and not loop_threads.intersection(resolve_threads)
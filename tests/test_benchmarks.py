@@ -0,0 +1,31 @@
+import json
+
+from benchmarks.suite import compare, run_suite
+from benchmarks.synthetic import make_corpus
+from pascal import annotation_from_xml
+from pascal.voc_parser import annotation_from_voc
+
+
+def test_synthetic_corpus(tmp_path):
+    """Синтетический корпус детерминирован и читается обоими парсерами"""
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+    files = make_corpus(tmp_path / "a", 5, 4, n_parts=2, n_attributes=2)
+    other = make_corpus(tmp_path / "b", 5, 4, n_parts=2, n_attributes=2)
+    assert [f.read_text() for f in files] == [f.read_text() for f in other]
+    for file in files:
+        ann = annotation_from_voc(file)
+        assert len(ann) == len(annotation_from_xml(file))
+        for obj in ann:
+            assert len(obj.part) == 2
+            assert obj.attr_1 in range(10)
+
+
+def test_suite(tmp_path):
+    run = run_suite(n_files=5, n_draw=2, cases=["to_yolo", "draw_boxes"])
+    assert set(run["results"]) == {"to_yolo", "draw_boxes"}
+    res = run["results"]["to_yolo"]
+    assert res["n"] == 5 and res["p50_ms"] <= res["p99_ms"]
+    assert res["peak_memory_kb"] > 0
+    run = json.loads(json.dumps(run))
+    assert set(compare(run, run)) == {"to_yolo", "draw_boxes"}
@@ -0,0 +1,122 @@
+import copy
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from pascal import AnnotationDataset, annotation_from_xml
+from pascal.box_ops import (
+    annotation_duplicates,
+    annotation_nms,
+    dataset_duplicates,
+    dataset_nms,
+    find_duplicates,
+    nms,
+    pairwise_iou,
+)
+
+
+def random_boxes(rng, n, size=300.0):
+    xy = rng.uniform(0, size, (n, 2))
+    wh = rng.uniform(1, 40, (n, 2))
+    boxes = np.concatenate([xy, xy + wh], axis=1)
+    # stacked copies of some boxes
+    copies = rng.choice(n, n // 5)
+    boxes[copies[::2]] = boxes[copies[1::2]] + rng.normal(0, 1, (len(copies[1::2]), 4))
+    return boxes
+
+
+def brute_nms(boxes, scores, iou_threshold, labels):
+    order = np.argsort(-scores, kind="stable")
+    iou = pairwise_iou(boxes, boxes)
+    keep = []
+    for i in order:
+        if all(labels[k] != labels[i] or iou[i, k] <= iou_threshold for k in keep):
+            keep.append(i)
+    return np.array(keep)
+
+
+def test_pairwise_iou():
+    boxes1 = np.array([[0, 0, 10, 10], [5, 5, 15, 15], [0, 0, 0, 0]])
+    boxes2 = np.array([[0, 0, 10, 10], [20, 20, 30, 30]])
+    iou = pairwise_iou(boxes1, boxes2)
+    assert iou.shape == (3, 2)
+    assert iou[0, 0] == 1.0
+    assert iou[1, 0] == pytest.approx(25 / 175)
+    assert (iou[:, 1] == 0).all()
+    assert iou[2, 0] == 0
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_nms(seed):
+    """
+    Векторизованный NMS совпадает с жадным перебором
+    """
+    rng = np.random.default_rng(seed)
+    boxes = random_boxes(rng, 400)
+    scores = rng.uniform(size=len(boxes))
+    labels = rng.integers(0, 3, len(boxes))
+    for threshold in (0.1, 0.5, 0.8):
+        keep = nms(boxes, scores, threshold, labels)
+        assert (keep == brute_nms(boxes, scores, threshold, labels)).all()
+    keep = nms(boxes, iou_threshold=0.5)
+    expected = brute_nms(boxes, -np.arange(len(boxes)), 0.5, np.zeros(len(boxes)))
+    assert (keep == expected).all()
+    assert len(nms(np.empty((0, 4)))) == 0
+
+
+def test_find_duplicates():
+    rng = np.random.default_rng(3)
+    boxes = random_boxes(rng, 500)
+    labels = rng.integers(0, 2, len(boxes))
+    groups = rng.integers(0, 3, len(boxes))
+    pairs, iou = find_duplicates(boxes, labels, 0.7, groups)
+    all_iou = pairwise_iou(boxes, boxes)
+    same = (labels[:, None] == labels[None]) & (groups[:, None] == groups[None])
+    expected = np.argwhere(np.triu(same & (all_iou >= 0.7), k=1))
+    assert (pairs == expected).all()
+    assert np.allclose(iou, all_iou[expected[:, 0], expected[:, 1]])
+    # few full-frame boxes among small ones are paired without cell blow-up
+    frames = np.tile([0.0, 0.0, 340.0, 340.0], (6, 1)) + rng.uniform(0, 1, (6, 4))
+    boxes = np.concatenate([boxes, frames])
+    pairs, iou = find_duplicates(boxes, None, 0.9)
+    all_iou = pairwise_iou(boxes, boxes)
+    assert (pairs == np.argwhere(np.triu(all_iou >= 0.9, k=1))).all()
+    exact, _ = find_duplicates(
+        np.array([[0, 0, 5, 5], [0, 0, 5, 5], [0, 0, 5, 6]]), None, 1.0
+    )
+    assert exact.tolist() == [[0, 1]]
+    with pytest.raises(ValueError):
+        find_duplicates(boxes, iou_threshold=0)
+
+
+def test_annotation_duplicates():
+    ann = annotation_from_xml("test_data/valid_annotations/000001.xml")
+    n_objects = len(ann.objects)
+    ann.objects.append(copy.deepcopy(ann.objects[0]))
+    pairs, iou = annotation_duplicates(ann)
+    assert pairs.tolist() == [[0, n_objects]]
+    assert iou.tolist() == [1.0]
+    kept = annotation_nms(ann)
+    assert len(kept) == n_objects
+    assert kept[0] is ann.objects[0]
+
+
+def test_dataset_duplicates(yolo_data):
+    files = sorted(Path(s.get("xml_ann_file")) for s in yolo_data)
+    annotations = [annotation_from_xml(f) for f in files]
+    for ann in annotations[:3]:
+        ann.objects.append(copy.deepcopy(ann.objects[-1]))
+    dataset = AnnotationDataset.from_annotations(annotations)
+    pairs, iou = dataset_duplicates(dataset, 0.95)
+    ends = dataset.offsets[1:4] - 1
+    assert pairs.tolist() == [[e - 1, e] for e in ends.tolist()]
+    keep = dataset_nms(dataset, 0.5)
+    assert not keep[ends].any()
+    scores = np.arange(dataset.n_objects, dtype=np.float32)
+    keep = dataset_nms(dataset, 0.95, scores)
+    assert not keep[ends - 1].any() and keep[ends].all()
+    for i in range(len(dataset)):
+        sl = dataset.image_slice(i)
+        expected = brute_nms(dataset.boxes[sl], scores[sl], 0.95, dataset.label_ids[sl])
+        assert (np.flatnonzero(keep[sl]) == np.sort(expected)).all()
@@ -0,0 +1,78 @@
+import os
+import shutil
+
+import pytest
+
+from pascal import annotation_from_xml, load_dataset
+from pascal.cache import ParseCache
+
+
+def test_parse_cache(tmp_path):
+    """
+    Проверить кэш: измененные файлы парсятся заново
+    """
+    ann_file = tmp_path / "000001.xml"
+    shutil.copy("test_data/valid_annotations/000001.xml", ann_file)
+    spec = {"truncated": bool, "difficult": bool}
+    with ParseCache(tmp_path / "cache", spec) as cache:
+        ann = cache.load(ann_file)
+        assert len(cache) == 1
+    expected = annotation_from_xml(ann_file, spec)
+    with ParseCache(tmp_path / "cache", spec) as cache:
+        assert cache.get_state(ann_file) is not None
+        cached = cache.load(ann_file)
+    assert str(cached) == str(ann) == str(expected)
+    assert cached.objects[0].truncated is True
+    # other attr_type_spec has own cache
+    with ParseCache(tmp_path / "cache") as cache:
+        assert cache.get_state(ann_file) is None
+    text = ann_file.read_text().replace("<name>dog</name>", "<name>cat</name>")
+    ann_file.write_text(text)
+    with ParseCache(tmp_path / "cache", spec) as cache:
+        assert cache.get_state(ann_file) is None
+        assert cache.load(ann_file).objects[0].name == "cat"
+
+
+def test_content_hash(tmp_path):
+    ann_file = tmp_path / "000001.xml"
+    shutil.copy("test_data/valid_annotations/000001.xml", ann_file)
+    with ParseCache(tmp_path / "cache", use_hash=True) as cache:
+        cache.load(ann_file)
+    stat = os.stat(ann_file)
+    os.utime(ann_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    with ParseCache(tmp_path / "cache", use_hash=True) as cache:
+        assert cache.get_state(ann_file) is not None
+        cache.compact()
+        assert len(cache) == 1
+        assert cache.load(ann_file).filename == "000001.jpg"
+
+
+def test_load_dataset_cache(tmp_path):
+    for file in [
+        "test_data/valid_annotations/000001.xml",
+        "test_data/invalid_annotations/books.xml",
+    ]:
+        shutil.copy(file, tmp_path)
+    for _ in range(2):
+        annotations, errors = load_dataset(
+            tmp_path, workers=1, cache_dir=tmp_path / "cache"
+        )
+        assert [ann.filename for ann in annotations] == ["000001.jpg"]
+        assert len(errors) == 1
+
+
+def test_lambda_spec_not_cached(tmp_path):
+    """
+    Разные lambda с одинаковым именем не используют общий кэш
+    """
+    shutil.copy("test_data/valid_annotations/000001.xml", tmp_path)
+    with pytest.raises(ValueError):
+        ParseCache(tmp_path / "cache", {"truncated": lambda v: v})
+    for value in (1, 2):
+        annotations, _ = load_dataset(
+            tmp_path,
+            workers=1,
+            attr_type_spec={"truncated": lambda v, value=value: value},
+            cache_dir=tmp_path / "cache",
+        )
+        assert annotations[0].objects[0].truncated == value
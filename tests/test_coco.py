@@ -0,0 +1,188 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from pascal import (
+    AnnotationDataset,
+    annotation_from_xml,
+    annotations_from_coco,
+    dataset_from_coco,
+    export_coco,
+)
+from pascal.exceptions import InconsistentAnnotation, ParseException
+from pascal.pascal_annotation import Annotation
+
+
+@pytest.fixture
+def annotations(yolo_data):
+    files = sorted(Path(s.get("xml_ann_file")) for s in yolo_data)
+    return [annotation_from_xml(file) for file in files]
+
+
+def expected_coco(annotations):
+    categories = {}
+    images = []
+    objects = []
+    for image_id, ann in enumerate(annotations, 1):
+        images.append(
+            dict(
+                id=image_id,
+                file_name=ann.filename,
+                width=ann.size.width,
+                height=ann.size.height,
+            )
+        )
+        for obj in ann.objects:
+            category_id = categories.setdefault(obj.name, len(categories) + 1)
+            box = obj.bndbox
+            w, h = box.xmax - box.xmin, box.ymax - box.ymin
+            objects.append(
+                dict(
+                    id=len(objects) + 1,
+                    image_id=image_id,
+                    category_id=category_id,
+                    bbox=[box.xmin, box.ymin, w, h],
+                    area=w * h,
+                    iscrowd=0,
+                )
+            )
+    return categories, images, objects
+
+
+@pytest.mark.parametrize(
+    "workers,backend,chunksize",
+    [(1, "process", 64), (2, "process", 3), (3, "thread", 1)],
+)
+def test_export_coco(annotations, tmp_path, workers, backend, chunksize):
+    """
+    Потоковая выгрузка в COCO не зависит от числа воркеров и размера шарда
+    """
+    out_file = tmp_path / "coco.json"
+    stats = export_coco(
+        iter(annotations),
+        out_file,
+        workers=workers,
+        backend=backend,
+        chunksize=chunksize,
+        queue_size=2,
+    )
+    categories, images, objects = expected_coco(annotations)
+    with open(out_file) as f:
+        coco = json.load(f)
+    assert coco["images"] == images
+    assert coco["annotations"] == objects
+    assert coco["categories"] == [
+        dict(id=i, name=name, supercategory="none") for name, i in categories.items()
+    ]
+    assert stats.images == len(images)
+    assert stats.annotations == len(objects)
+    assert stats.categories == categories
+    reference = tmp_path / "reference.json"
+    export_coco(annotations, reference, workers=1)
+    assert out_file.read_bytes() == reference.read_bytes()
+
+
+@pytest.mark.parametrize("workers,backend", [(1, "process"), (2, "process")])
+def test_export_coco_files(yolo_data, annotations, tmp_path, workers, backend):
+    """
+    Файлы разбираются воркерами, результат совпадает с выгрузкой аннотаций
+    """
+    files = sorted(Path(s.get("xml_ann_file")) for s in yolo_data)
+    bad_file = Path("test_data/invalid_annotations/books.xml")
+    # files, annotation objects and file which cannot be parsed are mixed
+    items = files[:5] + annotations[5:8] + [bad_file] + files[8:]
+    out_file = tmp_path / "coco.json"
+    stats = export_coco(items, out_file, workers=workers, backend=backend, chunksize=2)
+    assert [file for file, _ in stats.errors] == [bad_file]
+    assert stats.images == len(annotations)
+    reference = tmp_path / "reference.json"
+    export_coco(annotations, reference, workers=1)
+    assert out_file.read_bytes() == reference.read_bytes()
+
+
+def test_export_coco_categories(annotations, tmp_path):
+    out_file = tmp_path / "coco.json"
+    stats = export_coco(annotations, out_file, categories=["dog"], workers=1)
+    with open(out_file) as f:
+        coco = json.load(f)
+    n_dogs = sum(obj.name == "dog" for ann in annotations for obj in ann.objects)
+    assert len(coco["annotations"]) == n_dogs
+    assert {ann["category_id"] for ann in coco["annotations"]} <= {1}
+    assert stats.skipped == sum(len(ann.objects) for ann in annotations) - n_dogs
+    assert coco["categories"] == [dict(id=1, name="dog", supercategory="none")]
+
+
+def test_export_coco_empty(tmp_path):
+    out_file = tmp_path / "coco.json"
+    export_coco([], out_file, workers=1)
+    with open(out_file) as f:
+        assert json.load(f) == dict(images=[], annotations=[], categories=[])
+
+
+def test_export_coco_no_size(annotations, tmp_path):
+    out_file = tmp_path / "coco.json"
+    with pytest.raises(InconsistentAnnotation):
+        export_coco(annotations + [Annotation("a.jpg", [], None)], out_file, workers=1)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_annotations_from_coco(annotations, yolo_data, tmp_path):
+    """
+    Чтение COCO: аннотации совпадают с исходными
+    """
+    out_file = tmp_path / "coco.json"
+    export_coco(annotations, out_file, workers=1)
+    loaded = list(annotations_from_coco(out_file))
+    assert len(loaded) == len(annotations)
+    label_map = yolo_data[0].get("label_map")
+    for ann, coco_ann in zip(annotations, loaded):
+        assert coco_ann.filename == ann.filename
+        assert coco_ann.size.width == ann.size.width
+        assert coco_ann.size.height == ann.size.height
+        assert [o.name for o in coco_ann.objects] == [o.name for o in ann.objects]
+        for obj, coco_obj in zip(ann.objects, coco_ann.objects):
+            box, coco_box = obj.bndbox, coco_obj.bndbox
+            assert (coco_box.xmin, coco_box.ymin, coco_box.xmax, coco_box.ymax) == (
+                box.xmin,
+                box.ymin,
+                box.xmax,
+                box.ymax,
+            )
+        assert coco_ann.to_yolo(label_map) == ann.to_yolo(label_map)
+        assert coco_ann.to_xml() is not None
+
+
+def test_dataset_from_coco(annotations, tmp_path):
+    out_file = tmp_path / "coco.json"
+    with open(out_file, "w") as f:
+        categories, images, objects = expected_coco(annotations)
+        # annotations are not grouped by image in file
+        objects = objects[::-1] + [dict(objects[0], image_id=1000)]
+        categories = [dict(id=i, name=name) for name, i in categories.items()]
+        json.dump(dict(images=images, annotations=objects, categories=categories), f)
+    dataset = dataset_from_coco(out_file)
+    expected = AnnotationDataset.from_annotations(annotations)
+    assert dataset.filenames == expected.filenames
+    assert (dataset.offsets == expected.offsets).all()
+    assert (dataset.sizes == expected.sizes).all()
+    # reversed objects of every image
+    for i in range(len(expected)):
+        boxes = expected.boxes[expected.image_slice(i)][::-1]
+        assert np.allclose(dataset.boxes[dataset.image_slice(i)], boxes)
+        names = expected.object_names()[expected.image_slice(i)][::-1]
+        assert list(dataset.object_names()[dataset.image_slice(i)]) == list(names)
+    assert (dataset.attributes["iscrowd"] == 0).all()
+
+
+def test_coco_invalid(tmp_path):
+    out_file = tmp_path / "coco.json"
+    out_file.write_text('{"images": [{"id": 1}], "annotations": []}')
+    with pytest.raises(ParseException):
+        list(annotations_from_coco(out_file))
+    with pytest.raises(ParseException):
+        dataset_from_coco(out_file)
+    out_file.write_text("{")
+    with pytest.raises(ParseException):
+        dataset_from_coco(out_file)
@@ -0,0 +1,97 @@
+import xml.etree.ElementTree as xml
+
+from pascal import Annotation, annotation_from_xml
+from pascal.protocol_implementations import (
+    BndBox,
+    CompactBndBox,
+    CompactObject,
+    CompactSize,
+    Object,
+    Size,
+)
+from pascal.protocols import BndBox as BndBoxProtocol
+from pascal.protocols import PascalAnnotation, PascalObject
+from pascal.protocols import Size as SizeProtocol
+from pascal.utils import save_xml
+
+
+def test_protocols():
+    """
+    Компактные классы удовлетворяют протоколам и не имеют __dict__
+    """
+    box = CompactBndBox(1, 2, 3, 4)
+    obj = CompactObject("dog", box, difficult=0)
+    size = CompactSize(100, 200, 3)
+    assert isinstance(box, BndBoxProtocol)
+    assert isinstance(obj, PascalObject)
+    assert isinstance(size, SizeProtocol)
+    for item in (box, obj, size):
+        assert not hasattr(item, "__dict__")
+    assert obj == CompactObject("dog", CompactBndBox(1, 2, 3, 4), difficult=0)
+
+
+def test_to_xml():
+    box = CompactBndBox(1, 2, 3, 4)
+    assert xml.tostring(box.to_xml()) == xml.tostring(BndBox(1, 2, 3, 4).to_xml())
+    obj = CompactObject("dog", box)
+    expected = Object("dog", BndBox(1, 2, 3, 4))
+    assert xml.tostring(obj.to_xml()) == xml.tostring(expected.to_xml())
+    ann = Annotation("img.jpg", [obj], CompactSize(100, 200))
+    expected = Annotation(
+        "img.jpg", [Object("dog", BndBox(1, 2, 3, 4))], Size(100, 200)
+    )
+    assert xml.tostring(ann.to_xml()) == xml.tostring(expected.to_xml())
+
+
+def test_str_save_xml(tmp_path):
+    """
+    str и save_xml аннотации только с компактными потомками
+    """
+    ann = Annotation(
+        "x.jpg", [CompactObject("dog", CompactBndBox(1, 2, 3, 4))], CompactSize(10, 10)
+    )
+    expected = Annotation("x.jpg", [Object("dog", BndBox(1, 2, 3, 4))], Size(10, 10))
+    assert str(ann) == str(expected)
+    assert "<name>dog</name>" in str(ann)
+    save_xml(tmp_path / "x.xml", ann.to_xml())
+    loaded = annotation_from_xml(tmp_path / "x.xml")
+    assert loaded.to_labelme() == expected.to_labelme()
+
+
+def test_convert():
+    ann = annotation_from_xml("test_data/valid_annotations/000001.xml")
+    objects = [CompactObject.from_object(obj) for obj in ann]
+    compact = Annotation(ann.filename, objects, CompactSize.from_size(ann.size))
+    assert isinstance(compact, PascalAnnotation)
+    label_map = {"dog": 0, "person": 1}
+    assert compact.to_yolo(label_map) == ann.to_yolo(label_map)
+    assert compact.to_labelme()["shapes"] == ann.to_labelme()["shapes"]
+
+
+def test_convert_extra(tmp_path):
+    """
+    Части и другие атрибуты объекта сохраняются в extra
+    """
+    file = tmp_path / "part.xml"
+    file.write_text(
+        "<annotation><filename>a.jpg</filename>"
+        "<size><width>100</width><height>100</height><depth>3</depth></size>"
+        "<object><name>person</name><pose>Left</pose><truncated>0</truncated>"
+        "<difficult>0</difficult><occluded>1</occluded>"
+        "<bndbox><xmin>1</xmin><ymin>2</ymin><xmax>50</xmax><ymax>60</ymax></bndbox>"
+        "<part><name>head</name>"
+        "<bndbox><xmin>5</xmin><ymin>5</ymin><xmax>20</xmax><ymax>20</ymax></bndbox>"
+        "</part></object></annotation>"
+    )
+    ann = annotation_from_xml(file)
+    obj = CompactObject.from_object(ann.objects[0])
+    assert obj.occluded == 1
+    assert obj.part.name == "head"
+    assert not hasattr(obj, "__dict__")
+    # extra attributes follow standard ones
+    children = sorted(xml.tostring(child) for child in obj.to_xml())
+    expected = sorted(xml.tostring(child) for child in ann.objects[0].to_xml())
+    assert children == expected
+    compact = Annotation(ann.filename, [obj], CompactSize.from_size(ann.size))
+    assert compact.to_labelme()["shapes"] == ann.to_labelme()["shapes"]
+    assert CompactObject.from_object(obj) == obj
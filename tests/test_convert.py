@@ -0,0 +1,215 @@
+import base64
+import json
+import shutil
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+import pascal.utils
+from pascal import annotation_from_xml
+from pascal.cli import main
+from pascal.convert import OUTPUT_SUFFIX, convert_dataset
+
+
+@pytest.mark.parametrize(
+    "workers,backend",
+    [(1, "process"), (2, "process"), (2, "thread")],
+)
+def test_convert_dataset(yolo_data, tmp_path, workers, backend):
+    """
+    Конвертация датасета совпадает с конвертацией отдельных аннотаций
+    """
+    files = sorted(Path(s.get("xml_ann_file")) for s in yolo_data)
+    label_map = yolo_data[0].get("label_map")
+    stats = convert_dataset(
+        files + [Path("test_data/invalid_annotations/books.xml")],
+        tmp_path,
+        "yolo",
+        workers=workers,
+        backend=backend,
+        labels_map=label_map,
+        precision=6,
+        queue_size=2,
+    )
+    assert stats.converted == len(files)
+    assert len(stats.errors) == 1
+    for file in files:
+        ann = annotation_from_xml(file)
+        out_file = tmp_path / file.with_suffix(".txt").name
+        assert out_file.read_text() == ann.to_yolo(label_map, precision=6)
+
+
+def test_cli(tmp_path, capsys):
+    src = Path("test_data/yolo_data")
+    assert main(["convert", str(src), str(tmp_path / "xml"), "--to", "voc"]) == 0
+    assert main(["convert", str(src), str(tmp_path / "json"), "--to", "labelme"]) == 0
+    code = main(
+        [
+            "convert",
+            str(src),
+            str(tmp_path / "yolo"),
+            "--to",
+            "yolo",
+            "--workers",
+            "2",
+            "--labels-map",
+            str(src / "classes.txt"),
+        ]
+    )
+    assert code == 0
+    assert "12 files" in capsys.readouterr().err
+    for file in src.glob("*.xml"):
+        ann = annotation_from_xml(file)
+        xml_file = tmp_path / "xml" / file.name
+        assert str(annotation_from_xml(xml_file)) == str(ann)
+        with open((tmp_path / "json" / file.name).with_suffix(".json")) as f:
+            assert json.load(f)["shapes"] == ann.to_labelme()["shapes"]
+        assert (tmp_path / "yolo" / file.with_suffix(".txt").name).exists()
+
+
+@pytest.mark.parametrize(
+    "to",
+    ["yolo", "labelme", "voc"],
+)
+def test_incremental(yolo_data, tmp_path, to):
+    """
+    Инкрементальная конвертация: только новые и измененные файлы
+    """
+    src = tmp_path / "src"
+    out = tmp_path / "out"
+    src.mkdir()
+    for sample in yolo_data:
+        shutil.copy(sample.get("xml_ann_file"), src)
+    label_map = yolo_data[0].get("label_map")
+
+    def convert():
+        return convert_dataset(
+            sorted(src.glob("*.xml")),
+            out,
+            to,
+            workers=1,
+            labels_map=label_map,
+            incremental=True,
+            use_hash=True,
+        )
+
+    n_files = len(yolo_data)
+    stats = convert()
+    assert (stats.converted, stats.skipped, stats.removed) == (n_files, 0, 0)
+    assert len(list(out.glob("0*" + OUTPUT_SUFFIX[to]))) == n_files
+    stats = convert()
+    assert (stats.converted, stats.skipped, stats.removed) == (0, n_files, 0)
+
+    files = sorted(src.glob("*.xml"))
+    files[0].unlink()
+    text = files[1].read_text().replace("<xmin>", "<xmin>1")
+    files[1].write_text(text)
+    # modification time changed, content is the same
+    files[2].write_text(files[2].read_text())
+    stats = convert()
+    assert (stats.converted, stats.skipped, stats.removed) == (1, n_files - 2, 1)
+    assert not (out / files[0].with_suffix(OUTPUT_SUFFIX[to]).name).exists()
+    assert len(list(out.glob("0*" + OUTPUT_SUFFIX[to]))) == n_files - 1
+
+
+def test_incremental_outputs(yolo_data, tmp_path):
+    """
+    Удаляются выходы файлов, которые перестали конвертироваться и затем удалены,
+    и выходы предыдущего формата
+    """
+    src = tmp_path / "src"
+    out = tmp_path / "out"
+    src.mkdir()
+    for sample in yolo_data:
+        shutil.copy(sample.get("xml_ann_file"), src)
+    files = sorted(src.glob("*.xml"))
+    label_map = yolo_data[0].get("label_map")
+
+    def convert(to):
+        return convert_dataset(
+            sorted(src.glob("*.xml")),
+            out,
+            to,
+            workers=1,
+            labels_map=label_map,
+            incremental=True,
+        )
+
+    convert("yolo")
+    files[0].write_text("<annotation>")
+    stats = convert("yolo")
+    assert (stats.converted, len(stats.errors)) == (0, 1)
+    files[0].unlink()
+    stats = convert("yolo")
+    assert stats.removed == 1
+    assert not (out / files[0].with_suffix(".txt").name).exists()
+
+    stats = convert("labelme")
+    assert stats.converted == len(files) - 1
+    assert stats.removed == len(files) - 1
+    assert not list(out.glob("*.txt"))
+    assert len(list(out.glob("0*.json"))) == len(files) - 1
+
+
+def test_incremental_lambda_spec(yolo_data, tmp_path):
+    """
+    С lambda в attr_type_spec все файлы конвертируются заново
+    """
+    files = sorted(Path(s.get("xml_ann_file")) for s in yolo_data)
+    for value in ("a", "b"):
+        stats = convert_dataset(
+            files,
+            tmp_path,
+            "voc",
+            workers=1,
+            attr_type_spec={"pose": lambda v, value=value: value},
+            incremental=True,
+        )
+        assert stats.converted == len(files)
+        assert f"<pose>{value}</pose>" in (tmp_path / files[0].name).read_text()
+
+
+@pytest.fixture
+def labelme_images(yolo_data, tmp_path):
+    img_dir = tmp_path / "images"
+    img_dir.mkdir()
+    files = sorted(Path(s.get("xml_ann_file")) for s in yolo_data)[:3]
+    for file in files:
+        ann = annotation_from_xml(file)
+        img = Image.effect_noise((ann.size.width, ann.size.height), 40).convert("RGB")
+        img.save(img_dir / ann.filename, quality=90)
+    return files, img_dir
+
+
+def test_save_labelme(labelme_images, tmp_path, monkeypatch):
+    """
+    Потоковая запись labelme совпадает с json.dumps и хранит исходные байты изображения
+    """
+    monkeypatch.setattr(pascal.utils, "_BASE64_CHUNK", 3 * 7)
+    files, img_dir = labelme_images
+    ann = annotation_from_xml(files[0])
+    img_path = img_dir / ann.filename
+    out_file = tmp_path / "ann.json"
+    ann.save_labelme(out_file, img_path, save_img_data=True)
+    res = ann.to_labelme(img_path, save_img_data=True)
+    assert out_file.read_text() == json.dumps(res, indent=2)
+    assert base64.b64decode(res["imageData"]) == img_path.read_bytes()
+    ann.save_labelme(out_file, img_path)
+    assert out_file.read_text() == json.dumps(ann.to_labelme(img_path), indent=2)
+    with pytest.raises(FileNotFoundError):
+        ann.save_labelme(out_file, tmp_path / "missing.jpg", save_img_data=True)
+
+
+def test_convert_labelme_img_data(labelme_images, tmp_path):
+    files, img_dir = labelme_images
+    out_dir = tmp_path / "json"
+    stats = convert_dataset(
+        files, out_dir, "labelme", workers=2, img_dir=img_dir, save_img_data=True
+    )
+    assert stats.converted == len(files)
+    for file in files:
+        ann = annotation_from_xml(file)
+        res = ann.to_labelme(img_dir / ann.filename, save_img_data=True)
+        out_file = out_dir / file.with_suffix(".json").name
+        assert out_file.read_text() == json.dumps(res, indent=2)
@@ -0,0 +1,41 @@
+import numpy as np
+
+from pascal import AnnotationDataset, annotation_from_xml
+from pascal.protocols import BndBox, PascalAnnotation, PascalObject, Size
+
+
+def test_dataset(yolo_data):
+    """
+    Проверить колоночное хранилище аннотаций
+    """
+    annotations = [annotation_from_xml(s.get("xml_ann_file")) for s in yolo_data]
+    label_map = yolo_data[0].get("label_map")
+    ds = AnnotationDataset.from_annotations(annotations)
+    assert len(ds) == len(annotations)
+    assert ds.n_objects == sum(len(ann) for ann in annotations)
+    assert ds.boxes.dtype == np.float32 and ds.boxes.shape == (ds.n_objects, 4)
+    assert ds.label_ids.dtype == np.int32
+    for ann, view in zip(annotations, ds):
+        assert isinstance(view, PascalAnnotation)
+        assert isinstance(view.size, Size)
+        assert view.filename == ann.filename
+        assert (view.size.width, view.size.height) == (ann.size.width, ann.size.height)
+        assert np.shares_memory(view.boxes, ds.boxes) or len(view) == 0
+        for obj, obj_view in zip(ann, view):
+            assert isinstance(obj_view, PascalObject)
+            assert isinstance(obj_view.bndbox, BndBox)
+            assert obj_view.name == obj.name
+            assert obj_view.difficult == obj.difficult
+            assert obj_view.bndbox.xmax == obj.bndbox.xmax
+        assert view.to_yolo(label_map, precision=6) == ann.to_yolo(
+            label_map, precision=6
+        )
+
+
+def test_filter_view():
+    ann = annotation_from_xml("test_data/valid_annotations/000001.xml")
+    ds = AnnotationDataset.from_annotations([ann])
+    view = ds[0]
+    view.filter_objects(["dog"])
+    assert [obj.name for obj in view] == ["person"]
+    assert len(ds[0]) == 2
@@ -0,0 +1,108 @@
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw
+
+from pascal import Annotation, annotation_from_xml
+from pascal.draw_objects import (
+    DrawObjectsMixin,
+    _draw_text,
+    _text_extent,
+    _translit,
+    get_font,
+)
+from pascal.protocol_implementations import BndBox, Object, Size
+
+
+def test_font_cache():
+    """
+    Шрифт загружается один раз
+    """
+    font = get_font(DrawObjectsMixin._font_path, 12)
+    assert get_font(DrawObjectsMixin._font_path, 12) is font
+    assert get_font(DrawObjectsMixin._font_path, 14) is not font
+
+
+def test_text_extent():
+    font = get_font(DrawObjectsMixin._font_path, 12)
+    img_draw = ImageDraw.Draw(Image.new("RGB", (10, 10)))
+    extent = _text_extent("person", font, "RGB")
+    for xy in [(0.0, 0.0), (13.5, 7.25), (100.0, 3.0)]:
+        expected = img_draw.textbbox(xy, "person", font=font)
+        assert expected == (
+            extent[0] + xy[0],
+            extent[1] + xy[1],
+            extent[2] + xy[0],
+            extent[3] + xy[1],
+        )
+
+
+def test_draw_boxes():
+    ann = annotation_from_xml("test_data/valid_annotations/000001.xml")
+    img = Image.new("RGB", (ann.size.width, ann.size.height))
+    first = ann.draw_boxes(img, language_code="ru")
+    second = ann.draw_boxes(img, language_code="ru")
+    assert first.tobytes() == second.tobytes()
+    assert first.tobytes() != img.tobytes()
+    assert _translit.cache_info().hits > 0
+
+
+def test_draw_text():
+    """
+    Текст через кэшированную маску совпадает с ImageDraw.text
+    """
+    font = get_font(DrawObjectsMixin._font_path, 12)
+    img = Image.new("RGB", (60, 30), (10, 80, 160))
+    for xy in [(0.0, 0.0), (13.5, 7.25), (-3.7, -2.2), (50.0, 20.0)]:
+        expected = img.copy()
+        ImageDraw.Draw(expected).text(xy, "dog", font=font)
+        result = img.copy()
+        _draw_text(result, ImageDraw.Draw(result), xy, "dog", font)
+        assert result.tobytes() == expected.tobytes()
+
+
+def test_draw_boxes_inplace():
+    ann = annotation_from_xml("test_data/valid_annotations/000001.xml")
+    img = Image.new("RGB", (ann.size.width, ann.size.height))
+    expected = ann.draw_boxes(img)
+    assert ann.draw_boxes(img, inplace=True) is img
+    assert img.tobytes() == expected.tobytes()
+
+
+@pytest.mark.parametrize("mode", ["RGB", "RGBA"])
+def test_draw_boxes_array(mode):
+    """
+    Отрисовка в массив совпадает с отрисовкой в изображение
+    """
+    ann = annotation_from_xml("test_data/valid_annotations/000001.xml")
+    img = Image.new(mode, (ann.size.width, ann.size.height), "gray")
+    expected = np.asarray(ann.draw_boxes(img, width=3))
+    frame = np.array(img)
+    copy = ann.draw_boxes(frame, width=3)
+    assert (copy == expected).all()
+    assert (frame == np.asarray(img)).all()
+    assert ann.draw_boxes(frame, width=3, inplace=True) is frame
+    assert (frame == expected).all()
+
+
+@pytest.mark.parametrize("width", [1, 3, 6])
+def test_draw_boxes_array_many(width):
+    """
+    Много пересекающихся боксов, в том числе на краях кадра и за ними
+    """
+    rng = np.random.default_rng(width)
+    xy = rng.uniform(-30, 330, (400, 2))
+    wh = rng.uniform(0, 60, (400, 2))
+    objects = [
+        Object(f"obj{i % 9}", BndBox(*box))
+        for i, box in enumerate(np.concatenate([xy, xy + wh], axis=1).tolist())
+    ]
+    ann = Annotation("a.jpg", objects, Size(320, 240))
+    img = Image.new("RGB", (320, 240), "gray")
+    expected = np.asarray(ann.draw_boxes(img, width=width))
+    assert (ann.draw_boxes(np.array(img), width=width) == expected).all()
+
+
+def test_draw_boxes_array_shape():
+    ann = annotation_from_xml("test_data/valid_annotations/000001.xml")
+    with pytest.raises(ValueError):
+        ann.draw_boxes(np.zeros((10, 10), dtype=np.uint8))
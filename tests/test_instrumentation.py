@@ -0,0 +1,110 @@
+import asyncio
+import threading
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+from pascal import annotation_from_xml, load_dataset
+from pascal.aio import aload_annotation
+from pascal.convert import convert_dataset
+from pascal.instrumentation import (
+    NOT_PASCAL_OBJECT,
+    UNMAPPED_LABEL,
+    Instrumentation,
+    active,
+    instrument,
+)
+from pascal.pascal_annotation import Annotation
+from pascal.protocol_implementations import BndBox, Object, Size
+
+
+@pytest.fixture
+def xml_files(yolo_data):
+    return sorted(Path(s.get("xml_ann_file")) for s in yolo_data)
+
+
+def test_instrument(xml_files):
+    """Время этапов и счетчики пропущенных объектов"""
+    assert active() is None
+    events = []
+    with instrument(callback=lambda *event: events.append(event)) as inst:
+        assert active() is inst
+        annotations = [annotation_from_xml(file) for file in xml_files]
+        ann = annotations[0]
+        names = [obj.name for obj in ann]
+        ann.to_yolo({names[0]: 0})
+        ann.to_labelme()
+        ann.draw_boxes(Image.new("RGB", (ann.size.width, ann.size.height)))
+        Annotation(
+            "a.jpg", [object(), Object("cat", BndBox(1, 2, 3, 4))], Size(9, 9)
+        ).to_yolo({"cat": 0})
+    assert active() is None
+    report = inst.report()
+    stages = report["stages"]
+    assert stages["parse"]["calls"] == len(xml_files)
+    assert stages["adopt"]["calls"] == len(xml_files)
+    assert "bndbox" not in stages
+    assert stages["to_yolo"]["calls"] == 2
+    assert stages["to_labelme"]["calls"] == 1
+    assert stages["draw"]["calls"] == 1
+    assert all(stats["seconds"] >= 0 for stats in stages.values())
+    assert report["counters"] == {
+        UNMAPPED_LABEL: sum(name != names[0] for name in names),
+        NOT_PASCAL_OBJECT: 1,
+    }
+    assert (NOT_PASCAL_OBJECT, None, 1) in events
+    assert sum(1 for name, _, _ in events if name == "parse") == len(xml_files)
+    # records are not made without instrument block
+    annotation_from_xml(xml_files[0])
+    assert inst.report() == report
+    with pytest.raises(ValueError):
+        with instrument(inst, callback=print):
+            pass
+
+
+@pytest.mark.parametrize(
+    "workers, backend", [(1, "process"), (2, "process"), (2, "thread")]
+)
+@pytest.mark.parametrize("to, stage", [("labelme", "to_labelme"), ("voc", "to_xml")])
+def test_instrument_convert(xml_files, tmp_path, workers, backend, to, stage):
+    """Записи процессов-воркеров добавляются в активную статистику"""
+    with instrument(Instrumentation()) as inst:
+        stats = convert_dataset(
+            xml_files, tmp_path, to, workers=workers, backend=backend
+        )
+    assert stats.converted == len(xml_files)
+    stages = inst.report()["stages"]
+    assert stages["parse"]["calls"] == len(xml_files)
+    assert stages[stage]["calls"] == len(xml_files)
+    assert stages["serialize"]["calls"] == len(xml_files)
+
+
+def test_instrument_scope(xml_files):
+    """
+    Инструментация действует в своем потоке и задаче,
+    потоки-воркеры библиотеки пишут в инструментацию вызывающего потока
+    """
+    with instrument() as inst:
+        thread = threading.Thread(target=annotation_from_xml, args=(xml_files[0],))
+        thread.start()
+        thread.join()
+        assert "parse" not in inst.stages
+        load_dataset(xml_files, workers=2, backend="thread")
+        asyncio.run(aload_annotation(xml_files[0]))
+    assert inst.stages["parse"].calls == len(xml_files) + 1
+
+    async def task(n):
+        with instrument() as task_inst:
+            for file in xml_files[:n]:
+                await asyncio.sleep(0)
+                annotation_from_xml(file)
+        return task_inst
+
+    async def main():
+        return await asyncio.gather(task(1), task(2))
+
+    first, second = asyncio.run(main())
+    assert first.stages["parse"].calls == 1
+    assert second.stages["parse"].calls == 2
+    assert active() is None
@@ -0,0 +1,96 @@
+import shutil
+from pathlib import Path
+
+import pytest
+
+from pascal import annotation_from_voc
+from pascal.label_index import LabelIndex
+
+
+@pytest.fixture
+def src(yolo_data, tmp_path):
+    src = tmp_path / "src"
+    src.mkdir()
+    for sample in yolo_data:
+        shutil.copy(sample.get("xml_ann_file"), src)
+    return src
+
+
+def expected_objects(files, name=None, **attributes):
+    res = {}
+    for file in files:
+        ann = annotation_from_voc(file)
+        positions = [
+            i
+            for i, obj in enumerate(ann.objects)
+            if (name is None or obj.name == name)
+            and all(str(getattr(obj, k, None)) == str(v) for k, v in attributes.items())
+        ]
+        if positions:
+            res[file.resolve()] = positions
+    return res
+
+
+@pytest.mark.parametrize("workers, backend", [(1, "process"), (2, "thread")])
+def test_label_index(src, tmp_path, workers, backend):
+    """Запросы по индексу совпадают с разбором всех файлов"""
+    files = sorted(src.glob("*.xml"))
+    index = LabelIndex(tmp_path / "labels.json", attributes=("difficult", "pose"))
+    stats = index.update(files, workers=workers, backend=backend)
+    assert (stats.indexed, stats.skipped, stats.removed) == (len(files), 0, 0)
+    assert len(index) == len(files)
+
+    index = LabelIndex(tmp_path / "labels.json", attributes=("difficult", "pose"))
+    assert index.objects("person") == expected_objects(files, "person")
+    assert index.objects("person", difficult=0) == expected_objects(
+        files, "person", difficult=0
+    )
+    assert index.objects(pose="Left") == expected_objects(files, pose="Left")
+    assert index.objects() == expected_objects(files)
+    names = {}
+    for file in files:
+        for name in {obj.name for obj in annotation_from_voc(file).objects}:
+            names.setdefault(name, set()).add(file.resolve())
+    assert index.names == {name: len(v) for name, v in names.items()}
+    both = sorted(names["person"] & names["dog"])
+    assert index.files("person", "dog") == both
+    assert index.files("person", "dog", match="any") == sorted(
+        names["person"] | names["dog"]
+    )
+    assert index.files("no such name") == []
+    with pytest.raises(ValueError):
+        index.objects("person", truncated=1)
+
+
+def test_label_index_incremental(src, tmp_path):
+    """Обновляются только новые и измененные файлы"""
+    files = sorted(src.glob("*.xml"))
+    path = tmp_path / "labels.json"
+    LabelIndex(path).update(files, workers=1, use_hash=True)
+    stats = LabelIndex(path).update(files, workers=1, use_hash=True)
+    assert (stats.indexed, stats.skipped, stats.removed) == (0, len(files), 0)
+
+    text = files[0].read_text()
+    name = annotation_from_voc(files[0]).objects[0].name
+    files[0].write_text(text.replace(f"<name>{name}</name>", "<name>zebra</name>"))
+    files[1].unlink()
+    # modification time changed, content is the same
+    files[2].write_text(files[2].read_text())
+    files = sorted(src.glob("*.xml"))
+    index = LabelIndex(path)
+    stats = index.update(files, workers=1, use_hash=True)
+    assert (stats.indexed, stats.skipped, stats.removed) == (1, len(files) - 1, 1)
+    assert index.files("zebra") == [files[0].resolve()]
+    assert LabelIndex(path).objects("zebra") == expected_objects(files, "zebra")
+
+    # other attributes, all files are indexed again
+    stats = LabelIndex(path, attributes=("truncated",)).update(files, workers=1)
+    assert stats.indexed == len(files)
+
+
+def test_label_index_errors(src, tmp_path, invalid_ann_files):
+    index = LabelIndex(tmp_path / "labels.json")
+    files = sorted(src.glob("*.xml")) + [Path(f) for f in invalid_ann_files]
+    stats = index.update(files, workers=1)
+    assert len(stats.errors) == len(invalid_ann_files)
+    assert len(index) == len(files) - len(invalid_ann_files)
@@ -0,0 +1,40 @@
+import shutil
+
+import pytest
+
+from pascal import annotation_from_xml, load_dataset
+from pascal.exceptions import InconsistentAnnotation
+
+
+@pytest.mark.parametrize(
+    "backend,workers",
+    [("process", 1), ("process", 2), ("thread", 2)],
+)
+def test_load_dataset(tmp_path, backend, workers):
+    """
+    Проверить параллельную загрузку и сбор ошибок
+    """
+    for file in [
+        "test_data/valid_annotations/000001.xml",
+        "test_data/valid_annotations/000103.xml",
+        "test_data/invalid_annotations/books.xml",
+    ]:
+        shutil.copy(file, tmp_path)
+    annotations, errors = load_dataset(
+        tmp_path, workers=workers, backend=backend, chunksize=1
+    )
+    assert [ann.filename for ann in annotations] == ["000001.jpg", "000103.jpg"]
+    for ann in annotations:
+        expected = annotation_from_xml(tmp_path / ann.filename.replace("jpg", "xml"))
+        assert str(ann) == str(expected)
+        assert ann.to_yolo({"dog": 0, "person": 1}) == expected.to_yolo(
+            {"dog": 0, "person": 1}
+        )
+    assert len(errors) == 1
+    assert errors[0][0].name == "books.xml"
+    assert isinstance(errors[0][1], InconsistentAnnotation)
+
+
+def test_load_dataset_backend():
+    with pytest.raises(ValueError):
+        load_dataset("test_data/valid_annotations", backend="gpu")
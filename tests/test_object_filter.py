@@ -1,6 +1,10 @@
 from itertools import combinations
 
-from pascal import annotation_from_xml
+import numpy as np
+import pytest
+
+from pascal import AnnotationDataset, annotation_from_xml
+from pascal.object_filter import ObjectFilter
 
 
 def test_obj_filter(valid_annotations):
@@ -17,3 +21,91 @@ def test_obj_filter(valid_annotations):
                 assert len(ann) == n_objects
                 ann.filter_objects(comb)
                 assert len(ann) == n_objects - n_filter
+
+
+def matches(flt, obj, size):
+    box = obj.bndbox
+    w, h = box.xmax - box.xmin, box.ymax - box.ymin
+    if flt.names is not None and obj.name not in flt.names:
+        return False
+    if obj.name in flt.exclude_names:
+        return False
+    if flt.min_area is not None and w * h < flt.min_area:
+        return False
+    if flt.max_aspect is not None and not (h > 0 and w / h <= flt.max_aspect):
+        return False
+    if flt.min_side is not None and min(w, h) < flt.min_side:
+        return False
+    for attr, values in flt.attributes.items():
+        if getattr(obj, attr, None) not in values.tolist():
+            return False
+    if flt.inside_image:
+        return (
+            box.xmin >= 0
+            and box.ymin >= 0
+            and box.xmax <= size.width
+            and box.ymax <= size.height
+        )
+    return True
+
+
+filters = [
+    ObjectFilter(names=["person", "dog"]),
+    ObjectFilter(exclude_names=["person"], min_area=5000),
+    ObjectFilter(max_aspect=1.0, min_side=50, attributes={"difficult": 0}),
+    ObjectFilter(attributes={"truncated": (0, 1)}, inside_image=True),
+    ObjectFilter(names=[]),
+]
+
+
+@pytest.mark.parametrize("flt", filters)
+def test_object_filter_mask(yolo_data, flt):
+    """Маска фильтра совпадает с проверкой каждого объекта"""
+    annotations = [annotation_from_xml(s.get("xml_ann_file")) for s in yolo_data]
+    expected = [
+        matches(flt, obj, ann.size) for ann in annotations for obj in ann.objects
+    ]
+    ds = AnnotationDataset.from_annotations(annotations)
+    mask = flt.mask(ds)
+    assert mask.tolist() == expected
+    selected = ds.select(mask)
+    assert selected.n_objects == sum(expected)
+    assert len(selected) == len(ds)
+    removed = flt.filter_annotations(annotations)
+    assert removed == len(expected) - sum(expected)
+    for ann, view in zip(annotations, selected):
+        assert [obj.name for obj in ann] == [obj.name for obj in view]
+        np.testing.assert_array_equal(
+            view.boxes,
+            np.array(
+                [
+                    [o.bndbox.xmin, o.bndbox.ymin, o.bndbox.xmax, o.bndbox.ymax]
+                    for o in ann
+                ],
+                dtype=np.float32,
+            ).reshape(-1, 4),
+        )
+
+
+def test_object_filter_missing_attribute(yolo_data):
+    """
+    Объекты без атрибута удаляются, маска требует столбец атрибута в датасете
+    """
+    annotations = [annotation_from_xml(s.get("xml_ann_file")) for s in yolo_data]
+    n_objects = sum(len(ann) for ann in annotations)
+    flt = ObjectFilter(attributes={"occluded": 1})
+    with pytest.raises(ValueError):
+        flt.mask(AnnotationDataset.from_annotations(annotations))
+    ds = AnnotationDataset.from_annotations(annotations, attr_names=("occluded",))
+    assert not flt.mask(ds).any()
+    assert flt.filter_annotations(annotations) == n_objects
+    assert all(len(ann) == 0 for ann in annotations)
+
+
+def test_object_filter_errors(yolo_data):
+    annotations = [annotation_from_xml(s.get("xml_ann_file")) for s in yolo_data]
+    ds = AnnotationDataset.from_annotations(annotations)
+    with pytest.raises(ValueError):
+        ObjectFilter(attributes={"occluded": 1}).mask(ds)
+    with pytest.raises(ValueError):
+        ds.select(np.ones(ds.n_objects + 1, dtype=bool))
@@ -0,0 +1,141 @@
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+from pascal import annotation_from_xml
+from pascal.pascal_annotation import Annotation
+from pascal.protocol_implementations import BndBox, Object, Size
+from pascal.render import load_preview, render_contact_sheets, render_dataset
+
+
+@pytest.fixture
+def images(yolo_data, tmp_path):
+    pairs = []
+    for sample in yolo_data[:4]:
+        ann_file = Path(sample.get("xml_ann_file"))
+        ann = annotation_from_xml(ann_file)
+        img_path = tmp_path / "images" / ann.filename
+        img_path.parent.mkdir(exist_ok=True)
+        Image.new("RGB", (ann.size.width, ann.size.height), (90, 90, 90)).save(
+            img_path, quality=95
+        )
+        pairs.append((ann_file, img_path))
+    return pairs
+
+
+@pytest.mark.parametrize(
+    "backend,workers",
+    [("thread", 2), ("process", 2), ("thread", 1)],
+)
+def test_render_dataset(images, tmp_path, backend, workers):
+    """
+    Пакетная отрисовка превью
+    """
+    pairs = [(annotation_from_xml(ann), img) for ann, img in images]
+    pairs.append((images[0][0], tmp_path / "missing.jpg"))
+    out_dir = tmp_path / "out"
+    stats = render_dataset(pairs, out_dir, workers=workers, backend=backend)
+    assert stats.converted == len(images)
+    assert len(stats.errors) == 1
+    for ann, img_path in pairs[:-1]:
+        preview = Image.open(out_dir / img_path.name)
+        assert preview.size == (ann.size.width, ann.size.height)
+
+
+def test_render_max_size(images, tmp_path):
+    out_dir = tmp_path / "out"
+    stats = render_dataset(images, out_dir, max_size=128, format="png", width=1)
+    assert stats.converted == len(images)
+    for _, img_path in images:
+        preview = Image.open(out_dir / img_path.with_suffix(".png").name)
+        assert max(preview.size) <= 128
+
+
+def test_load_preview(images):
+    _, img_path = images[0]
+    full = Image.open(img_path)
+    img, sx, sy = load_preview(img_path, max_size=100)
+    assert max(img.size) <= 100
+    assert sx == pytest.approx(img.width / full.width)
+    assert sy == pytest.approx(img.height / full.height)
+
+
+@pytest.mark.parametrize("backend", ["thread", "process"])
+def test_contact_sheets_by_class(images, tmp_path, backend):
+    """
+    Листы миниатюр по классам
+    """
+    class_images = {}
+    for ann_file, _ in images:
+        for obj in annotation_from_xml(ann_file).objects:
+            class_images.setdefault(obj.name, set()).add(ann_file)
+    out_dir = tmp_path / "sheets"
+    sheets, errors = render_contact_sheets(
+        images, out_dir, thumb_size=64, columns=2, rows=1, workers=2, backend=backend
+    )
+    assert not errors
+    assert set(sheets) == set(class_images)
+    for name, paths in sheets.items():
+        n_images = len(class_images[name])
+        assert len(paths) == (n_images + 1) // 2
+        for path in paths:
+            assert path.exists()
+        last = Image.open(paths[-1])
+        n_last = n_images - 2 * (len(paths) - 1)
+        assert last.size == (64 * n_last, 64 + 14)
+
+
+def test_contact_sheets_all(images, tmp_path):
+    pairs = list(images) + [(images[0][0], tmp_path / "missing.jpg")]
+    sheets, errors = render_contact_sheets(
+        pairs,
+        tmp_path / "sheets",
+        thumb_size=32,
+        columns=3,
+        by_class=False,
+        caption=False,
+    )
+    assert len(errors) == 1
+    assert list(sheets) == [""]
+    (sheet,) = sheets[""]
+    assert sheet.name == "sheet_000.jpg"
+    assert Image.open(sheet).size == (3 * 32, 2 * 32)
+
+
+@pytest.fixture
+def edge_box(tmp_path):
+    """Box touching left image border, 1-based VOC coords"""
+    img_path = tmp_path / "edge.png"
+    Image.new("RGB", (400, 400), (0, 0, 0)).save(img_path)
+    obj = Object("cat", BndBox(1, 50, 200, 300))
+    return Annotation("edge.png", [obj], Size(400, 400)), img_path
+
+
+def _box_pixels(img: Image.Image, box) -> bool:
+    """Every side of box has drawn (non background) pixel"""
+    x0, y0, x1, y1 = box
+    sides = [(x0, (y0 + y1) // 2), (x1, (y0 + y1) // 2), ((x0 + x1) // 2, y1)]
+    return all(max(img.getpixel(p)) > 0 for p in sides)
+
+
+def test_render_edge_box(edge_box, tmp_path):
+    """
+    Абсолютная рамка у края изображения не считается относительной после уменьшения
+    """
+    stats = render_dataset([edge_box], tmp_path / "out", max_size=100, format="png")
+    assert stats.converted == 1
+    preview = Image.open(tmp_path / "out" / "edge.png").convert("RGB")
+    assert preview.size == (100, 100)
+    assert _box_pixels(preview, (0, 12, 50, 75))
+
+
+def test_contact_sheet_edge_box(edge_box, tmp_path):
+    sheets, errors = render_contact_sheets(
+        [edge_box], tmp_path / "sheets", thumb_size=100, caption=False, format="png"
+    )
+    assert not errors
+    (sheet,) = sheets["cat"]
+    tile = Image.open(sheet).convert("RGB")
+    assert tile.size == (100, 100)
+    assert _box_pixels(tile, (0, 12, 50, 75))
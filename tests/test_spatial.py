@@ -0,0 +1,104 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from pascal import AnnotationDataset, annotation_from_xml
+from pascal.spatial import BoxIndex, DatasetIndex
+
+
+def brute_intersecting(boxes, region):
+    x0, y0, x1, y1 = region
+    mask = (
+        (boxes[:, 0] <= x1)
+        & (boxes[:, 2] >= x0)
+        & (boxes[:, 1] <= y1)
+        & (boxes[:, 3] >= y0)
+    )
+    return np.flatnonzero(mask)
+
+
+def brute_iou(boxes, box):
+    inter_w = np.minimum(boxes[:, 2], box[2]) - np.maximum(boxes[:, 0], box[0])
+    inter_h = np.minimum(boxes[:, 3], box[3]) - np.maximum(boxes[:, 1], box[1])
+    inter = np.clip(inter_w, 0, None) * np.clip(inter_h, 0, None)
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    return inter / (areas + (box[2] - box[0]) * (box[3] - box[1]) - inter)
+
+
+def random_boxes(rng, n, size=1000.0):
+    xy = rng.uniform(-50, size, (n, 2))
+    wh = rng.exponential(20, (n, 2))
+    return np.concatenate([xy, xy + wh], axis=1)
+
+
+@pytest.mark.parametrize("cell_size", [None, 3.0, 500.0])
+def test_box_index(cell_size):
+    """
+    Запросы к сетке совпадают с полным перебором
+    """
+    rng = np.random.default_rng(0)
+    boxes = random_boxes(rng, 2000)
+    index = BoxIndex(boxes, cell_size)
+    for region in random_boxes(rng, 50) * [1, 1, 3, 3]:
+        assert (index.intersecting(region) == brute_intersecting(boxes, region)).all()
+        x, y = region[:2]
+        expected = brute_intersecting(boxes, (x, y, x, y))
+        assert (index.containing(x, y) == expected).all()
+    for box in boxes[:50]:
+        ids, iou = index.overlapping(box, 0.3, return_iou=True)
+        all_iou = brute_iou(boxes, box)
+        assert (ids == np.flatnonzero(all_iou >= 0.3)).all()
+        assert np.allclose(iou, all_iou[ids])
+    # region outside of grid and border contact
+    assert len(index.intersecting((-1e6, -1e6, -1e5, -1e5))) == 0
+    x0, y0 = boxes[0, 2], boxes[0, 3]
+    assert 0 in index.intersecting((x0, y0, x0 + 1, y0 + 1))
+
+
+def test_box_index_large_boxes():
+    """
+    Несколько кадров во весь размер среди мелких боксов не раздувают сетку
+    """
+    rng = np.random.default_rng(1)
+    xy = rng.uniform(0, 8000, (5000, 2))
+    small = np.concatenate([xy, xy + 8], axis=1)
+    large = np.tile([0.0, 0.0, 8000.0, 8000.0], (20, 1)) + rng.uniform(0, 1, (20, 4))
+    boxes = np.concatenate([small, large])
+    index = BoxIndex(boxes)
+    assert len(index._keys) <= 4 * len(small)
+    assert len(index._large_ids) == len(large)
+    for region in [(0, 0, 10, 10), (3000, 3000, 5000, 5000), (-10, -10, 9000, 9000)]:
+        assert (index.intersecting(region) == brute_intersecting(boxes, region)).all()
+    for box in boxes[[0, 1, -1]]:
+        ids, iou = index.overlapping(box, 0.5, return_iou=True)
+        all_iou = brute_iou(boxes, box)
+        assert (ids == np.flatnonzero(all_iou >= 0.5)).all()
+
+
+def test_box_index_annotation():
+    ann = annotation_from_xml("test_data/valid_annotations/000001.xml")
+    index = BoxIndex.from_annotation(ann)
+    assert len(index) == len(ann.objects)
+    box = ann.objects[0].bndbox
+    ids = index.containing((box.xmin + box.xmax) / 2, (box.ymin + box.ymax) / 2)
+    assert 0 in ids
+    assert index.objects[0] is ann.objects[0]
+    assert 0 in index.overlapping((box.xmin, box.ymin, box.xmax, box.ymax), 0.99)
+    assert len(BoxIndex(np.empty((0, 4))).intersecting((0, 0, 10, 10))) == 0
+
+
+def test_dataset_index(yolo_data):
+    files = sorted(Path(s.get("xml_ann_file")) for s in yolo_data)
+    dataset = AnnotationDataset.from_annotations(annotation_from_xml(f) for f in files)
+    index = DatasetIndex(dataset, cell_size=16)
+    boxes = dataset.boxes.astype(np.float64)
+    rng = np.random.default_rng(1)
+    for image_index in range(len(dataset)):
+        image_slice = dataset.image_slice(image_index)
+        for region in random_boxes(rng, 20, 500) * [1, 1, 5, 5]:
+            expected = brute_intersecting(boxes[image_slice], region)
+            expected = expected + image_slice.start
+            assert (index.intersecting(image_index, region) == expected).all()
+        for i in range(image_slice.start, image_slice.stop):
+            assert i in index.overlapping(image_index, boxes[i], 0.99)
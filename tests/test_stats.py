@@ -0,0 +1,123 @@
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from pascal import DatasetStats, annotation_from_voc, dataset_stats
+from pascal.draw_objects import is_relative_coords
+from pascal.exceptions import InconsistentAnnotation, ParseException
+from pascal.pascal_annotation import Annotation
+from pascal.protocol_implementations import BndBox, Object, Size
+from pascal.stats import ASPECT_BINS, AREA_BINS, SIZE_BINS
+
+
+@pytest.fixture
+def xml_files(yolo_data):
+    return sorted(Path(s.get("xml_ann_file")) for s in yolo_data)
+
+
+def bin_counts(values, edges):
+    counts = np.zeros(len(edges) - 1, dtype=np.int64)
+    for value in values:
+        for i in range(len(edges) - 1):
+            if edges[i] <= value < edges[i + 1] or (i == 0 and value < 0):
+                counts[i] += 1
+                break
+    return counts
+
+
+def expected_stats(annotations):
+    class_counts = Counter()
+    class_images = Counter()
+    objects_per_image = Counter()
+    widths, heights, aspects = [], [], []
+    difficult = truncated = relative = 0
+    for ann in annotations:
+        objects_per_image[len(ann.objects)] += 1
+        class_images.update({str(obj.name) for obj in ann.objects})
+        for obj in ann.objects:
+            class_counts[str(obj.name)] += 1
+            box = obj.bndbox
+            widths.append(box.xmax - box.xmin)
+            heights.append(box.ymax - box.ymin)
+            if heights[-1] > 0:
+                aspects.append(widths[-1] / heights[-1])
+            difficult += getattr(obj, "difficult", 0) == 1
+            truncated += getattr(obj, "truncated", 0) == 1
+            relative += is_relative_coords(box)
+    areas = [w * h for w, h in zip(widths, heights)]
+    return dict(
+        class_counts=class_counts,
+        class_images=class_images,
+        objects_per_image=objects_per_image,
+        width_hist=bin_counts(widths, SIZE_BINS),
+        height_hist=bin_counts(heights, SIZE_BINS),
+        area_hist=bin_counts(areas, AREA_BINS),
+        aspect_hist=bin_counts(aspects, ASPECT_BINS),
+        difficult=difficult,
+        truncated=truncated,
+        relative_objects=relative,
+    )
+
+
+@pytest.mark.parametrize(
+    "workers, backend, chunksize",
+    [(1, "process", 64), (2, "thread", 3), (2, "process", 4)],
+)
+def test_dataset_stats(xml_files, workers, backend, chunksize):
+    """Статистика по файлам совпадает с прямым подсчетом при любом числе воркеров"""
+    stats = dataset_stats(
+        xml_files, workers=workers, backend=backend, chunksize=chunksize
+    )
+    annotations = [annotation_from_voc(file) for file in xml_files]
+    expected = expected_stats(annotations)
+    assert stats.images == len(xml_files)
+    assert stats.objects == sum(len(ann.objects) for ann in annotations)
+    assert stats.errors == []
+    for key, value in expected.items():
+        if isinstance(value, np.ndarray):
+            np.testing.assert_array_equal(getattr(stats, key), value)
+        else:
+            assert getattr(stats, key) == value, key
+    assert stats.difficult_ratio == pytest.approx(expected["difficult"] / stats.objects)
+    assert stats.width_hist.sum() == stats.objects
+
+
+def test_dataset_stats_merge(xml_files):
+    """Слияние частичной статистики равно статистике всего набора"""
+    annotations = [annotation_from_voc(file) for file in xml_files]
+    whole = DatasetStats().add(annotations)
+    merged = (
+        DatasetStats().add(annotations[:5]).merge(DatasetStats().add(annotations[5:]))
+    )
+    for key in ("images", "objects", "class_counts", "class_images", "difficult"):
+        assert getattr(merged, key) == getattr(whole, key)
+    np.testing.assert_array_equal(merged.area_hist, whole.area_hist)
+    # annotation objects are counted in calling thread
+    mixed = dataset_stats(xml_files[:5] + annotations[5:], workers=2, backend="thread")
+    assert mixed.class_counts == whole.class_counts
+    assert mixed.images == whole.images
+
+
+def test_dataset_stats_relative_and_errors(xml_files, invalid_ann_files):
+    relative = Annotation(
+        "a.jpg",
+        [
+            Object("cat", BndBox(0.1, 0.2, 0.5, 0.6)),
+            Object("cat", BndBox(10, 20, 50, 60)),
+        ],
+        Size(100, 100),
+    )
+    stats = dataset_stats(
+        [relative, xml_files[0]] + invalid_ann_files, workers=1, chunksize=2
+    )
+    assert stats.relative_objects == 1
+    assert stats.relative_images == 1
+    assert stats.has_relative_coords
+    assert stats.class_images["cat"] == 1
+    assert len(stats.errors) == len(invalid_ann_files)
+    assert all(
+        isinstance(ex, (ParseException, InconsistentAnnotation))
+        for _, ex in stats.errors
+    )
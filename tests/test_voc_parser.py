@@ -0,0 +1,115 @@
+import pytest
+
+import pascal.voc_parser
+
+from pascal import annotation_from_xml
+from pascal.exceptions import InconsistentAnnotation, ParseException
+from pascal.pascal_annotation import Annotation
+from pascal.protocol_implementations import Object, Part
+from pascal.protocols import PascalAnnotation, PascalObject
+from pascal.voc_parser import annotation_from_voc
+
+parts_xml = """<annotation>
+    <filename>2008_000008.jpg</filename>
+    <size>
+        <width>500</width>
+        <height>442</height>
+        <depth>3</depth>
+    </size>
+    <object>
+        <name>person</name>
+        <pose>Unspecified</pose>
+        <bndbox>
+            <xmin>158</xmin>
+            <ymin>44</ymin>
+            <xmax>289</xmax>
+            <ymax>167</ymax>
+        </bndbox>
+        <part>
+            <name>head</name>
+            <bndbox>
+                <xmin>169</xmin>
+                <ymin>50</ymin>
+                <xmax>229</xmax>
+                <ymax>117</ymax>
+            </bndbox>
+        </part>
+        <part>
+            <name>hand</name>
+            <bndbox>
+                <xmin>-1</xmin>
+                <ymin>90</ymin>
+                <xmax>200</xmax>
+                <ymax>120</ymax>
+            </bndbox>
+        </part>
+    </object>
+</annotation>
+"""
+
+
+@pytest.mark.parametrize(
+    "clip_zero",
+    [True, False],
+)
+def test_same_as_xmlobj(valid_annotations, clip_zero):
+    """
+    Быстрый парсер дает тот же результат, что и xmlobj
+    """
+    attr_type_spec = {"truncated": bool, "difficult": bool}
+    for ann_sample in valid_annotations:
+        ann_file = ann_sample.get("file")
+        expected = annotation_from_xml(ann_file, attr_type_spec, clip_zero)
+        ann = annotation_from_voc(ann_file, attr_type_spec, clip_zero)
+        assert isinstance(ann, PascalAnnotation)
+        assert str(ann) == str(expected)
+        assert len(ann) == len(expected)
+
+
+def test_dataclasses():
+    ann = annotation_from_voc("test_data/valid_annotations/000001.xml")
+    assert isinstance(ann, Annotation)
+    assert all(type(obj) is Object for obj in ann)
+    assert ann.objects[0].pose == "Left"
+
+
+def test_parts(tmp_path):
+    file = tmp_path / "parts.xml"
+    file.write_text(parts_xml)
+    ann = annotation_from_voc(file)
+    assert isinstance(ann, Annotation)
+    parts = ann.objects[0].part
+    assert all(isinstance(p, Part) and isinstance(p, PascalObject) for p in parts)
+    assert parts[0].bndbox.xmin == 169
+    assert str(ann) == str(annotation_from_xml(file))
+
+
+def test_fallback():
+    ann = annotation_from_voc("test_data/valid_annotations/bool_attributes.xml")
+    assert not isinstance(ann, Annotation)
+    assert len(ann) == 6
+
+
+def test_errors(tmp_path, monkeypatch):
+    """
+    Только неподдерживаемая схема и ошибки xml передаются в xmlobj,
+    остальные ошибки не скрываются
+    """
+    file = "test_data/valid_annotations/000001.xml"
+    with pytest.raises(ParseException):
+        annotation_from_voc(file, {"pose": int})
+    with pytest.raises(InconsistentAnnotation):
+        annotation_from_voc("test_data/invalid_annotations/books.xml")
+    broken = tmp_path / "broken.xml"
+    broken.write_text("<annotation>")
+    with pytest.raises(ParseException):
+        annotation_from_voc(broken)
+    with pytest.raises(FileNotFoundError):
+        annotation_from_voc(tmp_path / "missing.xml")
+
+    def check_bnd_box(box, clip_zero):
+        raise RuntimeError("bug")
+
+    monkeypatch.setattr(pascal.voc_parser, "_check_bnd_box", check_bnd_box)
+    with pytest.raises(RuntimeError):
+        annotation_from_voc(file)
@@ -1,4 +1,18 @@
-from pascal import annotation_from_xml
+import numpy as np
+import pytest
+
+from pascal import (
+    AnnotationDataset,
+    annotation_from_xml,
+    annotation_from_yolo,
+    dataset_from_yolo,
+    export_yolo,
+)
+from pascal.exceptions import ParseException
+from pascal.pascal_annotation import Annotation
+from pascal.protocol_implementations import BndBox, Object, Size
+
+BOX_KEYS = ("xmin", "ymin", "xmax", "ymax")
 
 
 def test_yolo_convertation(yolo_data):
@@ -16,3 +30,98 @@ def test_yolo_convertation(yolo_data):
         label_map = pairs.get("label_map")
         yolo_convert = ann.to_yolo(label_map, precision=6)
         assert yolo_convert == yolo_true_ann
+
+
+def test_export_yolo(yolo_data, tmp_path, caplog):
+    """
+    Конвертация всего датасета совпадает с to_yolo
+    """
+    annotations = [annotation_from_xml(s.get("xml_ann_file")) for s in yolo_data]
+    label_map = dict(yolo_data[0].get("label_map"))
+    label_map.pop("dog")
+    ds = AnnotationDataset.from_annotations(annotations)
+    files = export_yolo(ds, tmp_path, label_map, precision=6)
+    assert len(files) == len(annotations)
+    assert len([r for r in caplog.records if "dog" in r.getMessage()]) == 1
+    for ann, file in zip(annotations, files):
+        assert file.name == ann.filename.replace(".jpg", ".txt")
+        assert file.read_text() == ann.to_yolo(label_map, precision=6)
+
+
+def test_export_yolo_fractional(tmp_path):
+    """
+    Дробные координаты совпадают с to_yolo для датасета float64
+    """
+    rng = np.random.default_rng(0)
+    annotations = []
+    for i in range(300):
+        xy = rng.integers(0, 3000, size=2) / 10
+        wh = rng.integers(1, 2000, size=2) / 10
+        box = BndBox(xy[0], xy[1], xy[0] + wh[0], xy[1] + wh[1])
+        annotations.append(Annotation(f"{i}.jpg", [Object("cat", box)], Size(517, 389)))
+    ds = AnnotationDataset.from_annotations(annotations, dtype=np.float64)
+    files = export_yolo(ds, tmp_path, {"cat": 0}, precision=6)
+    for ann, file in zip(annotations, files):
+        assert file.read_text() == ann.to_yolo({"cat": 0}, precision=6)
+
+
+def test_dataset_from_yolo(yolo_data, tmp_path):
+    """
+    Пакетное чтение yolo разметки совпадает с annotation_from_yolo
+    """
+    label_map = {v: k for k, v in yolo_data[0].get("label_map").items()}
+    files = [s.get("yolo_ann_file") for s in yolo_data]
+    sizes = [annotation_from_xml(s.get("xml_ann_file")).size for s in yolo_data]
+    widths = [size.width for size in sizes]
+    heights = [size.height for size in sizes]
+    ds = dataset_from_yolo(files, widths, heights, label_map, dtype=np.float64)
+    assert len(ds) == len(files)
+    for file, w, h, view in zip(files, widths, heights, ds):
+        ann = annotation_from_yolo(file, w, h, label_map)
+        assert view.filename == ann.filename
+        assert [obj.name for obj in view] == [obj.name for obj in ann]
+        expected = [[getattr(o.bndbox, k) for k in BOX_KEYS] for o in ann]
+        np.testing.assert_allclose(view.boxes, np.array(expected).reshape(-1, 4))
+
+
+def test_dataset_from_yolo_format(tmp_path):
+    file = tmp_path / "messy.txt"
+    file.write_text("0\t0.5 0.5  0.2 0.2\n\n1 0.25 0.25 0.1 0.1 0.75\n  \n")
+    ds = dataset_from_yolo([file], 100, 200, {0: "dog"})
+    assert ds.names == ["dog", "1"]
+    np.testing.assert_allclose(ds.boxes[0], [40, 80, 60, 120])
+    objects = ds[0].objects
+    assert objects[1].confidence == pytest.approx(0.75)
+    assert not hasattr(objects[0], "confidence")
+    ann = annotation_from_yolo(file, 100, 200, {0: "dog"})
+    assert len(ann) == 2
+
+
+@pytest.mark.parametrize(
+    "text, message",
+    [
+        ("0 0.5 0.5 0.2 0.2\r\n\r\n1 0.5 0.5 0.2\n", "line 3: expected 5 or 6"),
+        ("0 0.5 0.5 0.2 0.2\r1 0.5 x 0.2 0.2\n", "yolo.txt"),
+    ],
+)
+def test_dataset_from_yolo_errors(tmp_path, text, message):
+    file = tmp_path / "yolo.txt"
+    file.write_bytes(text.encode())
+    with pytest.raises(ParseException, match=message):
+        dataset_from_yolo([file], 100, 100)
+
+
+def test_dataset_from_yolo_error_file(tmp_path):
+    files = [tmp_path / "a.txt", tmp_path / "b.txt", tmp_path / "c.txt"]
+    files[0].write_text("0 0.5 0.5 0.2 0.2\n")
+    files[1].write_text("")
+    files[2].write_text("\n0 0.5 0.5 0.2\n")
+    with pytest.raises(ParseException, match="c.txt, line 2"):
+        dataset_from_yolo(files, 100, 100)
+    files[2].write_text("0 0.5 0.5 0.2 nan?\n")
+    with pytest.raises(ParseException, match="c.txt"):
+        dataset_from_yolo(files, 100, 100)
+    files[2].write_text("1 0.5 0.5 0.2 0.2\r\n\r\n2 0.5 0.5 0.2 0.2")
+    ds = dataset_from_yolo(files, 100, 100)
+    assert ds.offsets.tolist() == [0, 1, 1, 3]
+    assert ds.names == ["0", "1", "2"]